@@ -0,0 +1,171 @@
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from gazetteer import Gazetteer, load_gazetteer, normalize_name
+
+
+# Below this similarity (difflib ratio of normalized names) a fuzzy match is rejected.
+DEFAULT_MIN_SCORE = 0.85
+# Candidates must share at least this Dice coefficient of trigrams with the phrase
+# before they are scored; it is a cheap upper bound that discards most names.
+DEFAULT_MIN_TRIGRAM_DICE = 0.4
+# Phrases shorter than this are only matched exactly; short words such as "ado" or
+# "oyo" are too close to ordinary address words to correct safely.
+MIN_FUZZY_LENGTH = 4
+# A multi-word phrase is only scored when each of its words shares at least this Dice
+# coefficient with a word of some multi-word name; words this short always pass.
+MIN_NAME_WORD_DICE = 0.25
+MAX_UNCHECKED_WORD_LENGTH = 3
+DEFAULT_CACHE_SIZE = 1 << 16
+
+
+def trigrams(phrase: str) -> set:
+    """Character trigrams of a normalized phrase, padded so word edges count ("ikeja" -> " ik", ...)."""
+    padded = f" {phrase} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _trigram_index(names: list):
+    """Inverted index (trigram -> ids into ``names``) and each name's trigram count."""
+    postings = {}
+    for name_id, name in enumerate(names):
+        for gram in trigrams(name):
+            postings.setdefault(gram, []).append(name_id)
+    counts = np.array([len(trigrams(name)) for name in names], dtype=np.int32)
+    return {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}, counts
+
+
+def _trigram_dice(postings: dict, counts: np.ndarray, phrase: str) -> np.ndarray:
+    """Trigram Dice coefficient of ``phrase`` against every indexed name."""
+    grams = trigrams(phrase)
+    lists = [postings[gram] for gram in grams if gram in postings]
+    if not lists:
+        return np.zeros(len(counts))
+    shared = np.bincount(np.concatenate(lists), minlength=len(counts))
+    return 2 * shared / (counts + len(grams))
+
+
+class AddressMatcher:
+    """
+    Typo-tolerant address resolution against the gazetteer's state and LGA names.
+
+    A trigram inverted index over every normalized state name, state alias and LGA
+    name is built once. A phrase that is not an exact name is matched by counting
+    shared trigrams over the index postings, keeping the names whose trigram Dice
+    coefficient reaches ``min_trigram_dice`` and whose length allows ``min_score``,
+    and scoring only those with ``SequenceMatcher.ratio``; the best name scoring at
+    least ``min_score`` wins. A phrase followed by "state" is matched against state
+    names only, so "Kebb State" is Kebbi rather than the LGA Kebbe.
+
+    ``correct_address`` rewrites misspelled place names in an address to their
+    canonical form, and ``resolve_address`` / ``enrich_addresses`` feed the corrected
+    text to the gazetteer's exact resolution. Phrase matches and whole-address
+    results are memoized, so repeated streets and addresses cost a dict lookup.
+    """
+
+    def __init__(self, gazetteer: Gazetteer = None, min_score: float = DEFAULT_MIN_SCORE,
+                 min_trigram_dice: float = DEFAULT_MIN_TRIGRAM_DICE, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.gazetteer = gazetteer or load_gazetteer()
+        self.min_score = min_score
+        self.min_trigram_dice = min_trigram_dice
+        self.names = sorted({*self.gazetteer.lgas_by_name, *self.gazetteer.states_by_name})
+        self._max_name_words = max(len(name.split()) for name in self.names)
+        self.name_lengths = np.array([len(name) for name in self.names], dtype=np.int32)
+        self.is_state = np.array([name in self.gazetteer.states_by_name for name in self.names])
+        # difflib's ratio is at most 2 * shorter / (sum of lengths), which bounds how
+        # much longer than a name a phrase scoring ``min_score`` can be.
+        self._max_phrase_length = int(self.name_lengths.max() * (2 - min_score) / min_score)
+        self.postings, self.trigram_counts = _trigram_index(self.names)
+        # The words making up multi-word names, to rule out multi-word phrases cheaply.
+        self.name_words = sorted({word for name in self.names if " " in name for word in name.split()})
+        self._word_postings, self._word_trigram_counts = _trigram_index(self.name_words)
+
+        self.match_name = lru_cache(maxsize=cache_size)(self._match_name)
+        self.resolve_address = lru_cache(maxsize=cache_size)(self._resolve_address)
+        self._is_name_word = lru_cache(maxsize=cache_size)(self._near_name_word)
+
+    def candidates(self, phrase: str, states_only: bool = False) -> np.ndarray:
+        """
+        Ids into ``names`` sharing at least ``min_trigram_dice`` of their trigrams with
+        ``phrase`` and close enough in length to score ``min_score``.
+        """
+        keep = _trigram_dice(self.postings, self.trigram_counts, phrase) >= self.min_trigram_dice
+        shorter = np.minimum(self.name_lengths, len(phrase))
+        keep &= 2 * shorter >= self.min_score * (self.name_lengths + len(phrase))
+        if states_only:
+            keep &= self.is_state
+        return np.flatnonzero(keep)
+
+    def _near_name_word(self, word: str) -> bool:
+        """Whether ``word`` could be a (misspelled) word of a multi-word name."""
+        if len(word) <= MAX_UNCHECKED_WORD_LENGTH:
+            return True
+        dice = _trigram_dice(self._word_postings, self._word_trigram_counts, word)
+        return bool((dice >= MIN_NAME_WORD_DICE).any())
+
+    def _match_name(self, phrase: str, states_only: bool = False):
+        """(canonical normalized name, score) for the best match of ``phrase``, or None."""
+        if phrase in self.gazetteer.states_by_name or (not states_only and phrase in self.gazetteer.lgas_by_name):
+            return phrase, 1.0
+        # Normalized phrases hold only [0-9a-z ], so this rejects any with a digit.
+        if (len(phrase) < MIN_FUZZY_LENGTH or len(phrase) > self._max_phrase_length
+                or not phrase.replace(" ", "").isalpha()):
+            return None
+        # Street and house words ("adeola street ikejaa") are not near any name word;
+        # checking words separately (memoized) keeps such phrases away from the index.
+        if " " in phrase and not all(self._is_name_word(word) for word in phrase.split()):
+            return None
+        candidates = self.candidates(phrase, states_only)
+        if len(candidates) == 0:
+            return None
+        best = None
+        matcher = SequenceMatcher(autojunk=False)
+        matcher.set_seq2(phrase)
+        for name_id in candidates:
+            name = self.names[name_id]
+            matcher.set_seq1(name)
+            if matcher.real_quick_ratio() < self.min_score or matcher.quick_ratio() < self.min_score:
+                continue
+            score = matcher.ratio()
+            if score >= self.min_score and (best is None or score > best[1]):
+                best = (name, score)
+        return best
+
+    def correct_address(self, address) -> str:
+        """
+        The normalized address with misspelled state and LGA names replaced by their
+        canonical names ("12 awolowo rd ikejaa lagoss" -> "12 awolowo rd ikeja lagos").
+
+        Words are scanned left to right as in ``Gazetteer.resolve_address``, taking
+        the longest phrase at each position with an exact or fuzzy match, so
+        "warri south wese" becomes "warri south west" rather than "warri south".
+        """
+        words = normalize_name(address).split()
+        corrected = []
+        position = 0
+        while position < len(words):
+            for size in range(min(self._max_name_words, len(words) - position), 0, -1):
+                phrase = " ".join(words[position:position + size])
+                states_only = position + size < len(words) and words[position + size] == "state"
+                match = self.match_name(phrase, states_only)
+                if match is not None:
+                    corrected.append(match[0])
+                    position += size
+                    break
+            else:
+                corrected.append(words[position])
+                position += 1
+        return " ".join(corrected)
+
+    def _resolve_address(self, address):
+        """``Gazetteer.resolve_address`` of the corrected address: (state, lga, postal_code, valid)."""
+        if address is None or (isinstance(address, float) and np.isnan(address)):
+            return None, None, None, False
+        return self.gazetteer.resolve_address(self.correct_address(address))
+
+    def enrich_addresses(self, df: pd.DataFrame, column: str = "ADDRESS") -> pd.DataFrame:
+        """``Gazetteer.enrich_addresses`` with misspelled place names corrected first."""
+        return self.gazetteer.enrich_addresses(df, column, resolve=self.resolve_address)
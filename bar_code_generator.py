@@ -1,154 +1,375 @@
-import pandas as pd
 from PIL import Image, ImageDraw, ImageFont
 import barcode
 from barcode.writer import ImageWriter
-from PIL import Image, ImageDraw, ImageFont
 import os
+import time
+import json
+import hashlib
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from label_layout import text_width, wrap_text
+from label_sheets import LabelSheetWriter, SHEET_FORMATS
+from row_reader import iter_row_chunks
+
+
+LABEL_WIDTH, LABEL_HEIGHT = int(80 * 11.81), int(100 * 11.81)
+BORDER_MARGIN = 20
+# Bump whenever the label layout changes so incremental runs re-render everything.
+LAYOUT_VERSION = 1
+MANIFEST_NAME = "label_manifest.json"
+
+
+def render_barcode_image(equipment_id):
+    """Render a Code128 barcode for ``equipment_id`` straight to a PIL image, without touching disk."""
+    code128 = barcode.get_barcode_class('code128')
+    return code128(equipment_id, writer=ImageWriter()).render({'write_text': False})
 
 
 def create_equipment_label(equipment_id, description, description2, output_folder, logo_path=None, title="EQUIPMENT LABEL"):
     try:
-        code128 = barcode.get_barcode_class('code128')
-        barcode_img = code128(equipment_id, writer=ImageWriter())
-        
-        temp_filename = barcode_img.save("temp_barcode", options={'write_text': False})
-        barcode_img = Image.open(temp_filename)
-        
-        width, height = int(80 * 11.81), int(100 * 11.81)
+        render_equipment_label(equipment_id, description, description2, output_folder, logo_path, title)
+        print(f"Created label for {equipment_id}")
+    except Exception as e:
+        print(f"Error creating label for {equipment_id}: {str(e)}")
+
+
+def load_font(name, size):
+    try:
+        return ImageFont.truetype(name, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+class LabelTemplate:
+    """
+    The static part of an equipment label, built once and reused for every row:
+    fonts are loaded once per (name, size), the logo is decoded and scaled once,
+    and the border, logo and title are pre-rendered onto a base canvas.
+    """
+
+    def __init__(self, logo_path=None, title="EQUIPMENT LABEL"):
+        self.logo_path = logo_path
+        self.title = title
+        self.width, self.height = LABEL_WIDTH, LABEL_HEIGHT
+        self.border_margin = BORDER_MARGIN
+        self._fonts = {}
+        self.canvas, self.content_top = self._render_header()
+
+    def font(self, name, size):
+        key = (name, size)
+        if key not in self._fonts:
+            self._fonts[key] = load_font(name, size)
+        return self._fonts[key]
+
+    def new_label(self):
+        """Return a fresh copy of the header canvas and a draw context for it."""
+        label_img = self.canvas.copy()
+        return label_img, ImageDraw.Draw(label_img)
+
+    def _render_header(self):
+        width, height = self.width, self.height
+        border_margin = self.border_margin
+        title = self.title
         label_img = Image.new('RGB', (width, height), 'white')
         draw = ImageDraw.Draw(label_img)
-        
-        border_margin = 20
+
         draw.rectangle([border_margin, border_margin, width-border_margin, height-border_margin], 
                       outline="black", width=2)
-        
+
         current_y = border_margin + 80
-        
-        if logo_path and os.path.exists(logo_path):
+
+        if self.logo_path and os.path.exists(self.logo_path):
             try:
-                logo = Image.open(logo_path)
+                logo = Image.open(self.logo_path)
                 original_width, original_height = logo.size
                 logo_width = int(original_width * 0.5)
                 logo_height = int(original_height * 0.5)
                 logo = logo.resize((logo_width, logo_height))
-                
+
                 logo_position = (border_margin + 10, current_y)
                 label_img.paste(logo, logo_position)
-                
-                try:
-                    title_font = ImageFont.truetype("arialbd.ttf", 50) 
-                except:
-                    title_font = ImageFont.load_default()
-                
+
+                title_font = self.font("arialbd.ttf", 50)
+
                 title_y = current_y + (logo_height - 36) // 2  
                 title_width = draw.textlength(title, font=title_font)
                 title_x = max((width - title_width) // 2, logo_width + 30)
-                
+
                 draw.text((title_x, title_y), title, font=title_font, fill="black")
-                
+
                 current_y += logo_height + 20
             except Exception as e:
                 print(f"Error processing logo: {str(e)}")
-                try:
-                    title_font = ImageFont.truetype("arialbd.ttf", 60)
-                except:
-                    title_font = ImageFont.load_default()
-                
+                title_font = self.font("arialbd.ttf", 60)
+
                 title_width = draw.textlength(title, font=title_font)
                 draw.text(((width - title_width) // 2, current_y), title, font=title_font, fill="black")
                 current_y += 40
         else:
-            try:
-                title_font = ImageFont.truetype("arialbd.ttf", 60)
-            except:
-                title_font = ImageFont.load_default()
-            
+            title_font = self.font("arialbd.ttf", 60)
+
             title_width = draw.textlength(title, font=title_font)
             draw.text(((width - title_width) // 2, current_y), title, font=title_font, fill="black")
             current_y += 40
-        
-        remaining_height = (height - border_margin) - current_y
-        text_block_height = 40 + 40 + (40 * len(description.split()))
-
-        barcode_width = min(int(width * 0.80), width - 30)
-        barcode_height = int(barcode_width * 0.4)
-       
-        barcode_y = current_y + ((remaining_height - text_block_height - barcode_height) // 2)
-        barcode_x = (width - barcode_width) // 2
-        
-        barcode_img = barcode_img.resize((barcode_width, barcode_height))
-        label_img.paste(barcode_img, (barcode_x, barcode_y))
-        
-        current_y = barcode_y + barcode_height + 20
-        
-        try:
-            id_font = ImageFont.truetype("arial.ttf", 60)
-        except:
-            id_font = ImageFont.load_default()
-        
-        id_text = f"ID: {equipment_id}"
-        id_width = draw.textlength(id_text, font=id_font)
-        draw.text(((width - id_width) // 2, current_y), id_text, font=id_font, fill="black")
+
+        return label_img, current_y
+
+
+@lru_cache(maxsize=8)
+def get_label_template(logo_path=None, title="EQUIPMENT LABEL"):
+    """Per-process cache of label templates, so pool workers build theirs once."""
+    return LabelTemplate(logo_path, title)
+
+
+def render_equipment_label(equipment_id, description, description2, output_folder, logo_path=None, title="EQUIPMENT LABEL", template=None):
+    """Render one label to ``output_folder`` and return its path. Raises on failure."""
+    label_img = draw_equipment_label(equipment_id, description, description2, logo_path, title, template)
+    os.makedirs(output_folder, exist_ok=True)
+    output_path = os.path.join(output_folder, f"{equipment_id}.png")
+    label_img.save(output_path)
+    return output_path
+
+
+def draw_equipment_label(equipment_id, description, description2, logo_path=None, title="EQUIPMENT LABEL", template=None):
+    """Lay out one label and return it as a PIL image."""
+    if template is None:
+        template = get_label_template(logo_path, title)
+    barcode_img = render_barcode_image(equipment_id)
+
+    width, height = template.width, template.height
+    border_margin = template.border_margin
+    label_img, draw = template.new_label()
+    current_y = template.content_top
+    
+    remaining_height = (height - border_margin) - current_y
+    text_block_height = 40 + 40 + (40 * len(description.split()))
+
+    barcode_width = min(int(width * 0.80), width - 30)
+    barcode_height = int(barcode_width * 0.4)
+
+    barcode_y = current_y + ((remaining_height - text_block_height - barcode_height) // 2)
+    barcode_x = (width - barcode_width) // 2
+    
+    barcode_img = barcode_img.resize((barcode_width, barcode_height))
+    label_img.paste(barcode_img, (barcode_x, barcode_y))
+    
+    current_y = barcode_y + barcode_height + 20
+    
+    id_font = template.font("arial.ttf", 60)
+    
+    id_text = f"ID: {equipment_id}"
+    id_width = draw.textlength(id_text, font=id_font)
+    draw.text(((width - id_width) // 2, current_y), id_text, font=id_font, fill="black")
+    current_y += 60
+    
+    # --- Font for description ---
+    desc_font_1 = template.font("arial.ttf", 50 if len(description) <= 26 else 33)
+    desc_font_2 = template.font("arial.ttf", 50)  # Always size 50 for description2
+    
+    max_text_width = width - 2 * border_margin - 20
+
+    current_y += 20  # Margin after ID
+
+    # Draw second description (description2)
+    description2_lines = wrap_text(description2, desc_font_2, max_text_width)
+    for line in description2_lines:
+        line_width = text_width(desc_font_2, line)
+        draw.text(((width - line_width) // 2, current_y), line, font=desc_font_2, fill="black")
+        current_y += 40
+
+    # Add margin before description (after description2)
+    current_y += 15  # Margin between description2 and description
+
+    # Draw first description (description)
+    description_lines = wrap_text(description, desc_font_1, max_text_width)
+    for line in description_lines:
+        line_width = text_width(desc_font_1, line)
+        draw.text(((width - line_width) // 2, current_y), line, font=desc_font_1, fill="black")
         current_y += 60
-        
-                # --- Font for description ---
-        try:
-            if len(description) <= 26:
-                desc_font_1 = ImageFont.truetype("arial.ttf", 50)
-            else:
-                desc_font_1 = ImageFont.truetype("arial.ttf", 33)
-        except:
-            desc_font_1 = ImageFont.load_default()
-        
-        try:
-            desc_font_2 = ImageFont.truetype("arial.ttf", 50)  # Always size 50 for description2
-        except:
-            desc_font_2 = ImageFont.load_default()
-        
-        def wrap_text(text, font, max_width):
-            lines = []
-            words = text.split()
-            while words:
-                line = ''
-                while words and draw.textlength(line + words[0], font=font) <= max_width:
-                    line += (words.pop(0) + ' ')
-                lines.append(line.strip())
-            return lines
-        
-        max_text_width = width - 2 * border_margin - 20
-
-        current_y += 20  # Margin after ID
-
-        # Draw second description (description2)
-        description2_lines = wrap_text(description2, desc_font_2, max_text_width)
-        for line in description2_lines:
-            line_width = draw.textlength(line, font=desc_font_2)
-            draw.text(((width - line_width) // 2, current_y), line, font=desc_font_2, fill="black")
-            current_y += 40
 
-        # Add margin before description (after description2)
-        current_y += 15  # Margin between description2 and description
-
-        # Draw first description (description)
-        description_lines = wrap_text(description, desc_font_1, max_text_width)
-        for line in description_lines:
-            line_width = draw.textlength(line, font=desc_font_1)
-            draw.text(((width - line_width) // 2, current_y), line, font=desc_font_1, fill="black")
-            current_y += 60
-
-       
-        # Save output
-        if not os.path.exists(output_folder):
-            os.makedirs(output_folder)
-        output_path = os.path.join(output_folder, f"{equipment_id}.png")
-        label_img.save(output_path)
-        print(f"Created label for {equipment_id}")
-        
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
-            
+
+    return label_img
+
+
+
+def file_hash(path):
+    if not path or not os.path.exists(path):
+        return ""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def label_content_hash(equipment_id, description, description2, title, logo_hash):
+    key = json.dumps([equipment_id, description, description2, title, logo_hash, LAYOUT_VERSION])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def load_label_manifest(output_folder):
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_label_manifest(output_folder, manifest):
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=0, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def _render_row(task):
+    # PNG mode saves in the worker and returns the file size; sheet modes return
+    # the greyscale label so the parent can impose it onto the current page.
+    equipment_id, description, description2, output_folder, logo_path, title, output_format = task
+    try:
+        if output_format == "png":
+            output_path = render_equipment_label(equipment_id, description, description2, output_folder, logo_path, title)
+            return equipment_id, None, os.path.getsize(output_path)
+        label_img = draw_equipment_label(equipment_id, description, description2, logo_path, title)
+        return equipment_id, None, label_img.convert('L')
     except Exception as e:
-        print(f"Error creating label for {equipment_id}: {str(e)}")
+        return equipment_id, str(e), None
+
+
+def _ordered_map(executor, fn, items, window):
+    # Keep at most ``window`` rows in flight and yield results in submission order,
+    # so the input can be a lazy iterator and the output order is deterministic.
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def render_labels(rows, output_folder, logo_path=None, title="EQUIPMENT LABEL", workers=None,
+                  output_format="png", labels_per_page=(2, 2), incremental=False):
+    """
+    Render labels for ``rows`` of (equipment_id, description, description2) across a
+    process pool. ``output_format`` is "png" for one file per label, or "pdf"/"tiff"
+    to tile ``labels_per_page`` (columns, rows) labels onto multi-page sheets.
+
+    With ``incremental`` (PNG only) a manifest in ``output_folder`` keyed by equipment
+    ID records a hash of each label's content; rows whose hash is unchanged and whose
+    PNG still exists are skipped, and labels for IDs no longer in ``rows`` are deleted.
+
+    Returns a summary dict with created/skipped/removed/failed counts, per-row failures,
+    files and bytes written, and labels/sec.
+    """
+    if output_format != "png" and output_format not in SHEET_FORMATS:
+        raise ValueError(f"Unsupported output format '{output_format}'")
+    if incremental and output_format != "png":
+        raise ValueError("Incremental rendering is only supported for png output")
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_folder, exist_ok=True)
+
+    manifest = load_label_manifest(output_folder) if incremental else {}
+    logo_hash = file_hash(logo_path) if incremental else ""
+    seen = set()
+    pending_hashes = {}
+    skipped = 0
+
+    def changed_rows():
+        nonlocal skipped
+        for equipment_id, description, description2 in rows:
+            if not incremental:
+                yield equipment_id, description, description2
+                continue
+            seen.add(equipment_id)
+            content_hash = label_content_hash(equipment_id, description, description2, title, logo_hash)
+            output_path = os.path.join(output_folder, f"{equipment_id}.png")
+            if manifest.get(equipment_id) == content_hash and os.path.exists(output_path):
+                skipped += 1
+                continue
+            pending_hashes[equipment_id] = content_hash
+            yield equipment_id, description, description2
+
+    tasks = ((equipment_id, description, description2, output_folder, logo_path, title, output_format)
+             for equipment_id, description, description2 in changed_rows())
+    created = 0
+    failures = []
+    png_bytes = 0
+    sheets = None
+    start = time.perf_counter()
+
+    with ExitStack() as stack:
+        if output_format != "png":
+            columns, rows_per_page = labels_per_page
+            sheets = stack.enter_context(LabelSheetWriter(output_folder, output_format, columns, rows_per_page))
+        if workers == 1:
+            results = map(_render_row, tasks)
+        else:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            results = _ordered_map(executor, _render_row, tasks, workers * 4)
+        for equipment_id, error, result in results:
+            content_hash = pending_hashes.pop(equipment_id, None)
+            if error:
+                failures.append((equipment_id, error))
+                manifest.pop(equipment_id, None)
+                continue
+            if sheets is None:
+                png_bytes += result
+            else:
+                sheets.add(result)
+            if content_hash:
+                manifest[equipment_id] = content_hash
+            created += 1
+
+    removed = 0
+    if incremental:
+        for equipment_id in [key for key in manifest if key not in seen]:
+            output_path = os.path.join(output_folder, f"{equipment_id}.png")
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            del manifest[equipment_id]
+            removed += 1
+        save_label_manifest(output_folder, manifest)
+
+    elapsed = time.perf_counter() - start
+    total = created + len(failures)
+    return {
+        "created": created,
+        "skipped": skipped,
+        "removed": removed,
+        "failed": len(failures),
+        "failures": failures,
+        "files": created if sheets is None else len(sheets.files),
+        "bytes": png_bytes if sheets is None else sheets.total_bytes,
+        "elapsed": elapsed,
+        "labels_per_sec": total / elapsed if elapsed > 0 else 0.0,
+        "workers": workers,
+    }
+
+
+def print_render_summary(summary, output_folder):
+    print(f"\nCreated {summary['created']} labels in '{output_folder}' folder "
+          f"({summary['labels_per_sec']:.1f} labels/sec on {summary['workers']} workers, "
+          f"{summary['elapsed']:.1f}s)")
+    if summary["skipped"] or summary["removed"]:
+        print(f"Skipped {summary['skipped']} unchanged labels, removed {summary['removed']} labels no longer in the sheet")
+    print(f"Wrote {summary['files']} files, {summary['bytes'] / 1024 / 1024:.1f} MB")
+    if summary["failures"]:
+        print(f"{summary['failed']} labels failed:")
+        for equipment_id, error in summary["failures"]:
+            print(f"  {equipment_id}: {error}")
+
+
+def iter_label_rows(excel_file, chunk_size=1000):
+    """Stream (equipment_id, description, functional_location) rows from the asset sheet."""
+    for chunk in iter_row_chunks(excel_file, chunk_size):
+        if 'Equipment' not in chunk.columns or 'Description' not in chunk.columns:
+            raise ValueError("Excel file must contain 'Equipment' and 'Description' columns")
+        for equipment, description, functional in zip(chunk['Equipment'], chunk['Description'], chunk["Functional Loc."]):
+            yield str(equipment), str(description), str(functional)
 
 
 def main():
@@ -157,24 +378,15 @@ def main():
     output_folder = fr"C:\\Users\egoba.kelvin\\automation scripts\\barcode"
     logo = fr"C:\\Users\egoba.kelvin\\automation scripts\\logo.png"
     title="KELLOGG NOODLES ESWATINI"
+    workers = os.cpu_count()
+    output_format = "png"  # or "pdf" / "tiff" for 2x2 label sheets
+    incremental = output_format == "png"
     
     try:
-        #
-        df = pd.read_excel(excel_file)
-        
-        
-        if 'Equipment' not in df.columns or 'Description' not in df.columns:
-            print("Error: Excel file must contain 'Equipment' and 'Description' columns")
-            return
-        
-      
-        for index, row in df.iterrows():
-            equipment_id = str(row['Equipment'])
-            description = str(row['Description'])
-            functional = str(row["Functional Loc."])
-            create_equipment_label(equipment_id, description,functional, output_folder, logo, title)
-            
-        print(f"\nSuccessfully created {len(df)} labels in '{output_folder}' folder")
+        rows = iter_label_rows(excel_file)
+        summary = render_labels(rows, output_folder, logo, title, workers=workers,
+                                output_format=output_format, incremental=incremental)
+        print_render_summary(summary, output_folder)
     
     except Exception as e:
         print(f"An error occurred: {str(e)}")
@@ -0,0 +1,264 @@
+import glob
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+
+# One cache for every workbook, so the size cap and LRU eviction cover all of it.
+DEFAULT_CACHE_DIR = os.environ.get("EXCEL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".excel_cache"))
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+TEMP_SUFFIX = ".tmp"
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExcelCache:
+    """
+    Read-through cache of parsed workbook sheets, stored as Parquet (pickle for sheets
+    Parquet cannot hold, e.g. columns mixing numbers and text) in ``cache_dir``;
+    by default ``DEFAULT_CACHE_DIR`` (``~/.excel_cache``, or the EXCEL_CACHE_DIR
+    environment variable), shared by every workbook.
+
+    Entries are keyed by the workbook's absolute path and validated by its size and
+    mtime; when those change the content hash decides, so a copied or touched but
+    identical export is still a hit. Every sheet is parsed at most once per content
+    version, and only the sheets asked for are parsed. When the cache grows past
+    ``max_bytes`` the least recently used workbooks are evicted.
+
+    Sheet files are named after the path key, content hash and sheet, so worker
+    processes reading different sheets of one workbook can fill it concurrently: a
+    changed workbook only removes finished files of other content hashes, never
+    another process's temp files, and a file that disappears mid-read or mid-write is
+    treated as a cache miss.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES, engine: str = None):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.engine = engine
+
+    def sheet_names(self, file_path: str) -> list:
+        return self._entry(file_path)["sheet_names"]
+
+    def sha256(self, file_path: str) -> str:
+        """SHA-256 of the workbook's content, only recomputed when its size or mtime changed."""
+        return self._entry(file_path)["sha256"]
+
+    def read(self, file_path: str, sheet_name=0):
+        """
+        Same as ``pd.read_excel(file_path, sheet_name=sheet_name)`` for a str, int,
+        list or None ``sheet_name``, served from the cache where possible.
+        """
+        entry = self._entry(file_path)
+        names = entry["sheet_names"]
+        if sheet_name is None:
+            requested = names
+        elif isinstance(sheet_name, (list, tuple)):
+            requested = [names[name] if isinstance(name, int) else name for name in sheet_name]
+        else:
+            requested = [names[sheet_name] if isinstance(sheet_name, int) else sheet_name]
+        for name in requested:
+            if name not in names:
+                raise ValueError(f"Worksheet named '{name}' not found")
+
+        frames = {}
+        workbook = None
+        stored = False
+        try:
+            for name in requested:
+                frame = self._load_sheet(entry, name)
+                if frame is None:
+                    if workbook is None:
+                        workbook = pd.ExcelFile(file_path, engine=self.engine)
+                    frame = workbook.parse(name)
+                    self._store_sheet(entry, name, frame)
+                    stored = True
+                frames[name] = frame
+        finally:
+            if workbook is not None:
+                workbook.close()
+        if stored:
+            self.evict(keep=entry["key"])
+
+        if sheet_name is None:
+            return frames
+        if isinstance(sheet_name, (list, tuple)):
+            return {name: frames[resolved] for name, resolved in zip(sheet_name, requested)}
+        return frames[requested[0]]
+
+    def sheet_file(self, file_path: str, sheet_name=0):
+        """
+        Path of the cached copy (.parquet or .pkl) of one sheet, parsing and caching
+        the sheet first on a miss, for callers that stream it in batches instead of
+        loading it whole. None when the sheet could not be cached.
+        """
+        entry = self._entry(file_path)
+        name = entry["sheet_names"][sheet_name] if isinstance(sheet_name, int) else sheet_name
+        path = self._existing_sheet_file(entry, name)
+        if path is None:
+            self.read(file_path, name)
+            path = self._existing_sheet_file(entry, name)
+        return path
+
+    def evict(self, keep: str = None):
+        """Delete the least recently used workbooks' sheets until the cache fits ``max_bytes``."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        groups = {}
+        for path in glob.glob(os.path.join(self.cache_dir, "*")):
+            if path.endswith(TEMP_SUFFIX):
+                continue   # still being written by some process
+            if os.path.isdir(path):
+                continue   # another tool's cache under the same root (e.g. profit_center's months)
+            key = os.path.basename(path).split("_", 1)[0].split(".", 1)[0]
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue   # evicted or replaced by another process meanwhile
+            size, last_used, paths = groups.get(key, (0, 0, []))
+            groups[key] = (size + stat.st_size, max(last_used, stat.st_mtime), paths + [path])
+        total = sum(size for size, _, _ in groups.values())
+        for key, (size, _, paths) in sorted(groups.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in paths:
+                _remove_if_present(path)
+            total -= size
+
+    def _entry(self, file_path: str) -> dict:
+        file_path = os.path.abspath(file_path)
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        cache_dir = self.cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        key = _digest(file_path)
+        entry_path = os.path.join(cache_dir, f"{key}.json")
+        stat = os.stat(file_path)
+
+        entry = None
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # No entry yet, or a corrupt one: rebuilt like a miss.
+            entry = None
+        changed = entry is None or (entry["size"], entry["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns)
+        if changed:
+            sha256 = file_sha256(file_path)
+            if entry is None or entry["sha256"] != sha256:
+                self._remove_sheets(cache_dir, key, keep_sha256=sha256)
+                with pd.ExcelFile(file_path, engine=self.engine) as workbook:
+                    entry = {"path": file_path, "sha256": sha256, "sheet_names": list(workbook.sheet_names)}
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            temp_path = f"{entry_path}.{os.getpid()}{TEMP_SUFFIX}"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, indent=0, sort_keys=True)
+            os.replace(temp_path, entry_path)
+        else:
+            # The entry file's mtime is the workbook's last-used time for eviction.
+            try:
+                os.utime(entry_path)
+            except FileNotFoundError:
+                pass
+        return dict(entry, key=key, cache_dir=cache_dir)
+
+    def _sheet_path(self, entry: dict, sheet_name: str, extension: str) -> str:
+        return os.path.join(entry["cache_dir"],
+                            f"{entry['key']}_{entry['sha256'][:16]}_{_digest(sheet_name)[:12]}{extension}")
+
+    def _existing_sheet_file(self, entry: dict, sheet_name: str):
+        for extension in (".parquet", ".pkl"):
+            path = self._sheet_path(entry, sheet_name, extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _load_sheet(self, entry: dict, sheet_name: str):
+        # A file evicted by another process between listing and reading is a miss.
+        try:
+            return pd.read_parquet(self._sheet_path(entry, sheet_name, ".parquet"))
+        except FileNotFoundError:
+            pass
+        try:
+            return pd.read_pickle(self._sheet_path(entry, sheet_name, ".pkl"))
+        except FileNotFoundError:
+            return None
+
+    def _store_sheet(self, entry: dict, sheet_name: str, frame: pd.DataFrame):
+        # Written under a temp name and renamed, so a concurrent reader never sees
+        # a partial file.
+        for extension in (".parquet", ".pkl"):
+            path = self._sheet_path(entry, sheet_name, extension)
+            temp_path = f"{path}.{os.getpid()}{TEMP_SUFFIX}"
+            try:
+                if extension == ".parquet":
+                    frame.to_parquet(temp_path, index=False)
+                else:
+                    frame.to_pickle(temp_path)
+                os.replace(temp_path, path)
+                return
+            except (ImportError, ValueError, TypeError, NotImplementedError):
+                # pyarrow missing, or columns Parquet cannot represent.
+                pass
+            except OSError:
+                # The cache changed underneath us (e.g. evicted); the sheet is simply
+                # not cached this time.
+                return
+            finally:
+                _remove_if_present(temp_path)
+
+    @staticmethod
+    def _remove_sheets(cache_dir: str, key: str, keep_sha256: str):
+        """Remove the workbook's finished sheet files of other content versions."""
+        for path in glob.glob(os.path.join(cache_dir, f"{key}_*")):
+            if path.endswith(TEMP_SUFFIX) or os.path.basename(path).split("_")[1] == keep_sha256[:16]:
+                continue
+            _remove_if_present(path)
+
+
+def _remove_if_present(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+_caches = {}
+
+
+def default_cache(engine: str = None) -> ExcelCache:
+    if engine not in _caches:
+        _caches[engine] = ExcelCache(engine=engine)
+    return _caches[engine]
+
+
+def read_excel_cached(file_path: str, sheet_name=0, engine: str = None):
+    """``pd.read_excel(file_path, sheet_name=sheet_name)`` through the default cache."""
+    return default_cache(engine).read(file_path, sheet_name)
+
+
+def excel_sheet_names(file_path: str, engine: str = None) -> list:
+    return default_cache(engine).sheet_names(file_path)
+
+
+def excel_file_sha256(file_path: str, engine: str = None) -> str:
+    return default_cache(engine).sha256(file_path)
+
+
+def cached_sheet_file(file_path: str, sheet_name=0, engine: str = None):
+    """``ExcelCache.sheet_file`` through the default cache."""
+    return default_cache(engine).sheet_file(file_path, sheet_name)
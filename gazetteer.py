@@ -0,0 +1,245 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "state_and_lga.json")
+STATE_COUNT = 37
+# Generous bounding box around Nigeria, to catch swapped or mistyped coordinates.
+LATITUDE_RANGE = (3.5, 14.5)
+LONGITUDE_RANGE = (2.5, 15.0)
+STATE_ALIASES = {"fct": "FC", "abuja": "FC", "fct abuja": "FC"}
+ENRICHED_COLUMNS = ["ADDRESS_STATE", "ADDRESS_STATE_CODE", "ADDRESS_LGA", "ADDRESS_POSTAL_CODE", "ADDRESS_VALID"]
+
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+_POSTAL_CODE = re.compile(r"(?<!\d)\d{6}(?!\d)")
+
+
+def normalize_name(text) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a place name ("Ife-Central " -> "ife central")."""
+    return " ".join(_NON_ALPHANUMERIC.sub(" ", str(text).casefold()).split())
+
+
+class State:
+    __slots__ = ("name", "code", "geopolitical_zone", "capital", "lgas")
+
+    def __init__(self, name, code, geopolitical_zone, capital):
+        self.name = name
+        self.code = code
+        self.geopolitical_zone = geopolitical_zone
+        self.capital = capital
+        self.lgas = ()
+
+    def __repr__(self):
+        return f"State({self.name!r}, {self.code!r})"
+
+
+class LGA:
+    __slots__ = ("name", "postal_code", "latitude", "longitude", "state", "index")
+
+    def __init__(self, name, postal_code, latitude, longitude, state, index):
+        self.name = name
+        self.postal_code = postal_code
+        self.latitude = latitude
+        self.longitude = longitude
+        self.state = state
+        self.index = index
+
+    def __repr__(self):
+        return f"LGA({self.name!r}, {self.state.code!r})"
+
+
+class Gazetteer:
+    """
+    Nigerian states and LGAs from state_and_lga.json, with hash indexes by state code,
+    state name, LGA name and postal code. Names are matched in normalized form (see
+    ``normalize_name``). LGA coordinates are also kept as parallel NumPy arrays
+    (``latitudes``/``longitudes``, in ``lgas`` order) for vectorized distance work.
+    """
+
+    def __init__(self, records: list):
+        self.states = []
+        self.lgas = []
+        self.states_by_code = {}
+        self.states_by_name = {}
+        self.lgas_by_name = {}
+        self.lgas_by_postal_code = {}
+
+        for record in records:
+            state = State(record["state"], record["code"], record["geopolitical_zone"], record["capital"])
+            state_lgas = []
+            for lga_record in record["lgas"]:
+                lga = LGA(lga_record["name"], str(lga_record["postal_code"]), float(lga_record["latitude"]),
+                          float(lga_record["longitude"]), state, len(self.lgas))
+                self.lgas.append(lga)
+                state_lgas.append(lga)
+                self.lgas_by_name.setdefault(normalize_name(lga.name), []).append(lga)
+                self.lgas_by_postal_code.setdefault(lga.postal_code, []).append(lga)
+            state.lgas = tuple(state_lgas)
+            self.states.append(state)
+            self.states_by_code[state.code.upper()] = state
+            self.states_by_name[normalize_name(state.name)] = state
+        for alias, code in STATE_ALIASES.items():
+            if code in self.states_by_code:
+                self.states_by_name.setdefault(alias, self.states_by_code[code])
+
+        # Lists were only needed while loading; tuples are smaller and immutable.
+        self.lgas_by_name = {name: tuple(lgas) for name, lgas in self.lgas_by_name.items()}
+        self.lgas_by_postal_code = {code: tuple(lgas) for code, lgas in self.lgas_by_postal_code.items()}
+        self.latitudes = np.array([lga.latitude for lga in self.lgas], dtype=np.float64)
+        self.longitudes = np.array([lga.longitude for lga in self.lgas], dtype=np.float64)
+        self._max_name_words = max(len(name.split()) for name in [*self.lgas_by_name, *self.states_by_name])
+
+    @classmethod
+    def from_json(cls, path: str = DEFAULT_GAZETTEER_PATH) -> "Gazetteer":
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        problems = validate_records(records)
+        if problems:
+            raise ValueError(f"Invalid gazetteer {path}:\n  " + "\n  ".join(problems))
+        return cls(records)
+
+    def state(self, code_or_name):
+        """The State with this code ("LA") or name ("lagos", "Akwa-Ibom", "FCT"), or None."""
+        if code_or_name is None:
+            return None
+        return (self.states_by_code.get(str(code_or_name).strip().upper())
+                or self.states_by_name.get(normalize_name(code_or_name)))
+
+    def lgas_named(self, name, state=None) -> tuple:
+        """Every LGA with this name (several states share names such as Surulere), optionally in ``state``."""
+        lgas = self.lgas_by_name.get(normalize_name(name), ())
+        if state is not None:
+            state = state if isinstance(state, State) else self.state(state)
+            lgas = tuple(lga for lga in lgas if lga.state is state)
+        return lgas
+
+    def lga(self, name, state=None):
+        """The LGA with this name (in ``state``), or None when there is none or it is ambiguous."""
+        lgas = self.lgas_named(name, state)
+        return lgas[0] if len(lgas) == 1 else None
+
+    def lgas_by_postal(self, postal_code) -> tuple:
+        return self.lgas_by_postal_code.get(str(postal_code).strip(), ())
+
+    def resolve_address(self, address):
+        """
+        Find the state and LGA named in a free-text address. Returns
+        (state, lga, postal_code, valid); ``valid`` is False when nothing was found or
+        the LGA, postal code and stated state disagree.
+
+        The address is normalized and every run of up to the longest place name's
+        word count is looked up in the name indexes, longest first; a six-digit
+        postal code is looked up directly.
+        """
+        if address is None or (isinstance(address, float) and np.isnan(address)):
+            return None, None, None, False
+        words = normalize_name(address).split()
+        mentions = []   # (state or None, LGAs with that name), in address order
+        position = 0
+        while position < len(words):
+            for size in range(min(self._max_name_words, len(words) - position), 0, -1):
+                phrase = " ".join(words[position:position + size])
+                state = self.states_by_name.get(phrase)
+                lgas = self.lgas_by_name.get(phrase, ())
+                if state is not None or lgas:
+                    mentions.append((state, lgas))
+                    position += size
+                    break
+            else:
+                position += 1
+
+        # The last state named is the address's state; names such as "Nasarawa" are
+        # both a state and an LGA, and count as the LGA only when not used as the state.
+        state_mention = next((i for i in reversed(range(len(mentions))) if mentions[i][0] is not None), None)
+        state = mentions[state_mention][0] if state_mention is not None else None
+        lga_candidates = [lgas for i, (_, lgas) in enumerate(mentions) if lgas and i != state_mention]
+
+        postal_match = _POSTAL_CODE.search(str(address))
+        postal_lgas = self.lgas_by_postal(postal_match.group()) if postal_match else ()
+        lga = None
+        for lgas in reversed(lga_candidates):
+            in_state = [candidate for candidate in lgas if state is None or candidate.state is state]
+            if len(in_state) == 1:
+                lga = in_state[0]
+                break
+        if lga is None and len(postal_lgas) == 1 and (state is None or postal_lgas[0].state is state):
+            lga = postal_lgas[0]
+
+        # An LGA named in the address that does not exist in the stated state.
+        conflict = (lga is None and state is not None and lga_candidates
+                    and not any(candidate.state is state for lgas in lga_candidates for candidate in lgas))
+        valid = (lga is not None or state is not None) and not conflict
+        if lga is not None:
+            state = lga.state
+        if postal_lgas and state is not None and all(candidate.state is not state for candidate in postal_lgas):
+            valid = False
+        postal_code = postal_match.group() if postal_match else (lga.postal_code if lga is not None else None)
+        return state, lga, postal_code, valid
+
+    def enrich_addresses(self, df: pd.DataFrame, column: str = "ADDRESS", resolve=None) -> pd.DataFrame:
+        """
+        Return ``df`` with ADDRESS_STATE, ADDRESS_STATE_CODE, ADDRESS_LGA,
+        ADDRESS_POSTAL_CODE and ADDRESS_VALID columns resolved from ``column``.
+        Each distinct address is resolved once, so repeated addresses cost a dict
+        lookup. ``resolve`` replaces ``resolve_address`` (e.g. a fuzzy matcher's).
+        """
+        resolve = resolve or self.resolve_address
+        addresses = df[column]
+        codes, uniques = pd.factorize(addresses, use_na_sentinel=True)
+        resolved = [resolve(address) for address in uniques]
+        rows = [(state.name if state else None, state.code if state else None, lga.name if lga else None,
+                 postal_code, valid) for state, lga, postal_code, valid in resolved]
+        rows.append((None, None, None, None, False))   # position -1: missing addresses
+        table = pd.DataFrame(rows, columns=ENRICHED_COLUMNS)
+        enriched = table.iloc[np.where(codes < 0, len(rows) - 1, codes)].reset_index(drop=True)
+        enriched.index = df.index
+        return pd.concat([df, enriched], axis=1)
+
+
+def validate_records(records) -> list:
+    """Problems with the gazetteer JSON (missing keys, duplicate codes, bad coordinates); empty when valid."""
+    problems = []
+    if not isinstance(records, list):
+        return ["top level is not a list of states"]
+    if len(records) != STATE_COUNT:
+        problems.append(f"expected {STATE_COUNT} states, found {len(records)}")
+    codes = set()
+    for record in records:
+        missing = {"state", "code", "geopolitical_zone", "capital", "lgas"} - set(record)
+        if missing:
+            problems.append(f"{record.get('state', record)}: missing {sorted(missing)}")
+            continue
+        if record["code"] in codes:
+            problems.append(f"{record['state']}: duplicate state code {record['code']}")
+        codes.add(record["code"])
+        names = set()
+        for lga in record["lgas"]:
+            where = f"{record['state']}/{lga.get('name')}"
+            if {"name", "postal_code", "latitude", "longitude"} - set(lga):
+                problems.append(f"{where}: missing LGA keys")
+                continue
+            if normalize_name(lga["name"]) in names:
+                problems.append(f"{where}: duplicate LGA name")
+            names.add(normalize_name(lga["name"]))
+            if not re.fullmatch(r"\d{6}", str(lga["postal_code"])):
+                problems.append(f"{where}: postal code {lga['postal_code']!r} is not six digits")
+            try:
+                latitude, longitude = float(lga["latitude"]), float(lga["longitude"])
+            except (TypeError, ValueError):
+                problems.append(f"{where}: non-numeric coordinates")
+                continue
+            if not (LATITUDE_RANGE[0] <= latitude <= LATITUDE_RANGE[1]
+                    and LONGITUDE_RANGE[0] <= longitude <= LONGITUDE_RANGE[1]):
+                problems.append(f"{where}: coordinates ({latitude}, {longitude}) outside Nigeria")
+    return problems
+
+
+@lru_cache(maxsize=4)
+def load_gazetteer(path: str = DEFAULT_GAZETTEER_PATH) -> Gazetteer:
+    """The gazetteer for ``path``, parsed and indexed once per process."""
+    return Gazetteer.from_json(path)
@@ -0,0 +1,72 @@
+from functools import lru_cache
+from PIL import Image, ImageDraw
+
+
+WIDTH_CACHE_SIZE = 65536
+
+# Same kind of draw context the labels are rendered on, so measurements match
+# draw.textlength() on the label canvas exactly.
+_measure_draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+
+
+@lru_cache(maxsize=WIDTH_CACHE_SIZE)
+def text_width(font, text):
+    """Width of ``text`` in ``font``; cached per (font, text) with an LRU bound."""
+    return _measure_draw.textlength(text, font=font)
+
+
+def _wrap_line_exact(words, start, font, max_width):
+    # The original algorithm: re-measure the growing line for every word.
+    end = start
+    line = ''
+    while end < len(words) and text_width(font, line + words[end]) <= max_width:
+        line += words[end] + ' '
+        end += 1
+    return end
+
+
+def wrap_text(text, font, max_width):
+    """
+    Greedy word wrap that produces the same lines as measuring each growing line,
+    but measures each word once and builds line widths from summed word widths.
+
+    Summed widths ignore kerning across the spaces, so every line break is
+    confirmed by measuring the final line and the line plus the next word; if
+    either disagrees the line is re-wrapped with exact measurements.
+    A single word wider than ``max_width`` is placed on a line of its own.
+    """
+    lines = []
+    words = text.split()
+    space = text_width(font, ' ')
+    start = 0
+    while start < len(words):
+        line_width = text_width(font, words[start])
+        end = start + 1
+        while end < len(words):
+            candidate = line_width + space + text_width(font, words[end])
+            if candidate > max_width:
+                break
+            line_width = candidate
+            end += 1
+
+        fits = text_width(font, ' '.join(words[start:end])) <= max_width
+        overflows = end == len(words) or text_width(font, ' '.join(words[start:end + 1])) > max_width
+        if not (fits and overflows):
+            end = _wrap_line_exact(words, start, font, max_width)
+        if end == start:
+            end = start + 1
+
+        lines.append(' '.join(words[start:end]))
+        start = end
+    return lines
+
+
+def layout_batch(texts, font, max_width):
+    """
+    Wrap many texts in one font, measuring every distinct word once up front.
+    Returns one list of lines per input text.
+    """
+    texts = list(texts)
+    for word in {word for text in texts for word in text.split()}:
+        text_width(font, word)
+    return [wrap_text(text, font, max_width) for text in texts]
@@ -0,0 +1,98 @@
+import os
+from PIL import Image, TiffImagePlugin
+
+
+# A4 at the 300 dpi (11.81 px/mm) the labels are laid out at.
+A4_PAGE_SIZE = (2480, 3508)
+SHEET_FORMATS = ("pdf", "tiff")
+
+
+class LabelSheetWriter:
+    """
+    Tile rendered labels ``columns`` x ``rows`` per page and stream the pages to
+    multi-page PDF or TIFF files as each page fills, so only one page is held in
+    memory however many labels are written. A new file is started every
+    ``pages_per_file`` pages (``labels_0001.pdf``, ``labels_0002.pdf``, ...).
+    """
+
+    def __init__(self, output_folder, fmt="pdf", columns=2, rows=2, page_size=A4_PAGE_SIZE,
+                 dpi=300, pages_per_file=250, basename="labels"):
+        if fmt not in SHEET_FORMATS:
+            raise ValueError(f"Unsupported sheet format '{fmt}', expected one of {SHEET_FORMATS}")
+        self.output_folder = output_folder
+        self.fmt = fmt
+        self.columns = columns
+        self.rows = rows
+        self.page_size = page_size
+        self.dpi = dpi
+        self.pages_per_file = pages_per_file
+        self.basename = basename
+        self.files = []
+        self._page = None
+        self._slot = 0
+        self._pages_in_file = 0
+        self._tiff = None
+        os.makedirs(output_folder, exist_ok=True)
+
+    def add(self, label_img):
+        if self._page is None:
+            self._page = Image.new('L', self.page_size, 255)
+        x, y = self._slot_position(self._slot, label_img.size)
+        self._page.paste(label_img, (x, y))
+        self._slot += 1
+        if self._slot == self.columns * self.rows:
+            self._flush_page()
+
+    def close(self):
+        if self._page is not None:
+            self._flush_page()
+        self._close_tiff()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def total_bytes(self):
+        return sum(os.path.getsize(path) for path in self.files if os.path.exists(path))
+
+    def _slot_position(self, slot, label_size):
+        label_width, label_height = label_size
+        page_width, page_height = self.page_size
+        grid_width, grid_height = self.columns * label_width, self.rows * label_height
+        if grid_width > page_width or grid_height > page_height:
+            raise ValueError(f"{self.columns}x{self.rows} labels of {label_size} do not fit a {self.page_size} page")
+        gutter_x = (page_width - grid_width) // (self.columns + 1)
+        gutter_y = (page_height - grid_height) // (self.rows + 1)
+        column, row = slot % self.columns, slot // self.columns
+        return (gutter_x + column * (label_width + gutter_x),
+                gutter_y + row * (label_height + gutter_y))
+
+    def _flush_page(self):
+        if self._pages_in_file == 0:
+            self._close_tiff()
+            self.files.append(os.path.join(self.output_folder, f"{self.basename}_{len(self.files) + 1:04d}.{self.fmt}"))
+        path = self.files[-1]
+
+        if self.fmt == "pdf":
+            # Appending writes an incremental update; earlier pages are not rewritten.
+            self._page.save(path, "PDF", resolution=self.dpi, quality=95,
+                            append=self._pages_in_file > 0)
+        else:
+            if self._tiff is None:
+                self._tiff = TiffImagePlugin.AppendingTiffWriter(path, new=True)
+            self._page.save(self._tiff, "TIFF", compression="tiff_adobe_deflate", dpi=(self.dpi, self.dpi))
+            self._tiff.newFrame()
+
+        self._page = None
+        self._slot = 0
+        self._pages_in_file += 1
+        if self._pages_in_file == self.pages_per_file:
+            self._pages_in_file = 0
+
+    def _close_tiff(self):
+        if self._tiff is not None:
+            self._tiff.close()
+            self._tiff = None
@@ -0,0 +1,151 @@
+import numpy as np
+
+from gazetteer import Gazetteer, load_gazetteer
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:   # scipy is optional; without it queries fall back to brute force
+    cKDTree = None
+
+
+EARTH_RADIUS_KM = 6371.0088
+# Points per block in the brute-force search, bounding its distance matrix to
+# BRUTE_FORCE_BLOCK x number-of-LGAs floats.
+BRUTE_FORCE_BLOCK = 4096
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between points given in degrees; NumPy broadcasting applies."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def unit_vectors(latitudes, longitudes) -> np.ndarray:
+    """
+    (n, 3) points on the unit sphere. Straight-line (chord) distance between them
+    grows with great-circle distance, so a Euclidean KD-tree finds true nearest points.
+    """
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def valid_points(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Mask of points with finite, in-range coordinates (|lat| <= 90, |lon| <= 180)."""
+    with np.errstate(invalid="ignore"):
+        return (np.isfinite(latitudes) & np.isfinite(longitudes)
+                & (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180))
+
+
+def chord_for_km(radius_km: float) -> float:
+    return 2 * np.sin(min(radius_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+class LGALocator:
+    """
+    Reverse geocoding against the gazetteer's LGA coordinates: nearest LGA(s) to a
+    point and LGAs within a radius, for single points or NumPy arrays of points.
+
+    The LGAs are indexed in a KD-tree over unit vectors when scipy is installed;
+    distances reported are haversine km. Points with NaN or out-of-range
+    coordinates get index -1 and distance NaN (and no LGAs within any radius). Some LGAs share coordinates in the JSON; which of two
+    equidistant LGAs comes first is not specified. ``brute_force_nearest`` computes
+    the same answers from the full distance matrix and is the reference for checking
+    the index.
+    """
+
+    def __init__(self, gazetteer: Gazetteer = None):
+        self.gazetteer = gazetteer or load_gazetteer()
+        self.lgas = self.gazetteer.lgas
+        self.latitudes = self.gazetteer.latitudes
+        self.longitudes = self.gazetteer.longitudes
+        self.tree = cKDTree(unit_vectors(self.latitudes, self.longitudes)) if cKDTree is not None else None
+
+    def nearest(self, latitude: float, longitude: float):
+        """(LGA, distance_km) of the LGA nearest to the point, or (None, nan) for an invalid point."""
+        indices, distances = self.nearest_batch([latitude], [longitude])
+        return (self.lgas[indices[0]] if indices[0] >= 0 else None), float(distances[0])
+
+    def nearest_batch(self, latitudes, longitudes, k: int = 1):
+        """
+        Indices into ``lgas`` and haversine distances (km) of the ``k`` nearest LGAs to
+        every point, shaped (n,) for k=1 and (n, k) otherwise.
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        if self.tree is None:
+            return self.brute_force_nearest(latitudes, longitudes, k)
+
+        shape = (len(latitudes),) if k == 1 else (len(latitudes), k)
+        indices = np.full(shape, -1, dtype=np.int64)
+        distances = np.full(shape, np.nan)
+        valid = valid_points(latitudes, longitudes)
+        if valid.any():
+            _, found = self.tree.query(unit_vectors(latitudes[valid], longitudes[valid]), k=k)
+            indices[valid] = found
+            lat, lon = latitudes[valid], longitudes[valid]
+            if k != 1:
+                lat, lon = lat[:, None], lon[:, None]
+            distances[valid] = haversine_km(lat, lon, self.latitudes[found], self.longitudes[found])
+        return indices, distances
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float) -> list:
+        """[(LGA, distance_km), ...] for every LGA within ``radius_km`` of the point, nearest first."""
+        indices, distances = self.within_radius_batch([latitude], [longitude], radius_km)[0]
+        return [(self.lgas[i], float(d)) for i, d in zip(indices, distances)]
+
+    def within_radius_batch(self, latitudes, longitudes, radius_km: float) -> list:
+        """For every point, (indices, distances_km) of the LGAs within ``radius_km``, nearest first."""
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        if self.tree is None:
+            return self.brute_force_within_radius(latitudes, longitudes, radius_km)
+
+        valid = valid_points(latitudes, longitudes)
+        candidates = [[] for _ in range(len(latitudes))]
+        if valid.any():
+            # A little slack on the chord so float rounding never drops an LGA that
+            # sits exactly on the radius; the haversine filter below is exact.
+            found = self.tree.query_ball_point(unit_vectors(latitudes[valid], longitudes[valid]),
+                                               chord_for_km(radius_km) * (1 + 1e-9))
+            for position, point_candidates in zip(np.flatnonzero(valid), found):
+                candidates[position] = point_candidates
+        return [self._filter_radius(latitudes[i], longitudes[i], np.asarray(c, dtype=np.int64), radius_km)
+                for i, c in enumerate(candidates)]
+
+    def brute_force_nearest(self, latitudes, longitudes, k: int = 1):
+        """Reference ``nearest_batch``: haversine to every LGA, in blocks of points."""
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        shape = (len(latitudes),) if k == 1 else (len(latitudes), k)
+        indices = np.full(shape, -1, dtype=np.int64)
+        distances = np.full(shape, np.nan)
+        for start in range(0, len(latitudes), BRUTE_FORCE_BLOCK):
+            block = slice(start, start + BRUTE_FORCE_BLOCK)
+            lat, lon = latitudes[block], longitudes[block]
+            valid = valid_points(lat, lon)
+            matrix = haversine_km(lat[valid, None], lon[valid, None], self.latitudes, self.longitudes)
+            if k == 1:
+                order = np.argmin(matrix, axis=1)[:, None]
+            else:
+                order = np.argsort(matrix, axis=1, kind="stable")[:, :k]
+            nearest = np.take_along_axis(matrix, order, axis=1)
+            positions = np.flatnonzero(valid) + start
+            indices[positions] = order[:, 0] if k == 1 else order
+            distances[positions] = nearest[:, 0] if k == 1 else nearest
+        return indices, distances
+
+    def brute_force_within_radius(self, latitudes, longitudes, radius_km: float) -> list:
+        """Reference ``within_radius_batch``."""
+        every_lga = np.arange(len(self.lgas), dtype=np.int64)
+        return [self._filter_radius(lat, lon, every_lga, radius_km)
+                for lat, lon in zip(np.asarray(latitudes, dtype=np.float64), np.asarray(longitudes, dtype=np.float64))]
+
+    def _filter_radius(self, latitude, longitude, candidates: np.ndarray, radius_km: float):
+        if not valid_points(np.float64(latitude), np.float64(longitude)) or len(candidates) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        distances = haversine_km(latitude, longitude, self.latitudes[candidates], self.longitudes[candidates])
+        inside = distances <= radius_km
+        order = np.lexsort((candidates[inside], distances[inside]))
+        return candidates[inside][order], distances[inside][order]
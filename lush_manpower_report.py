@@ -1,21 +1,64 @@
 import pandas as pd
 import os
+import sys
+import time
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
-
-from sqlalchemy.dialects.oracle import VARCHAR2, DATE 
 
 from sqlalchemy.types import VARCHAR, Integer, Date
 
+from excel_cache import cached_sheet_file
+from row_reader import iter_row_chunks
+
+
+LUSH_DTYPES = {
+    'ID': Integer(),
+    'NAME': VARCHAR(100),
+    'CADRE': VARCHAR(50),
+    'DEPT': VARCHAR(50),
+    'DIV': VARCHAR(50),
+    'RMK': VARCHAR(200),
+    'SAPID': VARCHAR(20),
+    'DOB': Date(),
+    'NIN': VARCHAR(20),
+    'BANK_NAME': VARCHAR(100),
+    'ACC_NO': VARCHAR(50),
+    'MEAL': VARCHAR(50),
+    'GENDER': VARCHAR(10),
+    'ADDRESS': VARCHAR(200),
+    'GROUP': VARCHAR(50),
+    'CURRENT_SHIFT': VARCHAR(50),
+    'OT1': VARCHAR(50),
+    'OT2': VARCHAR(50),
+    'OLD_ID': VARCHAR(20),
+    'ACCESS_GROUP': VARCHAR(50),
+    'START_DATE': Date(),
+    'END_DATE': Date(),
+    'STATUS': VARCHAR(20),
+    'LEVEL': VARCHAR(20)
+}
+
+ORACLE_DRIVERS = ("cx_Oracle", "oracledb")
+# Content hash of the non-key columns, used by the upsert load to skip unchanged rows.
+ROW_HASH_COLUMN = "ROW_HASH"
+KEY_COLUMN = "ID"
+LOAD_METHODS = ("bulk", "upsert", "to_sql")
+
+
 
 
 
+def iter_workbook_chunks(file_path: str, chunk_size: int, use_cache: bool = True):
+    """
+    The first sheet of ``file_path`` as DataFrames of at most ``chunk_size`` rows.
 
-def read_excel_file(file_path: str) -> pd.DataFrame:
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
-    return pd.read_excel(file_path)
+    With ``use_cache`` the sheet's cached Parquet copy is streamed in batches, so an
+    unchanged workbook is never parsed again; a workbook that is not cached yet is
+    parsed once into the cache first. Without it the workbook itself is streamed
+    (see row_reader.iter_row_chunks), which bounds memory on the first read too.
+    """
+    sheet_path = cached_sheet_file(file_path) if use_cache else None
+    yield from iter_row_chunks(sheet_path or file_path, chunk_size)
 
 
 
@@ -72,7 +115,8 @@ def check_and_create_table(engine: 'sqlalchemy.engine.Engine', table_name: str):
             'START_DATE': 'DATE',
             'END_DATE': 'DATE',
             'STATUS': 'VARCHAR2(20)',
-            'LEVEL': 'VARCHAR2(20)'
+            'LEVEL': 'VARCHAR2(20)',
+            ROW_HASH_COLUMN: 'VARCHAR2(64)'
         }
         columns = ', '.join([f'"{col}" {dtype}' for col, dtype in dtype_mapping.items()])
 
@@ -91,38 +135,22 @@ def check_and_create_table(engine: 'sqlalchemy.engine.Engine', table_name: str):
 
 
 
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = df.columns.str.strip().str.replace(' ', '_').str.upper()
+    return df
+
+
+def _rows_per_sec(rows: int, elapsed: float) -> float:
+    return rows / elapsed if elapsed > 0 else 0.0
+
+
 def load_data_to_oracle(df: pd.DataFrame, engine: 'sqlalchemy.engine.Engine', table_name: str):
     try:
-        df.columns = df.columns.str.strip().str.replace(' ', '_').str.upper()
-        dtype_mapping = {
-            'ID': Integer(),
-            'NAME': VARCHAR(100),
-            'CADRE': VARCHAR(50),
-            'DEPT': VARCHAR(50),
-            'DIV': VARCHAR(50),
-            'RMK': VARCHAR(200),
-            'SAPID': VARCHAR(20),
-            'DOB': Date(),
-            'NIN': VARCHAR(20),
-            'BANK_NAME': VARCHAR(100),
-            'ACC_NO': VARCHAR(50),
-            'MEAL': VARCHAR(50),
-            'GENDER': VARCHAR(10),
-            'ADDRESS': VARCHAR(200),
-            'GROUP': VARCHAR(50),
-            'CURRENT_SHIFT': VARCHAR(50),
-            'OT1': VARCHAR(50),
-            'OT2': VARCHAR(50),
-            'OLD_ID': VARCHAR(20),
-            'ACCESS_GROUP': VARCHAR(50),
-            'START_DATE': Date(),
-            'END_DATE': Date(),
-            'STATUS': VARCHAR(20),
-            'LEVEL': VARCHAR(20)
-        }
-
-        df.to_sql(table_name, engine, if_exists='append', index=False, chunksize=1000, dtype=dtype_mapping)
-        print(f"Successfully loaded {len(df)} rows to table '{table_name}'.")
+        normalize_columns(df)
+        start = time.perf_counter()
+        df.to_sql(table_name, engine, if_exists='append', index=False, chunksize=1000, dtype=LUSH_DTYPES)
+        elapsed = time.perf_counter() - start
+        print(f"Successfully loaded {len(df)} rows to table '{table_name}' ({_rows_per_sec(len(df), elapsed):.0f} rows/sec).")
     except SQLAlchemyError as e:
         print(f"Error loading data to Oracle: {str(e)}")
         raise
@@ -132,6 +160,234 @@ def load_data_to_oracle(df: pd.DataFrame, engine: 'sqlalchemy.engine.Engine', ta
 
 
 
+def _driver_connection(connection):
+    # Unwrap SQLAlchemy's pooled connection proxy to the underlying DB-API connection.
+    for attr in ("driver_connection", "dbapi_connection"):
+        inner = getattr(connection, attr, None)
+        if inner is not None:
+            return inner
+    return connection
+
+
+def _dbapi_module(connection):
+    return sys.modules[type(connection).__module__.split(".")[0]]
+
+
+def input_sizes_for(columns: list, dbapi) -> list:
+    """Bind sizes/types for ``cursor.setinputsizes`` derived from LUSH_DTYPES."""
+    sizes = []
+    for column in columns:
+        sql_type = LUSH_DTYPES.get(column)
+        if column == ROW_HASH_COLUMN:
+            sizes.append(64)
+        elif isinstance(sql_type, VARCHAR):
+            sizes.append(sql_type.length)
+        elif isinstance(sql_type, Date):
+            sizes.append(getattr(dbapi, "DATETIME", None))
+        elif isinstance(sql_type, Integer):
+            sizes.append(getattr(dbapi, "NUMBER", None))
+        else:
+            sizes.append(None)
+    return sizes
+
+
+def set_input_sizes(cursor, columns: list, dbapi):
+    input_sizes = input_sizes_for(columns, dbapi)
+    if dbapi.__name__ in ORACLE_DRIVERS:
+        cursor.setinputsizes(*input_sizes)
+    else:
+        cursor.setinputsizes(input_sizes)  # DB-API form; a no-op on sqlite3
+
+
+def _varchar_text(value) -> str:
+    # Excel hands back numeric IDs (NIN, ACC_NO, SAPID, ...) as int or float; whole
+    # floats are written without the trailing ".0", as to_sql stored them.
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def to_bind_rows(df: pd.DataFrame) -> list:
+    """
+    Plain Python tuples for executemany: NaN/NaT become None, timestamps become
+    datetimes, and values of VARCHAR columns become text, since Oracle drivers reject
+    a number bound to the string variables declared by set_input_sizes.
+    """
+    values = df.astype(object)
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            # to_pydatetime may return a Series indexed from 0 (pandas 3); take the bare
+            # values so a batch sliced from the middle of the frame keeps its dates.
+            values[column] = pd.Series(list(df[column].dt.to_pydatetime()), index=df.index, dtype=object)
+        elif isinstance(LUSH_DTYPES.get(column), VARCHAR):
+            values[column] = values[column].map(_varchar_text, na_action="ignore").astype(object)
+    values = values.where(df.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+def insert_statement(table_name: str, columns: list, paramstyle: str) -> str:
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    if paramstyle == "qmark":
+        placeholders = ", ".join("?" for _ in columns)
+    else:
+        placeholders = ", ".join(f":{i + 1}" for i in range(len(columns)))
+    return f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})"
+
+
+def bulk_load_to_oracle(df: pd.DataFrame, connection, table_name: str, batch_size: int = 10000):
+    """
+    Insert ``df`` with ``cursor.executemany`` array binding, ``batch_size`` rows per
+    round trip, with input sizes pre-declared from LUSH_DTYPES.
+
+    ``connection`` is any DB-API connection (cx_Oracle, python-oracledb, sqlite3) or a
+    SQLAlchemy raw connection wrapping one.
+    """
+    connection = _driver_connection(connection)
+    dbapi = _dbapi_module(connection)
+    normalize_columns(df)
+    columns = list(df.columns)
+    sql = insert_statement(table_name, columns, dbapi.paramstyle)
+
+    start = time.perf_counter()
+    cursor = connection.cursor()
+    try:
+        set_input_sizes(cursor, columns, dbapi)
+        for offset in range(0, len(df), batch_size):
+            cursor.executemany(sql, to_bind_rows(df.iloc[offset:offset + batch_size]))
+        connection.commit()
+    except Exception as e:
+        connection.rollback()
+        print(f"Error bulk loading data to Oracle: {str(e)}")
+        raise
+    finally:
+        cursor.close()
+    elapsed = time.perf_counter() - start
+    print(f"Successfully loaded {len(df)} rows to table '{table_name}' ({_rows_per_sec(len(df), elapsed):.0f} rows/sec).")
+
+
+def ensure_row_hash_column(engine: 'sqlalchemy.engine.Engine', table_name: str):
+    """Add the ROW_HASH column to tables created before the upsert load existed."""
+    columns = {column["name"].upper() for column in inspect(engine).get_columns(table_name)}
+    if ROW_HASH_COLUMN in columns:
+        return
+    if engine.dialect.name == "oracle":
+        ddl = f'ALTER TABLE {table_name} ADD ("{ROW_HASH_COLUMN}" VARCHAR2(64))'
+    else:
+        ddl = f'ALTER TABLE {table_name} ADD COLUMN "{ROW_HASH_COLUMN}" VARCHAR(64)'
+    with engine.connect() as conn:
+        conn.execute(text(ddl))
+        conn.commit()
+    print(f"Added column '{ROW_HASH_COLUMN}' to table '{table_name}'.")
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """Stable per-row hash of every non-key column, as 16 hex characters."""
+    columns = [column for column in df.columns if column not in (KEY_COLUMN, ROW_HASH_COLUMN)]
+    values = df[columns].astype(object).where(df[columns].notna(), "").astype(str)
+    return pd.util.hash_pandas_object(values, index=False).map("{:016x}".format)
+
+
+def fetch_row_hashes(connection, table_name: str) -> dict:
+    """Map of ID -> ROW_HASH for the rows already in ``table_name``."""
+    cursor = _driver_connection(connection).cursor()
+    try:
+        cursor.execute(f'SELECT "{KEY_COLUMN}", "{ROW_HASH_COLUMN}" FROM {table_name}')
+        hashes = {}
+        while True:
+            rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            hashes.update(rows)
+        return hashes
+    finally:
+        cursor.close()
+
+
+def _table_exists(cursor, table_name: str, driver: str) -> bool:
+    if driver in ORACLE_DRIVERS:
+        cursor.execute("SELECT COUNT(*) FROM user_tables WHERE table_name = :1", [table_name.upper()])
+    else:
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", [table_name])
+    return cursor.fetchone()[0] > 0
+
+
+def merge_statement(table_name: str, staging_table: str, columns: list, driver: str) -> str:
+    """Set-based upsert of every staging row into ``table_name`` keyed on ID."""
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    updates = [column for column in columns if column != KEY_COLUMN]
+    if driver in ORACLE_DRIVERS:
+        set_list = ", ".join(f't."{column}" = s."{column}"' for column in updates)
+        value_list = ", ".join(f's."{column}"' for column in columns)
+        return (f'MERGE INTO {table_name} t USING {staging_table} s ON (t."{KEY_COLUMN}" = s."{KEY_COLUMN}") '
+                f'WHEN MATCHED THEN UPDATE SET {set_list} '
+                f'WHEN NOT MATCHED THEN INSERT ({column_list}) VALUES ({value_list})')
+    set_list = ", ".join(f'"{column}" = excluded."{column}"' for column in updates)
+    return (f'INSERT INTO {table_name} ({column_list}) SELECT {column_list} FROM {staging_table} WHERE 1 = 1 '
+            f'ON CONFLICT("{KEY_COLUMN}") DO UPDATE SET {set_list}')
+
+
+def upsert_to_oracle(df: pd.DataFrame, connection, table_name: str, existing_hashes: dict = None,
+                     batch_size: int = 10000) -> dict:
+    """
+    Upsert ``df`` into ``table_name`` keyed on ID, sending only rows whose content
+    hash differs from the ROW_HASH already stored. Changed rows are bulk-inserted
+    into ``<table_name>_STG`` and applied with one MERGE (``INSERT ... ON CONFLICT``
+    on SQLite), so the work scales with the number of changed rows.
+
+    ``existing_hashes`` (ID -> ROW_HASH) is fetched when not given and is updated in
+    place, so it can be shared across the chunks of one load.
+    Returns inserted/updated/unchanged counts.
+    """
+    connection = _driver_connection(connection)
+    dbapi = _dbapi_module(connection)
+    driver = dbapi.__name__
+    staging_table = f"{table_name}_STG"
+    if existing_hashes is None:
+        existing_hashes = fetch_row_hashes(connection, table_name)
+
+    normalize_columns(df)
+    df = df.drop_duplicates(KEY_COLUMN, keep="last").copy()
+    df[ROW_HASH_COLUMN] = row_hashes(df).values
+    stored = df[KEY_COLUMN].map(existing_hashes)
+    changed = df[stored.values != df[ROW_HASH_COLUMN].values]
+    # An ID stored with a NULL ROW_HASH (loaded before the column existed) is an
+    # update, not an insert.
+    inserted = int((~changed[KEY_COLUMN].isin(existing_hashes.keys())).sum())
+    counts = {
+        "inserted": inserted,
+        "updated": len(changed) - inserted,
+        "unchanged": len(df) - len(changed),
+    }
+
+    start = time.perf_counter()
+    cursor = connection.cursor()
+    try:
+        if not _table_exists(cursor, staging_table, driver):
+            cursor.execute(f"CREATE TABLE {staging_table} AS SELECT * FROM {table_name} WHERE 1 = 0")
+        if len(changed):
+            columns = list(changed.columns)
+            cursor.execute(f"DELETE FROM {staging_table}")
+            insert_sql = insert_statement(staging_table, columns, dbapi.paramstyle)
+            set_input_sizes(cursor, columns, dbapi)
+            for offset in range(0, len(changed), batch_size):
+                cursor.executemany(insert_sql, to_bind_rows(changed.iloc[offset:offset + batch_size]))
+            cursor.execute(merge_statement(table_name, staging_table, columns, driver))
+            cursor.execute(f"DELETE FROM {staging_table}")
+        connection.commit()
+    except Exception as e:
+        connection.rollback()
+        print(f"Error upserting data to Oracle: {str(e)}")
+        raise
+    finally:
+        cursor.close()
+
+    existing_hashes.update(zip(changed[KEY_COLUMN], changed[ROW_HASH_COLUMN]))
+    elapsed = time.perf_counter() - start
+    print(f"Upserted into '{table_name}': {counts['inserted']} inserted, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged ({_rows_per_sec(len(changed), elapsed):.0f} changed rows/sec).")
+    return counts
+
+
 def main(config):
     print(config)
     table_name = "lush_employee_data"
@@ -154,13 +410,17 @@ def main(config):
     oracle_host = config["oracle_host"]
     oracle_port = config["oracle_port"]
     oracle_sid = config["oracle_sid"]
+    chunk_size = config.get("chunk_size", 5000)
+    load_method = config.get("load_method", "bulk")
+    batch_size = config.get("batch_size", 10000)
+    use_cache = config.get("use_cache", True)
+    if load_method not in LOAD_METHODS:
+        raise ValueError(f"Unknown load_method '{load_method}', expected one of {LOAD_METHODS}")
 
 
 
-    try:
-        df = read_excel_file(excel_file_path)
-    except Exception as e:
-        print(f"Error reading Excel file: {str(e)}")
+    if not os.path.exists(excel_file_path):
+        print(f"Error reading Excel file: File not found: {excel_file_path}")
         return
 
     try:
@@ -175,7 +435,32 @@ def main(config):
         print(f"Error during table creation: {str(e)}")
         return
     try:
-        load_data_to_oracle(df, engine, table_name)
+        # Stream the sheet (from the parsed-sheet cache unless use_cache is off) so
+        # loading starts after the first chunk and memory stays bounded by chunk_size.
+        if load_method == "upsert":
+            ensure_row_hash_column(engine, table_name)
+            connection = engine.raw_connection()
+            try:
+                existing_hashes = fetch_row_hashes(connection, table_name)
+                totals = {"inserted": 0, "updated": 0, "unchanged": 0}
+                for df in iter_workbook_chunks(excel_file_path, chunk_size, use_cache):
+                    counts = upsert_to_oracle(df, connection, table_name, existing_hashes, batch_size)
+                    for key in totals:
+                        totals[key] += counts[key]
+                print(f"Upsert totals: {totals['inserted']} inserted, {totals['updated']} updated, "
+                      f"{totals['unchanged']} unchanged.")
+            finally:
+                connection.close()
+        elif load_method == "bulk":
+            connection = engine.raw_connection()
+            try:
+                for df in iter_workbook_chunks(excel_file_path, chunk_size, use_cache):
+                    bulk_load_to_oracle(df, connection, table_name, batch_size)
+            finally:
+                connection.close()
+        elif load_method == "to_sql":
+            for df in iter_workbook_chunks(excel_file_path, chunk_size, use_cache):
+                load_data_to_oracle(df, engine, table_name)
     except Exception as e:
         print(f"Error during data load: {str(e)}")
         return
@@ -195,6 +480,9 @@ if __name__ == "__main__":
     "oracle_password" : "" ,
     "oracle_host" : "" , 
     "oracle_port" : "" ,
-    "oracle_sid" : "" 
+    "oracle_sid" : "" ,
+    "load_method" : "bulk" ,  # or "upsert" / "to_sql"
+    "batch_size" : 10000 ,
+    "use_cache" : True    # stream the parsed-sheet cache instead of re-parsing the workbook
     }
     main(config)
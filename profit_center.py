@@ -1,11 +1,41 @@
 import os
+import argparse
+import importlib.util
+import json
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-def read_excel_file(file_path: str) -> dict:
+from excel_cache import default_cache, excel_file_sha256, excel_sheet_names, read_excel_cached
+from xlsx_sheets import can_replace_sheets, replace_sheets, supports_frame
+
+
+# Month-end export of each month; the restatement batch mode reads months from here.
+EXPORT_PATH_TEMPLATE = r"C:\RPA\SAP\Profit_Centre\Output\{year}\{month:02d}\1810_{month:02d}_{year}_EXPORT.xlsx"
+SHEETS_TO_PROCESS = ["A110", "A111", "A112", "A114"]
+# The month cache is this folder under the parsed-sheet cache root.
+MONTH_CACHE_NAME = "profit_center"
+MONTH_STATE_NAME = "months.json"
+
+# python-calamine (pandas' "calamine" engine) parses .xlsx several times faster than
+# openpyxl; it is used when installed.
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else None
+
+
+def read_excel_file(file_path: str, sheet_names=None) -> dict:
+    """
+    Read ``sheet_names`` (all sheets when None) into a dict of DataFrames. Sheets
+    that are not in the workbook are left out; the other sheets are never parsed.
+    Parsed sheets are cached (see excel_cache), so an unchanged workbook is only
+    parsed once.
+    """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
-    return pd.read_excel(file_path, sheet_name=None)
+    if sheet_names is not None:
+        available = excel_sheet_names(file_path, engine=EXCEL_ENGINE)
+        sheet_names = [name for name in sheet_names if name in available]
+    return read_excel_cached(file_path, sheet_name=sheet_names, engine=EXCEL_ENGINE)
 
 
 def clean_code(val):
@@ -19,28 +49,116 @@ def clean_code(val):
 
 
 
-def process_sheet(prev_sheet: pd.DataFrame, curr_sheet: pd.DataFrame) -> pd.DataFrame:
-    curr_sheet = curr_sheet.copy()
+REFERENCE_COLUMN = "Prod_process_reference"
+# Opening-stock column of the current month <- closing-stock column of the previous month.
+CARRY_FORWARD_COLUMNS = {
+    "RM-Op_Stock": "ClsStock_Qty",
+    "Val.Diff_OpStock": "Val.Diff_ClsStock",
+    "FG-Op_Stock": "FG_ClsStock_Qty",
+    "FG_Val.Diff_OpStock": "Val.Diff_FG_ClsStock",
+}
 
-    def safe_float(val):
-        try:
-            return float(val) if pd.notna(val) else 0.0
-        except Exception:
-            return 0.0
 
-    def is_valid_code(rm_code, fg_code):
-        rm = str(rm_code).strip()
-        fg = str(fg_code).strip()
-        return not (rm == "" and fg in ["0", "0.0"])
+def safe_float(val):
+    try:
+        return float(val) if pd.notna(val) else 0.0
+    except Exception:
+        return 0.0
+
+
+# Beyond this a float no longer fits an int64; such codes go through clean_code.
+_INT64_LIMIT = 2.0 ** 63
+
+
+def _numeric_codes(values: np.ndarray) -> np.ndarray:
+    # str(int(float(val))) for a whole float array: truncate, then format as integers.
+    codes = np.full(len(values), "", dtype=object)
+    fits = np.isfinite(values) & (np.abs(values) < _INT64_LIMIT)
+    codes[fits] = np.trunc(values[fits]).astype(np.int64).astype(str)
+    overflow = np.isfinite(values) & ~fits
+    codes[overflow] = [clean_code(val) for val in values[overflow]]
+    return codes
+
+
+def clean_codes(values: pd.Series) -> pd.Series:
+    """
+    ``values.apply(clean_code)`` for a whole column: numbers become their truncated
+    integer text (1234.0 -> "1234"; NaN and inf -> ""), anything else its stripped
+    text. Only the per-cell type check runs in Python.
+    """
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in "biuf":
+        return pd.Series(_numeric_codes(values.to_numpy(dtype=np.float64)), index=values.index)
+
+    values = values.astype(object)
+    types = values.map(type)
+    number_types = [t for t in types.unique() if issubclass(t, (int, float))]
+    is_number = types.isin(number_types).to_numpy()
+
+    codes = np.empty(len(values), dtype=object)
+    codes[is_number] = _numeric_codes(values[is_number].to_numpy(dtype=np.float64))
+    codes[~is_number] = values[~is_number].map(str).str.strip().to_numpy(dtype=object)
+    return pd.Series(codes, index=values.index)
+
+
+def safe_floats(values: pd.Series) -> pd.Series:
+    """
+    ``values.apply(safe_float)`` for a whole column: missing and unparseable values
+    become 0.0. ``pd.to_numeric`` picks out the parseable cells, which are then
+    converted with float() semantics so text parses to exactly the same value;
+    anything it cannot coerce falls back to safe_float.
+    """
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in "biuf":
+        return pd.Series(np.nan_to_num(values.to_numpy(dtype=np.float64), nan=0.0, posinf=np.inf, neginf=-np.inf),
+                         index=values.index)
+
+    values = values.astype(object)
+    parsed = pd.to_numeric(values, errors="coerce").notna().to_numpy()
+    floats = np.full(len(values), np.nan)
+    try:
+        floats[parsed] = values[parsed].to_numpy().astype(np.float64)
+    except (TypeError, ValueError, OverflowError):
+        floats[parsed] = [safe_float(val) for val in values[parsed]]
+    retry = ~parsed & values.notna().to_numpy()
+    floats[retry] = [safe_float(val) for val in values[retry]]
+    floats[~parsed & ~retry] = 0.0
+    return pd.Series(floats, index=values.index)
+
+
+def valid_code_mask(sheet: pd.DataFrame) -> pd.Series:
+    """
+    False for the placeholder rows with an empty RM code and an FG code of 0. Expects
+    codes already put through clean_codes, so they are stripped strings.
+    """
+    return ~((sheet["RM_MatCode"] == "") & sheet["FG_MatCode"].isin(["0", "0.0"]))
+
+
+def closing_stock(prev_sheet: pd.DataFrame) -> pd.DataFrame:
+    """The previous month's closing-stock values as floats, keyed by reference; missing columns count as 0."""
+    closing = pd.DataFrame({REFERENCE_COLUMN: prev_sheet[REFERENCE_COLUMN]}, index=prev_sheet.index)
+    for source in CARRY_FORWARD_COLUMNS.values():
+        closing[source] = safe_floats(prev_sheet[source]) if source in prev_sheet.columns else 0.0
+    return closing
+
+
+def process_sheet(prev_sheet: pd.DataFrame, curr_sheet: pd.DataFrame) -> pd.DataFrame:
+    """
+    Carry the previous month's closing stock into the current month's opening-stock
+    columns, matching rows on RM_MatCode + FG_MatCode (the first previous row wins),
+    and append the previous month's references that are missing from the current
+    sheet. Placeholder rows (empty RM code, FG code 0) are neither updated nor carried.
+
+    Matching is one keyed merge and the missing references are one anti-join and a
+    single concat, so the cost grows linearly with the sheet sizes.
+    """
+    prev_sheet = prev_sheet.copy()
+    curr_sheet = curr_sheet.copy()
 
-   
     for col in ["RM_MatCode", "FG_MatCode"]:
         if col in prev_sheet.columns:
-            prev_sheet[col] = prev_sheet[col].apply(clean_code)
+            prev_sheet[col] = clean_codes(prev_sheet[col])
         if col in curr_sheet.columns:
-            curr_sheet[col] = curr_sheet[col].apply(clean_code)
+            curr_sheet[col] = clean_codes(curr_sheet[col])
 
-    
     numeric_cols = [
         "RM-Op_Stock", "Val.Diff_OpStock",
         "FG-Op_Stock", "Val.Diff_FG_ClsStock",
@@ -48,63 +166,45 @@ def process_sheet(prev_sheet: pd.DataFrame, curr_sheet: pd.DataFrame) -> pd.Data
     ]
     for col in numeric_cols:
         if col in curr_sheet.columns:
-            curr_sheet[col] = curr_sheet[col].apply(safe_float)
-
-    
-    curr_sheet["Prod_process_reference"] = curr_sheet["RM_MatCode"].fillna("").astype(str) + curr_sheet["FG_MatCode"].fillna("").astype(str)
-    prev_sheet["Prod_process_reference"] = prev_sheet["RM_MatCode"].fillna("").astype(str) + prev_sheet["FG_MatCode"].fillna("").astype(str)
-
-    
-    curr_refs = set(curr_sheet["Prod_process_reference"])
-
-    
-    for index, row in curr_sheet.iterrows():
-        rm_code = row.get("RM_MatCode", "")
-        fg_code = row.get("FG_MatCode", "")
-        # skip if RM == "" and FG == 0
-        if not is_valid_code(rm_code, fg_code):
-            continue  
-
-        ref = row["Prod_process_reference"]
-        if not ref.strip():
-            continue
-
-        match = prev_sheet[prev_sheet["Prod_process_reference"] == ref]
-        if not match.empty:
-            prev_row = match.iloc[0]
-            curr_sheet.at[index, "RM-Op_Stock"] = safe_float(prev_row.get("ClsStock_Qty"))
-            curr_sheet.at[index, "Val.Diff_OpStock"] = safe_float(prev_row.get("Val.Diff_ClsStock"))
-            curr_sheet.at[index, "FG-Op_Stock"] = safe_float(prev_row.get("FG_ClsStock_Qty"))
-            curr_sheet.at[index, "FG_Val.Diff_OpStock"] = safe_float(prev_row.get("Val.Diff_FG_ClsStock"))
-
-   
-    for _, row in prev_sheet.iterrows():
-        rm_code = row.get("RM_MatCode", "")
-        fg_code = row.get("FG_MatCode", "")
-        if not is_valid_code(rm_code, fg_code):
-            continue
-
-        ref = row.get("Prod_process_reference", "").strip()
-        if not ref or ref in curr_refs:
-            continue
-
-        new_row = {
-            "RM_MatCode": rm_code,
-            "FG_MatCode": fg_code,
-            "RM-Op_Stock": safe_float(row.get("ClsStock_Qty")),
-            "Val.Diff_OpStock": safe_float(row.get("Val.Diff_ClsStock")),
-            "FG-Op_Stock": safe_float(row.get("FG_ClsStock_Qty")),
-            "FG_Val.Diff_OpStock": safe_float(row.get("Val.Diff_FG_ClsStock")),
-            "Prod_process_reference": ref
-        }
-        curr_sheet = pd.concat([curr_sheet, pd.DataFrame([new_row])], ignore_index=True)
-
-    curr_sheet["Prod_Process_No"] = curr_sheet["Prod_process_reference"]
-        
-    if "Prod_process_reference" in prev_sheet.columns:
-        prev_sheet.drop(columns=["Prod_process_reference"], inplace=True)
-    if "Prod_process_reference" in curr_sheet.columns:
-        curr_sheet.drop(columns=["Prod_process_reference"], inplace=True)
+            curr_sheet[col] = safe_floats(curr_sheet[col])
+
+    curr_sheet[REFERENCE_COLUMN] = curr_sheet["RM_MatCode"].fillna("").astype(str) + curr_sheet["FG_MatCode"].fillna("").astype(str)
+    prev_sheet[REFERENCE_COLUMN] = prev_sheet["RM_MatCode"].fillna("").astype(str) + prev_sheet["FG_MatCode"].fillna("").astype(str)
+    closing = closing_stock(prev_sheet)
+
+    # Left merge against the first previous row per reference (keys are unique, so
+    # the result lines up row for row with curr_sheet).
+    carried = curr_sheet[[REFERENCE_COLUMN]].merge(
+        closing.drop_duplicates(REFERENCE_COLUMN, keep="first"), on=REFERENCE_COLUMN, how="left", indicator=True
+    )
+    matched = (
+        valid_code_mask(curr_sheet).to_numpy()
+        & (curr_sheet[REFERENCE_COLUMN] != "").to_numpy()
+        & (carried["_merge"] == "both").to_numpy()
+    )
+    if matched.any():
+        for target, source in CARRY_FORWARD_COLUMNS.items():
+            curr_sheet.loc[matched, target] = carried[source].to_numpy()[matched]
+
+    # Anti-join: previous rows whose reference is missing from the current sheet,
+    # appended in their original order with one concat.
+    prev_refs = prev_sheet[REFERENCE_COLUMN]
+    missing = (
+        valid_code_mask(prev_sheet)
+        & (prev_refs != "")
+        & ~prev_refs.isin(curr_sheet[REFERENCE_COLUMN])
+    )
+    if missing.any():
+        new_rows = pd.DataFrame({
+            "RM_MatCode": prev_sheet.loc[missing, "RM_MatCode"],
+            "FG_MatCode": prev_sheet.loc[missing, "FG_MatCode"],
+            **{target: closing.loc[missing, source] for target, source in CARRY_FORWARD_COLUMNS.items()},
+            REFERENCE_COLUMN: prev_refs[missing],
+        })
+        curr_sheet = pd.concat([curr_sheet, new_rows], ignore_index=True)
+
+    curr_sheet["Prod_Process_No"] = curr_sheet[REFERENCE_COLUMN]
+    curr_sheet.drop(columns=[REFERENCE_COLUMN], inplace=True)
 
     return curr_sheet
 
@@ -117,7 +217,218 @@ def save_updated_excel(file_path: str, data: dict):
             sheet_data.to_excel(writer, sheet_name=sheet_name, index=False)
     print(f"\nFile saved: {file_path}")
 
-def main():
+
+def save_processed_sheets(file_path: str, data: dict):
+    """
+    Write the processed sheets back into ``file_path``. Plain number/text sheets are
+    swapped into the .xlsx directly (see xlsx_sheets.replace_sheets), leaving every
+    other sheet untouched; anything else, including sheets with tables or comments,
+    goes through save_updated_excel.
+    """
+    if all(supports_frame(df) for df in data.values()) and can_replace_sheets(file_path, data):
+        replace_sheets(file_path, data)
+        print(f"\nFile saved: {file_path}")
+    else:
+        save_updated_excel(file_path, data)
+
+
+def _process_workbook_sheet(task):
+    # Runs in a worker process: read one sheet from both workbooks and process it.
+    previous_file_path, current_file_path, sheet_name = task
+    prev_sheet = read_excel_file(previous_file_path, [sheet_name]).get(sheet_name)
+    if prev_sheet is None:
+        return sheet_name, None, f" Sheet '{sheet_name}' not found in previous file."
+    curr_sheet = read_excel_file(current_file_path, [sheet_name]).get(sheet_name)
+    if curr_sheet is None:
+        return sheet_name, None, f" Sheet '{sheet_name}' not found in current file."
+    return sheet_name, process_sheet(prev_sheet, curr_sheet), f" Finished updating sheet: {sheet_name}"
+
+
+def update_profit_center(previous_file_path: str, current_file_path: str, sheets_to_process, workers=None) -> dict:
+    """
+    Carry the previous month's closing stock into ``sheets_to_process`` of the current
+    workbook and save it. Only those sheets are read, each sheet is read and processed
+    in its own worker process, and only the processed sheets are rewritten.
+    Returns the processed sheets.
+    """
+    for file_path in (previous_file_path, current_file_path):
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+    tasks = [(previous_file_path, current_file_path, sheet_name) for sheet_name in sheets_to_process]
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    updated = {}
+    print(f"\nProcessing sheets: {', '.join(sheets_to_process)} ({workers} workers)")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for sheet_name, updated_sheet, message in executor.map(_process_workbook_sheet, tasks):
+            print(message)
+            if updated_sheet is not None:
+                updated[sheet_name] = updated_sheet
+
+    if updated:
+        save_processed_sheets(current_file_path, updated)
+    return updated
+
+
+def month_range(start: str, end: str) -> list:
+    """Every (year, month) from ``start`` to ``end`` inclusive, both given as "YYYY-MM"."""
+    year, month = map(int, start.split("-"))
+    end_year, end_month = map(int, end.split("-"))
+    months = []
+    while (year, month) <= (end_year, end_month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    if not months:
+        raise ValueError(f"Empty month range: {start} to {end}")
+    return months
+
+
+def previous_month_of(year: int, month: int) -> tuple:
+    return (year - 1, 12) if month == 1 else (year, month - 1)
+
+
+class MonthCache:
+    """
+    ``months.json`` with the SHA-256 of each month's workbook when it was last read
+    or saved, plus columnar copies of the sheets the restatement wrote into it
+    (``<cache_dir>/YYYY-MM/<sheet>.parquet``, or .pkl when a sheet's mixed-type
+    columns cannot be stored as Parquet). A month whose workbook still has that
+    digest is unchanged; its processed sheets come from here, and raw sheets come
+    from the parsed-sheet cache behind read_excel_file. The digest is the one that
+    cache keeps, so a workbook is hashed once for both.
+
+    ``cache_dir`` defaults to ``profit_center`` under the parsed-sheet cache root.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        cache_dir = cache_dir or os.path.join(default_cache(EXCEL_ENGINE).cache_dir, MONTH_CACHE_NAME)
+        self.cache_dir = cache_dir
+        self.state_path = os.path.join(cache_dir, MONTH_STATE_NAME)
+        os.makedirs(cache_dir, exist_ok=True)
+        self.state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    @staticmethod
+    def key(year: int, month: int) -> str:
+        return f"{year}-{month:02d}"
+
+    def is_current(self, year: int, month: int, file_path: str) -> bool:
+        """True when the month is cached and its workbook has not changed since."""
+        entry = self.state.get(self.key(year, month))
+        if entry is None or not os.path.exists(file_path):
+            return False
+        return entry.get("sha256") == excel_file_sha256(file_path, engine=EXCEL_ENGINE)
+
+    def load(self, year: int, month: int) -> dict:
+        month_dir = os.path.join(self.cache_dir, self.key(year, month))
+        data = {}
+        for sheet_name, file_name in self.state[self.key(year, month)]["sheets"].items():
+            path = os.path.join(month_dir, file_name)
+            data[sheet_name] = pd.read_parquet(path) if file_name.endswith(".parquet") else pd.read_pickle(path)
+        return data
+
+    def store(self, year: int, month: int, file_path: str, data: dict):
+        """Record the workbook's digest and the processed sheets in ``data`` (may be empty)."""
+        month_dir = os.path.join(self.cache_dir, self.key(year, month))
+        os.makedirs(month_dir, exist_ok=True)
+        sheets = {}
+        for sheet_name, df in data.items():
+            try:
+                df.to_parquet(os.path.join(month_dir, f"{sheet_name}.parquet"), index=False)
+                sheets[sheet_name] = f"{sheet_name}.parquet"
+            except (ImportError, ValueError, TypeError, NotImplementedError):
+                # pyarrow missing, or object columns mixing numbers and text.
+                df.to_pickle(os.path.join(month_dir, f"{sheet_name}.pkl"))
+                sheets[sheet_name] = f"{sheet_name}.pkl"
+        # Copies of sheets the month no longer has processed, or left in the other format.
+        for file_name in os.listdir(month_dir):
+            if file_name not in sheets.values():
+                os.remove(os.path.join(month_dir, file_name))
+        self.state[self.key(year, month)] = {"sha256": excel_file_sha256(file_path, engine=EXCEL_ENGINE),
+                                           "sheets": sheets}
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=0, sort_keys=True)
+        os.replace(temp_path, self.state_path)
+
+
+def _process_sheet_pair(task):
+    sheet_name, prev_sheet, curr_sheet = task
+    return sheet_name, process_sheet(prev_sheet, curr_sheet)
+
+
+def rebuild_opening_stocks(start: str, end: str, path_template: str = EXPORT_PATH_TEMPLATE,
+                           sheets_to_process=SHEETS_TO_PROCESS, cache_dir: str = None,
+                           force: bool = False, workers=None) -> list:
+    """
+    Restate the opening stocks of every month from ``start`` to ``end`` ("YYYY-MM")
+    in one pass: each month is carried forward from the month before it, which has
+    just been updated itself, and saved in place.
+
+    Every workbook is read at most once; raw sheets go through the parsed-sheet
+    cache and the sheets written by the last run come from the month cache, so an
+    unchanged workbook is not parsed again. A month is only recomputed when its own workbook or any month upstream
+    of it (including the month before ``start``) changed since the last run, or with
+    ``force``. Returns the (year, month) pairs that were recomputed.
+    """
+    cache = MonthCache(cache_dir)
+    months = month_range(start, end)
+
+    def load_month(year, month):
+        file_path = path_template.format(year=year, month=month)
+        current = cache.is_current(year, month, file_path)
+        data = cache.load(year, month) if current else {}
+        missing = [name for name in sheets_to_process if name not in data]
+        if missing:
+            if not current:
+                print(f" Reading {file_path}")
+            data.update(read_excel_file(file_path, missing))
+        if not current:
+            cache.store(year, month, file_path, {})
+        return data, not current
+
+    prev_data, upstream_changed = load_month(*previous_month_of(*months[0]))
+    recomputed = []
+    with ProcessPoolExecutor(max_workers=workers or min(len(sheets_to_process), os.cpu_count() or 1)) as executor:
+        for year, month in months:
+            file_path = path_template.format(year=year, month=month)
+            curr_data, changed = load_month(year, month)
+            if not (force or changed or upstream_changed):
+                print(f"{year}-{month:02d}: unchanged, skipped")
+                prev_data = curr_data
+                continue
+
+            tasks = [(name, prev_data[name], curr_data[name]) for name in sheets_to_process
+                     if name in prev_data and name in curr_data]
+            updated = dict(executor.map(_process_sheet_pair, tasks))
+            if updated:
+                save_processed_sheets(file_path, updated)
+            curr_data = {**curr_data, **updated}
+            cache.store(year, month, file_path, updated)
+            print(f"{year}-{month:02d}: updated {', '.join(updated) or 'no sheets'}")
+            recomputed.append((year, month))
+            prev_data = curr_data
+            upstream_changed = True
+    return recomputed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carry closing stock forward into the next month's opening stock.")
+    parser.add_argument("--from", dest="start", help="first month to restate, YYYY-MM (batch mode)")
+    parser.add_argument("--to", dest="end", help="last month to restate, YYYY-MM (defaults to --from)")
+    parser.add_argument("--force", action="store_true", help="recompute every month in the range")
+    parser.add_argument("--template", default=EXPORT_PATH_TEMPLATE,
+                        help="path of each month's export, with {year} and {month} placeholders")
+    parser.add_argument("--cache-dir", help="month cache folder (default: profit_center under the sheet cache)")
+    args = parser.parse_args(argv)
+    if args.start:
+        recomputed = rebuild_opening_stocks(args.start, args.end or args.start, args.template,
+                                            cache_dir=args.cache_dir, force=args.force)
+        print(f"\n Restated {len(recomputed)} month(s).")
+        return
+
     now = datetime.now()
     adjusted_month = now.month - 1
     adjusted_year = now.year
@@ -140,31 +451,9 @@ def main():
     #current_file_path = fr"C:\RPA\SAP\Profit_Centre\Output\{adjusted_year}\{adjusted_month:02d}\1810_{adjusted_month:02d}_{adjusted_year}_EXPORT.xlsx"
     #previous_file_path = fr"C:\RPA\SAP\Profit_Centre\Output\{previous_year}\{previous_month:02d}\1810_{previous_month:02d}_{previous_year}_EXPORT.xlsx"
 
-   
-    previous_data = read_excel_file(previous_file_path)
-    current_data = read_excel_file(current_file_path)
-
   
-    sheets_to_process = ["A110", "A111", "A112", "A114"]
-
-    for sheet_name in sheets_to_process:
-        if sheet_name not in previous_data:
-            print(f" Sheet '{sheet_name}' not found in previous file.")
-            continue
-        if sheet_name not in current_data:
-            print(f" Sheet '{sheet_name}' not found in current file.")
-            continue
-
-        print(f"\nProcessing sheet: {sheet_name}")
-        prev_sheet = previous_data[sheet_name]
-        curr_sheet = current_data[sheet_name]
-
-        updated_sheet = process_sheet(prev_sheet, curr_sheet)
-        current_data[sheet_name] = updated_sheet
-        print(f" Finished updating sheet: {sheet_name}")
-
-    save_updated_excel(current_file_path, current_data)
+    update_profit_center(previous_file_path, current_file_path, SHEETS_TO_PROCESS)
     print("\n All updates complete.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
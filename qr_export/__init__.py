@@ -0,0 +1,13 @@
+"""
+Export the QR code PDFs stored as BLOBs in the asset table to disk.
+
+Run ``python -m qr_export --help`` for the command line; ``qr_code_downloader.py``
+and ``download_script.py`` are kept as entry points for existing scheduled jobs.
+"""
+from qr_export.archive import ArchiveSink
+from qr_export.backends import ExportBackend, OracleBackend, SQLiteBackend, connect_to_oracle, stream_rows
+from qr_export.checkpoint import ExportCheckpoint, KeyTracker
+from qr_export.dedup import DedupSink
+from qr_export.pipeline import (StageStats, download_qr_codes_from_oracle, export_qr_codes, run_export_pipeline,
+                                setup_logging)
+from qr_export.writer import LooseFileSink, qr_pdf_path, save_qr_pdf, write_blob
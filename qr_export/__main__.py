@@ -0,0 +1,4 @@
+from qr_export.cli import main
+
+
+main()
@@ -0,0 +1,358 @@
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+
+from qr_export.checkpoint import ExportCheckpoint
+from qr_export.writer import LAYOUTS, SPOOL_MAX_BYTES, DigestTee, safe_pdf_name, write_blob
+
+
+ARCHIVE_FORMATS = ("zip", "tar")
+ZIP_COMPRESSION = {"stored": zipfile.ZIP_STORED, "deflate": zipfile.ZIP_DEFLATED}
+FLAT_ARCHIVE_NAME = "qr_codes"
+# Every run writes a staged copy of each archive under this suffix; finish() renames it
+# over the archive, so an interrupted run never leaves a damaged archive behind.
+PART_SUFFIX = ".part"
+
+
+def index_path(archive_path: str) -> str:
+    return f"{archive_path}.index.jsonl"
+
+
+def _read_index(path: str) -> list:
+    """The entries of an index file; a last line cut short by a kill is dropped."""
+    entries = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                entries.append(json.loads(line))
+    return entries
+
+
+def _write_index(path: str, entries: list):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+    os.replace(temp_path, path)
+
+
+def _remove_archive(path: str):
+    for stale_path in (path, index_path(path)):
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+
+
+def _zip_member(f, entry: dict):
+    """The ZipInfo of an indexed zip member, from its local header, and where its data ends."""
+    f.seek(entry["header_offset"])
+    header = f.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"No local header for indexed member {entry['name']}")
+    (_, extract_version, _, flag_bits, compress_type, dos_time, dos_date, crc, _, _,
+     name_length, extra_length) = struct.unpack(zipfile.structFileHeader, header)
+    date_time = ((dos_date >> 9) + 1980, (dos_date >> 5) & 0xF, dos_date & 0x1F,
+                 dos_time >> 11, (dos_time >> 5) & 0x3F, (dos_time & 0x1F) * 2)
+    info = zipfile.ZipInfo(entry["name"], date_time=date_time)
+    info.extract_version = extract_version
+    info.flag_bits = flag_bits
+    info.compress_type = compress_type
+    info.CRC = crc
+    info.file_size = entry["size"]
+    info.compress_size = entry["compressed_size"]
+    info.header_offset = entry["header_offset"]
+    info.external_attr = 0o600 << 16
+    end = entry["header_offset"] + zipfile.sizeFileHeader + name_length + extra_length + entry["compressed_size"]
+    return info, end
+
+
+def _tar_member_end(entry: dict) -> int:
+    return entry["offset"] + -(-entry["size"] // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+
+
+def _recover(path: str, fmt: str):
+    """
+    Cut a staged archive left by a killed run back to the members its index records
+    (the index only gets a line once the member's bytes are written) and return
+    those entries, plus the ZipInfo of each zip member for a new central directory.
+    """
+    entries = _read_index(index_path(path)) if os.path.exists(path) else []
+    infos = []
+    end = 0
+    if os.path.exists(path):
+        with open(path, "r+b") as f:
+            for entry in entries:
+                if fmt == "zip":
+                    info, member_end = _zip_member(f, entry)
+                    infos.append(info)
+                else:
+                    member_end = _tar_member_end(entry)
+                end = max(end, member_end)
+            f.truncate(end)
+            if fmt == "tar":
+                # tarfile only appends to an archive that ends in its end-of-archive blocks.
+                f.seek(end)
+                f.write(tarfile.NUL * 2 * tarfile.BLOCKSIZE)
+    else:
+        with open(path, "wb") as f:
+            if fmt == "tar":
+                f.write(tarfile.NUL * 2 * tarfile.BLOCKSIZE)
+    _write_index(index_path(path), entries)
+    return entries, infos
+
+
+def _index_members(path: str, fmt: str) -> list:
+    """Index entries for every member of a complete archive, hashing each member."""
+    entries = []
+    if fmt == "zip":
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                sha256 = hashlib.sha256()
+                with archive.open(info) as member:
+                    for chunk in iter(lambda: member.read(1024 * 1024), b""):
+                        sha256.update(chunk)
+                entries.append({"name": info.filename, "header_offset": info.header_offset, "size": info.file_size,
+                                "compressed_size": info.compress_size, "sha256": sha256.hexdigest()})
+    else:
+        with tarfile.open(path) as archive:
+            for info in archive.getmembers():
+                sha256 = hashlib.sha256()
+                member = archive.extractfile(info)
+                for chunk in iter(lambda: member.read(1024 * 1024), b""):
+                    sha256.update(chunk)
+                entries.append({"name": info.name, "offset": info.offset_data, "size": info.size,
+                                "sha256": sha256.hexdigest()})
+    return entries
+
+
+def _index_matches(path: str, fmt: str, entries: list) -> bool:
+    if fmt == "zip":
+        with zipfile.ZipFile(path) as archive:
+            members = [(info.filename, info.header_offset, info.file_size) for info in archive.infolist()]
+        return members == [(entry["name"], entry["header_offset"], entry["size"]) for entry in entries]
+    with tarfile.open(path) as archive:
+        members = [(info.name, info.offset_data, info.size) for info in archive.getmembers()]
+    return members == [(entry["name"], entry["offset"], entry["size"]) for entry in entries]
+
+
+def _seed(path: str, archive_path: str, fmt: str):
+    """Start the staged archive ``path`` as a copy of the finished ``archive_path``."""
+    _remove_archive(path)
+    if not os.path.exists(archive_path):
+        return
+    shutil.copyfile(archive_path, path)
+    entries = _read_index(index_path(archive_path))
+    # An index out of step with its archive (a kill between finish()'s two renames,
+    # or an archive from before indexes) is rebuilt from the members themselves.
+    if not _index_matches(path, fmt, entries):
+        entries = _index_members(path, fmt)
+    _write_index(index_path(path), entries)
+
+
+class _Archive:
+    """
+    One open archive, its index file and the lock serialising appends to both.
+
+    ``mode`` says how the file at ``path`` is prepared: "fresh" discards it, "seed"
+    copies ``seed_path`` over it and "recover" cuts it back to its indexed members.
+    """
+
+    def __init__(self, path: str, fmt: str, compression: str, mode: str = "fresh", seed_path: str = None):
+        self.path = path
+        self.fmt = fmt
+        self.lock = threading.Lock()
+        self.index_path = index_path(path)
+        self._file = None
+        infos = []
+        if mode == "fresh":
+            _remove_archive(path)
+        elif mode == "seed":
+            _seed(path, seed_path, fmt)
+        else:
+            _, infos = _recover(path, fmt)
+        self.entries = {entry["name"]: entry for entry in _read_index(self.index_path)}
+        if fmt == "zip" and mode == "recover":
+            # The recovered file has no central directory: keep writing after the last
+            # member and let close() write one covering the recovered members too.
+            self._file = open(path, "r+b")
+            self._file.seek(0, os.SEEK_END)
+            self.handle = zipfile.ZipFile(self._file, "w", compression=ZIP_COMPRESSION[compression],
+                                          allowZip64=True)
+            for info in infos:
+                self.handle.filelist.append(info)
+                self.handle.NameToInfo[info.filename] = info
+        elif fmt == "zip":
+            self.handle = zipfile.ZipFile(path, "a", compression=ZIP_COMPRESSION[compression], allowZip64=True)
+        else:
+            self.handle = tarfile.open(path, "a")
+        self.index = open(self.index_path, "a", encoding="utf-8")
+
+    def append(self, name: str, spool, size: int, sha256: str) -> dict:
+        """
+        Add ``spool`` as member ``name`` and return its index entry. When the index
+        already has ``name`` with this size and hash nothing is added, so a rerun does
+        not duplicate members.
+
+        The member's bytes are flushed before its index line, and the line before
+        returning, so after a kill the index never lists a member that is not in
+        the file and every row the checkpoint has committed is indexed.
+        """
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is not None and entry["size"] == size and entry["sha256"] == sha256:
+                return dict(entry, unchanged=True)
+            if self.fmt == "zip":
+                info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                info.compress_type = self.handle.compression
+                info.file_size = size
+                with self.handle.open(info, "w", force_zip64=size > 0x7FFFFFFF) as member:
+                    while True:
+                        data = spool.read(1024 * 1024)
+                        if not data:
+                            break
+                        member.write(data)
+                self.handle.fp.flush()
+                entry = {"name": name, "header_offset": info.header_offset, "size": size,
+                         "compressed_size": info.compress_size, "sha256": sha256}
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = size
+                info.mtime = int(time.time())
+                self.handle.addfile(info, spool)
+                self.handle.fileobj.flush()
+                # The member's bytes end the archive, padded to a whole block; recording
+                # where they start lets a reader seek straight to them.
+                padded = -(-size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+                entry = {"name": name, "offset": self.handle.offset - padded, "size": size, "sha256": sha256}
+            self.entries[name] = entry
+            self.index.write(json.dumps(entry) + "\n")
+            self.index.flush()
+            return entry
+
+    def close(self):
+        with self.lock:
+            self.handle.close()
+            if self._file is not None:
+                self._file.close()
+            self.index.close()
+
+
+class ArchiveSink:
+    """
+    Output backend that appends every PDF to one archive per plant
+    (``base_dir/<plant_code>.zip`` or ``.tar``; a single ``qr_codes`` archive for the
+    flat layout) instead of writing a loose file, so the file system sees one file
+    per plant rather than one per asset.
+
+    Each archive is opened once and stays open until ``close()``. Next to it
+    ``<archive>.index.jsonl`` gets one line per member with its offset, size and
+    SHA-256, for random access and for skipping unchanged blobs on incremental reruns.
+    A member whose name, size and hash are already indexed is not appended again.
+
+    A run never writes to a finished archive: it writes ``<archive>.part`` (with
+    ``rebuild``, for full exports, from scratch; otherwise starting from a copy of the
+    archive) and ``finish()`` renames it and its index over the old ones, so a killed
+    or failed run leaves the previous archive intact. ``close()`` without ``finish()``
+    leaves the ``.part`` files, and ``resume`` continues them where an interrupted
+    export stopped: the part is first cut back to the members its index records,
+    which covers every row the checkpoint has committed, so a zip part left without
+    a central directory by a kill is repaired rather than appended to.
+    """
+
+    def __init__(self, base_dir: str, layout: str = "plant", fmt: str = "zip", compression: str = "stored",
+                 rebuild: bool = False, resume: bool = False):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown output layout '{layout}', expected one of {LAYOUTS}")
+        if fmt not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format '{fmt}', expected one of {ARCHIVE_FORMATS}")
+        if compression not in ZIP_COMPRESSION:
+            raise ValueError(f"Unknown zip compression '{compression}', expected one of {tuple(ZIP_COMPRESSION)}")
+        self.base_dir = base_dir
+        self.layout = layout
+        self.fmt = fmt
+        self.compression = compression
+        self.rebuild = rebuild
+        self.resume = resume
+        self._archives = {}
+        self._lock = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+
+    def archive_path(self, plant_code: str) -> str:
+        name = plant_code if self.layout == "plant" else FLAT_ARCHIVE_NAME
+        return os.path.join(self.base_dir, f"{name}.{self.fmt}")
+
+    def member_name(self, file_name: str, plant_code: str) -> str:
+        if self.layout == "plant":
+            return safe_pdf_name(file_name)
+        return f"{plant_code}_{safe_pdf_name(file_name)}"
+
+    def path_for(self, file_name: str, plant_code: str) -> str:
+        """``<archive>/<member>``; used as the file's key in the export checkpoint."""
+        return os.path.join(self.archive_path(plant_code), self.member_name(file_name, plant_code))
+
+    def write(self, file_name: str, plant_code: str, blob, digest=None) -> int:
+        if not blob:
+            print(f"[WARN] No QR code blob for {file_name} in plant {plant_code}")
+            return 0
+        file_path = self.path_for(file_name, plant_code)
+        try:
+            sha256 = hashlib.sha256()
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, dir=self.base_dir) as spool:
+                size = write_blob(blob, spool, DigestTee(sha256, digest))
+                spool.seek(0)
+                entry = self._archive(plant_code).append(self.member_name(file_name, plant_code), spool, size,
+                                                         sha256.hexdigest())
+            print(f"[SUCCESS] {'Unchanged' if entry.get('unchanged') else 'Saved'}: {file_path}")
+            return size
+        except Exception as e:
+            print(f"[ERROR] Failed to save {file_path}: {e}")
+            raise
+
+    def is_unchanged(self, checkpoint: ExportCheckpoint, file_name: str, plant_code: str, blob) -> bool:
+        """True when the archive's index already holds this member with ``blob``'s size (and hash, for bytes)."""
+        if not blob:
+            return False
+        entry = self._archive(plant_code).entries.get(self.member_name(file_name, plant_code))
+        if entry is None:
+            return False
+        if isinstance(blob, (bytes, bytearray)):
+            return hashlib.sha256(blob).hexdigest() == entry["sha256"]
+        return blob.size() == entry["size"]
+
+    def finish(self):
+        """Close every archive; the staged archives and their indexes replace the old ones."""
+        with self._lock:
+            for path, archive in self._archives.items():
+                archive.close()
+                os.replace(archive.path, path)
+                os.replace(archive.index_path, index_path(path))
+            self._archives.clear()
+
+    def close(self):
+        with self._lock:
+            for archive in self._archives.values():
+                archive.close()
+            self._archives.clear()
+
+    def _archive(self, plant_code: str) -> _Archive:
+        path = self.archive_path(plant_code)
+        with self._lock:
+            archive = self._archives.get(path)
+            if archive is None:
+                part_path = path + PART_SUFFIX
+                if self.resume and os.path.exists(part_path):
+                    archive = _Archive(part_path, self.fmt, self.compression, mode="recover")
+                elif self.rebuild:
+                    archive = _Archive(part_path, self.fmt, self.compression, mode="fresh")
+                else:
+                    archive = _Archive(part_path, self.fmt, self.compression, mode="seed", seed_path=path)
+                self._archives[path] = archive
+            return archive
@@ -0,0 +1,213 @@
+import importlib
+import sqlite3
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+
+
+ORACLE_DRIVERS = ("cx_Oracle", "oracledb")
+
+
+def stream_rows(
+    cursor,
+    table_name: str,
+    arraysize: int = 1000,
+    prefetchrows: Optional[int] = None,
+    after_key: Optional[str] = None,
+    change_column: Optional[str] = None,
+    since: Optional[datetime] = None,
+    partition: int = 0,
+    partitions: int = 1
+) -> Iterator[Tuple[str, str, str, object]]:
+    """
+    Stream every record (row_key, qr_file_name, plant_code, qr_code_blob) over one open
+    Oracle cursor, in ROWID order.
+
+    The table is scanned once and rows arrive ``arraysize`` per round trip, so export
+    time grows linearly with the table instead of rescanning from the start for each
+    ROWNUM page, and no COUNT(*) pass is needed up front. ``after_key`` resumes after
+    a checkpointed ROWID; ``change_column`` and ``since`` restrict the export to rows
+    modified after ``since``. With ``partitions`` > 1 only the rows whose
+    ORA_HASH(ROWID) falls in bucket ``partition`` are returned.
+    """
+    conditions = []
+    binds = {}
+    if partitions > 1:
+        conditions.append("ORA_HASH(ROWID, :max_bucket) = :partition")
+        binds["max_bucket"] = partitions - 1
+        binds["partition"] = partition
+    if after_key:
+        conditions.append("ROWID > CHARTOROWID(:after_key)")
+        binds["after_key"] = after_key
+    if change_column and since is not None:
+        conditions.append(f"{change_column} > :since")
+        binds["since"] = since
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    cursor.arraysize = arraysize
+    cursor.prefetchrows = prefetchrows if prefetchrows is not None else arraysize + 1
+    cursor.execute(
+        f"SELECT ROWIDTOCHAR(ROWID), QR_FILE_NAME, PLANT_CODE, QR_CODE_BLOB FROM {table_name}{where} ORDER BY ROWID",
+        binds
+    )
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            break
+        yield from rows
+
+
+def connect_to_oracle(username: str, password: str, dsn: str, driver: str = "cx_Oracle"):
+    """Open a single Oracle connection with ``driver`` (cx_Oracle or python-oracledb)."""
+    module = importlib.import_module(driver)
+    try:
+        if driver == "cx_Oracle":
+            # threaded: writer threads read LOBs on this connection while it is fetching.
+            conn = module.connect(username, password, dsn, threaded=True)
+        else:
+            conn = module.connect(user=username, password=password, dsn=dsn)
+        print("Connected to Oracle DB")
+        return conn
+    except Exception:
+        print(" failed to Connect to Oracle DB")
+        raise
+
+
+class ExportBackend:
+    """
+    Where the QR rows come from. ``stream`` yields (row_key, qr_file_name, plant_code,
+    qr_code_blob) in ascending key order, optionally restricted to one of
+    ``partitions`` disjoint buckets, rows after ``after_key``, or rows whose
+    ``change_column`` is later than ``since``. Blobs are LOB-like objects (``read``,
+    ``size``, ``getchunksize``) or bytes.
+    """
+
+    def acquire(self):
+        raise NotImplementedError
+
+    def release(self, conn):
+        raise NotImplementedError
+
+    def now(self, conn) -> datetime:
+        raise NotImplementedError
+
+    def stream(self, conn, arraysize: int = 1000, partition: int = 0, partitions: int = 1,
+               after_key: Optional[str] = None, change_column: Optional[str] = None,
+               since: Optional[datetime] = None) -> Iterator[Tuple[str, str, str, object]]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class OracleBackend(ExportBackend):
+    """
+    The QR table in Oracle, through cx_Oracle or python-oracledb (thin mode, no
+    Oracle Client needed). Connections come from a session pool sized for one
+    connection per export partition.
+    """
+
+    def __init__(self, username: str, password: str, dsn: str, table_name: str = "ZSAP_FIX_ASSET",
+                 pool_size: int = 1, inline_lobs: bool = False, driver: str = "cx_Oracle"):
+        if driver not in ORACLE_DRIVERS:
+            raise ValueError(f"Unknown Oracle driver '{driver}', expected one of {ORACLE_DRIVERS}")
+        self.table_name = table_name
+        self.inline_lobs = inline_lobs
+        self.driver = importlib.import_module(driver)
+        if driver == "cx_Oracle":
+            # threaded: writer threads read LOBs on a connection while it is fetching.
+            self.pool = self.driver.SessionPool(username, password, dsn, min=1, max=pool_size, increment=1,
+                                                threaded=True)
+        else:
+            self.pool = self.driver.create_pool(user=username, password=password, dsn=dsn,
+                                                min=1, max=pool_size, increment=1)
+        print("Connected to Oracle DB")
+
+    def acquire(self):
+        conn = self.pool.acquire()
+        if self.inline_lobs:
+            conn.outputtypehandler = self._inline_lob_output_handler
+        return conn
+
+    def release(self, conn):
+        self.pool.release(conn)
+
+    def now(self, conn) -> datetime:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT SYSDATE FROM DUAL")
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+    def stream(self, conn, arraysize: int = 1000, partition: int = 0, partitions: int = 1,
+               after_key: Optional[str] = None, change_column: Optional[str] = None,
+               since: Optional[datetime] = None) -> Iterator[Tuple[str, str, str, object]]:
+        cursor = conn.cursor()
+        try:
+            yield from stream_rows(cursor, self.table_name, arraysize, after_key=after_key,
+                                   change_column=change_column, since=since,
+                                   partition=partition, partitions=partitions)
+        finally:
+            cursor.close()
+
+    def close(self):
+        self.pool.close()
+
+    def _inline_lob_output_handler(self, cursor, name, default_type, size, precision, scale):
+        # Fetch BLOB columns as bytes with the row instead of as locators, saving one
+        # round trip per LOB. Only worth it when the PDFs are known to be small.
+        if default_type == self.driver.DB_TYPE_BLOB:
+            return cursor.var(self.driver.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
+
+
+class SQLiteBackend(ExportBackend):
+    """
+    File-backed stand-in for the QR table (same QR_FILE_NAME, PLANT_CODE, QR_CODE_BLOB
+    columns) for local testing and benchmarks. Rows are keyed and partitioned by
+    SQLite's integer rowid.
+    """
+
+    def __init__(self, path: str, table_name: str = "ZSAP_FIX_ASSET"):
+        self.path = path
+        self.table_name = table_name
+
+    def acquire(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def release(self, conn):
+        conn.close()
+
+    def now(self, conn) -> datetime:
+        return datetime.now()
+
+    def stream(self, conn, arraysize: int = 1000, partition: int = 0, partitions: int = 1,
+               after_key: Optional[str] = None, change_column: Optional[str] = None,
+               since: Optional[datetime] = None) -> Iterator[Tuple[str, str, str, bytes]]:
+        conditions = []
+        binds = []
+        if partitions > 1:
+            conditions.append("rowid % ? = ?")
+            binds += [partitions, partition]
+        if after_key:
+            conditions.append("rowid > ?")
+            binds.append(int(after_key))
+        if change_column and since is not None:
+            conditions.append(f"{change_column} > ?")
+            binds.append(since.isoformat(" "))
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        cursor = conn.cursor()
+        cursor.arraysize = arraysize
+        try:
+            cursor.execute(
+                f"SELECT CAST(rowid AS TEXT), QR_FILE_NAME, PLANT_CODE, QR_CODE_BLOB FROM {self.table_name}{where} "
+                f"ORDER BY rowid",
+                binds
+            )
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
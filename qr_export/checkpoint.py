@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import threading
+from typing import Optional, Tuple
+
+
+CHECKPOINT_NAME = "qr_export_checkpoint.sqlite"
+
+
+class ExportCheckpoint:
+    """
+    SQLite checkpoint store kept in the export's output_dir.
+
+    It records run state (the last committed row key of an unfinished run, the start
+    time of the last completed run) and the size and SHA-256 of every PDF written,
+    so a restarted export can resume and an incremental one can skip unchanged files.
+    Safe to share between writer threads; changes are committed every
+    ``commit_every`` updates and on ``commit()``/``close()``.
+    """
+
+    def __init__(self, output_dir: str, commit_every: int = 500):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, CHECKPOINT_NAME)
+        self.commit_every = commit_every
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS state (name TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, sha256 TEXT)")
+        self._conn.commit()
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM state WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def set(self, name: str, value: str):
+        self._write("INSERT OR REPLACE INTO state (name, value) VALUES (?, ?)", (name, value))
+
+    def delete(self, name: str):
+        self._write("DELETE FROM state WHERE name = ?", (name,))
+
+    def file_entry(self, path: str) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            return self._conn.execute("SELECT size, sha256 FROM files WHERE path = ?",
+                                      (self._relative(path),)).fetchone()
+
+    def record_file(self, path: str, size: int, sha256: str):
+        self._write("INSERT OR REPLACE INTO files (path, size, sha256) VALUES (?, ?, ?)",
+                    (self._relative(path), size, sha256))
+
+    def resume_key(self, scope: str = "all") -> Optional[str]:
+        return self.get(f"last_key:{scope}")
+
+    def clear_resume_key(self, scope: str = "all"):
+        self.delete(f"last_key:{scope}")
+
+    def tracker(self, scope: str = "all") -> "KeyTracker":
+        return KeyTracker(self, f"last_key:{scope}")
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        self.commit()
+        self._conn.close()
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.output_dir)
+
+    def _write(self, sql: str, params: tuple):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._uncommitted += 1
+            if self._uncommitted >= self.commit_every:
+                self._conn.commit()
+                self._uncommitted = 0
+
+
+class KeyTracker:
+    """
+    Tracks the last committed row key: the key of the highest fetch sequence number
+    below which every row has been written. Writers finish out of order, so a key is
+    only committed once all earlier rows are done too.
+    """
+
+    def __init__(self, checkpoint: ExportCheckpoint, state_name: str):
+        self._checkpoint = checkpoint
+        self._state_name = state_name
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._done = {}
+
+    def done(self, seq: int, key: str):
+        with self._lock:
+            self._done[seq] = key
+            committed = None
+            while self._next_seq in self._done:
+                committed = self._done.pop(self._next_seq)
+                self._next_seq += 1
+            if committed is not None:
+                self._checkpoint.set(self._state_name, committed)
@@ -0,0 +1,123 @@
+import argparse
+import json
+import os
+from typing import List, Optional
+
+from qr_export.archive import ARCHIVE_FORMATS, ZIP_COMPRESSION
+from qr_export.backends import ORACLE_DRIVERS, OracleBackend, SQLiteBackend
+from qr_export.dedup import LINK_MODES
+from qr_export.pipeline import export_qr_codes, setup_logging
+from qr_export.writer import LAYOUTS
+
+
+ENV_PREFIX = "QR_EXPORT_"
+DEFAULTS = {
+    "backend": "oracle",
+    "driver": "cx_Oracle",
+    "table": "ZSAP_FIX_ASSET",
+    "output_dir": "qr_codes",
+    "layout": "plant",
+    "compression": "stored",
+    "batch_size": 1000,
+    "writers": 4,
+    "queue_depth": 64,
+    "partitions": 1,
+    "retries": 2,
+    "log_file": "qr_export.log",
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="qr_export",
+        description="Export the QR code PDFs stored in the asset table to disk.",
+        epilog=f"Credentials can also be given as {ENV_PREFIX}USERNAME, {ENV_PREFIX}PASSWORD and "
+               f"{ENV_PREFIX}DSN, or in the --config file; command-line options take precedence."
+    )
+    parser.add_argument("--config", help="JSON file with any of the options below (e.g. username, dsn, partitions)")
+    parser.add_argument("--backend", choices=("oracle", "sqlite"))
+    parser.add_argument("--driver", choices=ORACLE_DRIVERS, help="cx_Oracle, or oracledb for thin mode")
+    parser.add_argument("--dsn")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--sqlite-path", help="database file for the sqlite backend")
+    parser.add_argument("--table")
+    parser.add_argument("--output-dir")
+    parser.add_argument("--layout", choices=LAYOUTS)
+    parser.add_argument("--dedup", choices=LINK_MODES,
+                        help="store each distinct PDF once and link every exported path to it")
+    parser.add_argument("--archive", choices=ARCHIVE_FORMATS, help="append the PDFs to one archive per plant")
+    parser.add_argument("--compression", choices=tuple(ZIP_COMPRESSION), help="zip member compression")
+    parser.add_argument("--batch-size", type=int, help="rows fetched per round trip")
+    parser.add_argument("--writers", type=int, help="writer threads per partition")
+    parser.add_argument("--queue-depth", type=int)
+    parser.add_argument("--partitions", type=int, help="parallel connections, each exporting one hash bucket")
+    parser.add_argument("--retries", type=int)
+    parser.add_argument("--inline-lobs", action="store_true", default=None,
+                        help="fetch BLOBs inline as bytes (only for small PDFs)")
+    parser.add_argument("--no-checkpoint", dest="checkpoint", action="store_false", default=None)
+    parser.add_argument("--incremental", action="store_true", default=None)
+    parser.add_argument("--change-column", help="timestamp column for incremental exports")
+    parser.add_argument("--log-file")
+    return parser
+
+
+def resolve_options(args: argparse.Namespace) -> dict:
+    """Command line over environment over config file over defaults."""
+    options = dict(DEFAULTS, checkpoint=True, incremental=False, inline_lobs=False)
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            options.update({key.replace("-", "_"): value for key, value in json.load(f).items()})
+    for name in ("username", "password", "dsn"):
+        value = os.environ.get(ENV_PREFIX + name.upper())
+        if value:
+            options[name] = value
+    options.update({key: value for key, value in vars(args).items() if value is not None and key != "config"})
+    return options
+
+
+def open_backend(options: dict):
+    if options["backend"] == "sqlite":
+        if not options.get("sqlite_path"):
+            raise SystemExit("--sqlite-path is required for the sqlite backend")
+        return SQLiteBackend(options["sqlite_path"], options["table"])
+    missing = [name for name in ("username", "password", "dsn") if not options.get(name)]
+    if missing:
+        raise SystemExit(f"Missing Oracle credentials: {', '.join(missing)}")
+    return OracleBackend(options["username"], options["password"], options["dsn"], options["table"],
+                         pool_size=options["partitions"], inline_lobs=options["inline_lobs"],
+                         driver=options["driver"])
+
+
+def main(argv: Optional[List[str]] = None):
+    options = resolve_options(build_parser().parse_args(argv))
+    if options.get("dedup") and options.get("archive"):
+        raise SystemExit("--dedup and --archive cannot be combined")
+    source = open_backend(options)
+    os.makedirs(options["output_dir"], exist_ok=True)
+    setup_logging(options["log_file"])
+
+    try:
+        fetch_stats, write_stats = export_qr_codes(
+            source,
+            output_dir=options["output_dir"],
+            batch_size=options["batch_size"],
+            writers=options["writers"],
+            queue_depth=options["queue_depth"],
+            partitions=options["partitions"],
+            retries=options["retries"],
+            checkpoint=options["checkpoint"],
+            incremental=options["incremental"],
+            change_column=options.get("change_column"),
+            layout=options["layout"],
+            dedup=options.get("dedup"),
+            archive=options.get("archive"),
+            compression=options["compression"]
+        )
+    except Exception as e:
+        print(f"Export failed: {e}")
+        raise
+    finally:
+        source.close()
+    print(f"Processed {write_stats.rows} rows")
+    print("QR Code Export completed successfully.")
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from qr_export.checkpoint import ExportCheckpoint
+from qr_export.writer import LAYOUTS, SPOOL_MAX_BYTES, DigestTee, qr_pdf_path, write_blob
+
+
+STORE_DIR = "_objects"
+DEDUP_MANIFEST_NAME = "dedup_manifest.json"
+LINK_MODES = ("hardlink", "symlink")
+
+
+class DedupSink:
+    """
+    Output backend that stores each distinct PDF once, under
+    ``base_dir/_objects/<sha256[:2]>/<sha256>.pdf``, and makes every
+    ``plant_code/file_name.pdf`` a hard link (or symlink) to its object.
+
+    Blobs are hashed while they stream in; when the hash is already stored nothing is
+    written but the link. ``dedup_manifest.json`` maps every exported path to its hash
+    and lets reruns skip files whose link already points at the right object. Where
+    the file system cannot link (e.g. symlinks without the Windows privilege) the
+    object is copied instead.
+    """
+
+    def __init__(self, base_dir: str, layout: str = "plant", link: str = "hardlink"):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown output layout '{layout}', expected one of {LAYOUTS}")
+        if link not in LINK_MODES:
+            raise ValueError(f"Unknown link mode '{link}', expected one of {LINK_MODES}")
+        self.base_dir = base_dir
+        self.layout = layout
+        self.link = link
+        self.store_dir = os.path.join(base_dir, STORE_DIR)
+        self.manifest_path = os.path.join(base_dir, DEDUP_MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+        self.stored = 0
+        self.deduplicated = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def path_for(self, file_name: str, plant_code: str) -> str:
+        return qr_pdf_path(file_name, plant_code, self.base_dir, self.layout)
+
+    def object_path(self, sha256: str) -> str:
+        return os.path.join(self.store_dir, sha256[:2], f"{sha256}.pdf")
+
+    def write(self, file_name: str, plant_code: str, blob, digest=None) -> int:
+        """Store ``blob`` if its content is new and link its PDF path to it; returns the blob size."""
+        if not blob:
+            print(f"[WARN] No QR code blob for {file_name} in plant {plant_code}")
+            return 0
+        file_path = self.path_for(file_name, plant_code)
+        try:
+            sha256 = hashlib.sha256()
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, dir=self.store_dir) as spool:
+                size = write_blob(blob, spool, DigestTee(sha256, digest))
+                object_path = self.object_path(sha256.hexdigest())
+                is_new = False
+                if not os.path.exists(object_path):
+                    spool.seek(0)
+                    is_new = self._store_object(spool, object_path)
+            self._link(object_path, file_path)
+        except Exception as e:
+            print(f"[ERROR] Failed to save {file_path}: {e}")
+            raise
+
+        with self._lock:
+            self.manifest[self._relative(file_path)] = sha256.hexdigest()
+            if is_new:
+                self.stored += 1
+            else:
+                self.deduplicated += 1
+                self.bytes_saved += size
+        print(f"[SUCCESS] {'Saved' if is_new else 'Linked'}: {file_path}")
+        return size
+
+    def is_unchanged(self, checkpoint: ExportCheckpoint, file_name: str, plant_code: str, blob) -> bool:
+        """
+        True when the manifest maps the PDF path to a stored object, the path still
+        links to it and ``blob`` has the object's size (and hash, when the bytes are at
+        hand). The checkpoint is not needed; the manifest carries the hashes.
+        """
+        if not blob:
+            return False
+        file_path = self.path_for(file_name, plant_code)
+        with self._lock:
+            sha256 = self.manifest.get(self._relative(file_path))
+        if sha256 is None:
+            return False
+        object_path = self.object_path(sha256)
+        if not (os.path.exists(object_path) and os.path.exists(file_path)):
+            return False
+        if isinstance(blob, (bytes, bytearray)):
+            return hashlib.sha256(blob).hexdigest() == sha256
+        return blob.size() == os.path.getsize(object_path)
+
+    def close(self):
+        temp_path = f"{self.manifest_path}.part"
+        with self._lock:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=0, sort_keys=True)
+            os.replace(temp_path, self.manifest_path)
+        print(f"[STATS] dedup: {self.stored} unique PDFs stored, {self.deduplicated} duplicates linked, "
+              f"{self.bytes_saved / 1024 / 1024:.1f} MB not written")
+
+    def _load_manifest(self) -> dict:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.base_dir)
+
+    def _store_object(self, spool, object_path: str) -> bool:
+        """
+        Write the object under a temp name and rename it into place unless another
+        writer stored the same content first. Returns True when this call stored it.
+        """
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        temp_path = f"{object_path}.{threading.get_ident()}.part"
+        try:
+            with open(temp_path, "wb") as f:
+                shutil.copyfileobj(spool, f)
+            # Deciding and renaming under the lock means exactly one writer of a given
+            # content counts it as stored.
+            with self._lock:
+                if os.path.exists(object_path):
+                    return False
+                os.replace(temp_path, object_path)
+                return True
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _link(self, object_path: str, file_path: str):
+        if os.path.exists(file_path) and os.path.samefile(object_path, file_path):
+            return
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_path = f"{file_path}.{threading.get_ident()}.part"
+        try:
+            try:
+                if self.link == "hardlink":
+                    os.link(object_path, temp_path)
+                else:
+                    os.symlink(os.path.relpath(object_path, os.path.dirname(file_path)), temp_path)
+            except OSError:
+                shutil.copyfile(object_path, temp_path)
+            os.replace(temp_path, file_path)
+        finally:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,348 @@
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+
+from qr_export.archive import ArchiveSink
+from qr_export.backends import OracleBackend
+from qr_export.checkpoint import ExportCheckpoint, KeyTracker
+from qr_export.dedup import DedupSink
+from qr_export.writer import LooseFileSink
+
+
+def setup_logging(log_file: str):
+    logging.basicConfig(
+        filename=log_file,
+        filemode="a",
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+    )
+
+
+class StageStats:
+    """Thread-safe row/byte counters and busy time for one pipeline stage."""
+
+    def __init__(self, name: str, threads: int = 1):
+        self.name = name
+        self.threads = threads
+        self.rows = 0
+        self.skipped = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, nbytes: int, seconds: float, skipped: bool = False):
+        with self._lock:
+            self.rows += 1
+            self.skipped += skipped
+            self.bytes += nbytes
+            self.busy += seconds
+
+    def report(self, wall: float):
+        busy = self.busy / self.threads
+        rate = self.rows / busy if busy > 0 else 0.0
+        skipped = f" ({self.skipped} unchanged, skipped)" if self.skipped else ""
+        print(f"[STATS] {self.name}: {self.rows} rows{skipped}, {self.bytes / 1024 / 1024:.1f} MB, "
+              f"{rate:.0f} rows/sec, busy {busy:.1f}s of {wall:.1f}s wall")
+
+
+def _fetch_stage(rows: Iterator, work_queue: queue.Queue, writers: int, stats: StageStats, errors: list,
+                 failed: threading.Event):
+    try:
+        rows = iter(rows)
+        seq = 0
+        # Once a writer has failed the run is lost; stop fetching so it ends promptly.
+        while not failed.is_set():
+            start = time.perf_counter()
+            row = next(rows, None)
+            if row is None:
+                break
+            blob = row[3]
+            inline_bytes = len(blob) if isinstance(blob, (bytes, bytearray)) else 0
+            stats.record(inline_bytes, time.perf_counter() - start)
+            # Blocks once queue_depth rows are waiting, so fetching never runs
+            # more than a bounded distance ahead of the writers.
+            work_queue.put((seq, row))
+            seq += 1
+    except Exception as e:
+        errors.append(e)
+        failed.set()
+    finally:
+        # A stream left part-way must close its cursor while the connection is open.
+        try:
+            if hasattr(rows, "close"):
+                rows.close()
+        except Exception as e:
+            errors.append(e)
+        for _ in range(writers):
+            work_queue.put(None)
+
+
+def _write_stage(work_queue: queue.Queue, sink, stats: StageStats, errors: list, failed: threading.Event,
+                 checkpoint: Optional[ExportCheckpoint] = None, tracker: Optional[KeyTracker] = None,
+                 skip_unchanged: bool = False):
+    # Keeps draining the queue after a failure, so the fetcher never blocks on a full
+    # queue with no writers left.
+    while True:
+        item = work_queue.get()
+        if item is None:
+            break
+        if failed.is_set():
+            continue
+        seq, (row_key, file_name, plant_code, blob) = item
+        start = time.perf_counter()
+        written = 0
+        skipped = False
+        try:
+            if file_name and plant_code:
+                if (skip_unchanged and checkpoint is not None
+                        and sink.is_unchanged(checkpoint, file_name, plant_code, blob)):
+                    skipped = True
+                else:
+                    digest = hashlib.sha256() if checkpoint is not None else None
+                    written = sink.write(file_name, plant_code, blob, digest)
+                    if written and checkpoint is not None:
+                        checkpoint.record_file(sink.path_for(file_name, plant_code), written, digest.hexdigest())
+            if tracker is not None:
+                tracker.done(seq, row_key)
+        except Exception as e:
+            # The row's key is not marked done, so the resume key stays before it and
+            # the retry (or next run) fetches it again.
+            errors.append(e)
+            failed.set()
+            continue
+        stats.record(written, time.perf_counter() - start, skipped)
+
+
+def run_export_pipeline(
+    rows: Iterator[Tuple[str, str, str, object]],
+    sink,
+    writers: int = 4,
+    queue_depth: int = 64,
+    progress_every: Optional[float] = 10.0,
+    checkpoint: Optional[ExportCheckpoint] = None,
+    tracker: Optional[KeyTracker] = None,
+    skip_unchanged: bool = False,
+    fetch_stats: Optional[StageStats] = None,
+    write_stats: Optional[StageStats] = None
+) -> Tuple[StageStats, StageStats]:
+    """
+    Producer/consumer export: one thread fetches rows from ``rows`` while ``writers``
+    threads stream each BLOB to ``sink`` (e.g. a LooseFileSink), connected by a queue holding at most
+    ``queue_depth`` rows. Wall time approaches the slower stage rather than
+    the sum of both. Returns the fetch and write stage stats.
+
+    With a ``checkpoint`` every written file's size and hash is recorded, ``tracker``
+    commits the last fully written row key, and ``skip_unchanged`` skips rows whose
+    file already matches the checkpoint. The first error in either stage stops the
+    pipeline and is raised once every thread has finished; rows from the failed one on
+    are not committed. Stats objects may be passed in to share them
+    between several pipelines; ``progress_every=None`` disables progress lines and
+    the final report.
+    """
+    work_queue = queue.Queue(maxsize=queue_depth)
+    fetch_stats = fetch_stats or StageStats("fetch")
+    write_stats = write_stats or StageStats("write", writers)
+    errors = []
+    failed = threading.Event()
+
+    start = time.perf_counter()
+    fetcher = threading.Thread(target=_fetch_stage, args=(rows, work_queue, writers, fetch_stats, errors, failed),
+                               name="qr-fetch", daemon=True)
+    writer_args = (work_queue, sink, write_stats, errors, failed, checkpoint, tracker, skip_unchanged)
+    writer_threads = [threading.Thread(target=_write_stage, args=writer_args, name=f"qr-write-{i}", daemon=True)
+                      for i in range(writers)]
+    fetcher.start()
+    for thread in writer_threads:
+        thread.start()
+
+    while fetcher.is_alive():
+        fetcher.join(progress_every)
+        if progress_every is not None:
+            print(f"Fetched {fetch_stats.rows} rows, wrote {write_stats.rows} rows, {work_queue.qsize()} queued")
+    for thread in writer_threads:
+        thread.join()
+
+    if progress_every is not None:
+        wall = time.perf_counter() - start
+        fetch_stats.report(wall)
+        write_stats.report(wall)
+    if errors:
+        raise errors[0]
+    return fetch_stats, write_stats
+
+
+def _export_partition(source, partition: int, partitions: int, sink, batch_size: int,
+                      writers: int, queue_depth: int, store: Optional[ExportCheckpoint], incremental: bool,
+                      change_column: Optional[str], since: Optional[datetime], retries: int,
+                      fetch_stats: StageStats, write_stats: StageStats):
+    scope = f"{partition}/{partitions}"
+    for attempt in range(retries + 1):
+        # Each attempt resumes after the partition's last committed key.
+        after_key = store.resume_key(scope) if store else None
+        conn = source.acquire()
+        try:
+            rows = source.stream(conn, batch_size, partition, partitions, after_key, change_column, since)
+            run_export_pipeline(rows, sink, writers, queue_depth, progress_every=None,
+                                checkpoint=store, tracker=store.tracker(scope) if store else None,
+                                skip_unchanged=incremental, fetch_stats=fetch_stats, write_stats=write_stats)
+            return
+        except Exception as e:
+            if attempt == retries:
+                print(f"[ERROR] Partition {scope} failed after {retries + 1} attempts: {e}")
+                raise
+            print(f"[WARN] Partition {scope} failed ({e}), retrying from its checkpoint")
+        finally:
+            source.release(conn)
+
+
+def export_qr_codes(
+    source,
+    output_dir: str = "qr_codes",
+    batch_size: int = 1000,
+    writers: int = 4,
+    queue_depth: int = 64,
+    partitions: int = 1,
+    retries: int = 2,
+    checkpoint: bool = True,
+    incremental: bool = False,
+    change_column: Optional[str] = None,
+    progress_every: float = 10.0,
+    layout: str = "plant",
+    dedup: Optional[str] = None,
+    archive: Optional[str] = None,
+    compression: str = "stored",
+    sink=None
+) -> Tuple[StageStats, StageStats]:
+    """
+    Export every QR PDF from ``source`` (an ExportBackend) to ``output_dir``, as
+    ``<plant_code>/<file>.pdf`` or, with ``layout="flat"``, ``<plant_code>_<file>.pdf``.
+    With ``dedup`` ("hardlink" or "symlink") each distinct PDF is stored once and
+    every exported path links to it (see DedupSink). With ``archive`` ("zip" or
+    "tar") the PDFs go into one archive per plant instead of loose files (see
+    ArchiveSink); a full run rebuilds the archives, an incremental one appends to
+    them. A custom output ``sink`` can be passed instead.
+
+    The table is split into ``partitions`` disjoint hash buckets, each exported on its
+    own connection with its own fetch thread and ``writers`` writer threads, so
+    throughput scales with partitions until the database or disk saturates. A
+    partition that fails is retried up to ``retries`` times from its checkpoint.
+
+    With ``checkpoint`` the export keeps a SQLite checkpoint in ``output_dir`` and a
+    rerun after a failure resumes after the last committed row of each partition.
+    ``incremental`` skips files whose size/hash already match the checkpoint and, when
+    ``change_column`` is given, only fetches rows whose ``change_column`` is later than
+    the start of the last completed run.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    store = ExportCheckpoint(output_dir) if checkpoint or incremental else None
+    resuming = store is not None and store.get("run_started") is not None
+    if sink is None and archive:
+        # Full runs rebuild each archive rather than append every member again.
+        sink = ArchiveSink(output_dir, layout, archive, compression, rebuild=not incremental, resume=resuming)
+    elif sink is None:
+        sink = DedupSink(output_dir, layout, dedup) if dedup else LooseFileSink(output_dir, layout)
+    since = None
+    if store and incremental and change_column:
+        last_run_started = store.get("last_run_started")
+        since = datetime.fromisoformat(last_run_started) if last_run_started else None
+
+    fetch_stats = StageStats("fetch", partitions)
+    write_stats = StageStats("write", partitions * writers)
+    start = time.perf_counter()
+    try:
+        if store:
+            # An interrupted run keeps its original start time so the next
+            # incremental run does not miss rows changed while it was resumed.
+            run_started = store.get("run_started")
+            if run_started is None:
+                conn = source.acquire()
+                try:
+                    run_started = source.now(conn).isoformat()
+                finally:
+                    source.release(conn)
+                store.set("run_started", run_started)
+                store.commit()
+            else:
+                print(f"Resuming interrupted export started at {run_started}")
+
+        with ThreadPoolExecutor(max_workers=partitions, thread_name_prefix="qr-partition") as executor:
+            futures = [executor.submit(_export_partition, source, partition, partitions, sink, batch_size,
+                                       writers, queue_depth, store, incremental, change_column, since, retries,
+                                       fetch_stats, write_stats)
+                       for partition in range(partitions)]
+            pending = futures
+            while pending:
+                _, pending = wait(futures, timeout=progress_every)
+                if pending:
+                    print(f"Fetched {fetch_stats.rows} rows, wrote {write_stats.rows} rows "
+                          f"({len(futures) - len(pending)}/{partitions} partitions done)")
+            for future in futures:
+                future.result()
+
+        if store:
+            store.set("last_run_started", run_started)
+            store.delete("run_started")
+            for partition in range(partitions):
+                store.clear_resume_key(f"{partition}/{partitions}")
+            store.commit()
+        # Sinks that stage their output (archives) publish it only after a
+        # complete run, and after the checkpoint no longer points at a resume.
+        if hasattr(sink, "finish"):
+            sink.finish()
+    finally:
+        sink.close()
+        if store:
+            store.close()
+    wall = time.perf_counter() - start
+    fetch_stats.report(wall)
+    write_stats.report(wall)
+    return fetch_stats, write_stats
+
+
+def download_qr_codes_from_oracle(
+    username: str,
+    password: str,
+    dsn: str,
+    output_dir: str = "qr_codes",
+    table_name: str = "ZSAP_FIX_ASSET",
+    batch_size: int = 1000,
+    log_file: str = "qr_export.log",
+    writers: int = 4,
+    queue_depth: int = 64,
+    inline_lobs: bool = False,
+    checkpoint: bool = True,
+    incremental: bool = False,
+    change_column: Optional[str] = None,
+    partitions: int = 1,
+    retries: int = 2,
+    driver: str = "cx_Oracle",
+    layout: str = "plant",
+    dedup: Optional[str] = None,
+    archive: Optional[str] = None,
+    compression: str = "stored"
+):
+    """Export every QR PDF in the Oracle ``table_name``; see ``export_qr_codes``."""
+    os.makedirs(output_dir, exist_ok=True)
+    setup_logging(log_file)
+
+    source = OracleBackend(username, password, dsn, table_name, pool_size=partitions, inline_lobs=inline_lobs,
+                           driver=driver)
+    try:
+        fetch_stats, write_stats = export_qr_codes(
+            source, output_dir, batch_size, writers, queue_depth, partitions, retries,
+            checkpoint, incremental, change_column, layout=layout, dedup=dedup,
+            archive=archive, compression=compression
+        )
+    except Exception as e:
+        print(f"Export failed: {e}")
+        raise
+    finally:
+        source.close()
+    print(f"Processed {write_stats.rows} rows")
+    print("QR Code Export completed successfully.")
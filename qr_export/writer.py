@@ -0,0 +1,137 @@
+import hashlib
+import os
+import threading
+
+from qr_export.checkpoint import ExportCheckpoint
+
+
+LOB_CHUNKS_PER_READ = 16
+LAYOUTS = ("plant", "flat")
+# Blobs up to this size are staged in memory by the dedup and archive sinks before
+# they are stored; larger ones spill to a temp file.
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def write_blob(blob, f, digest=None) -> int:
+    """
+    Copy ``blob`` (a LOB or bytes) into the open file ``f`` and return the number of
+    bytes written, feeding the data to ``digest`` (a hashlib object) when one is given.
+    """
+    if isinstance(blob, (bytes, bytearray)):
+        f.write(blob)
+        if digest is not None:
+            digest.update(blob)
+        return len(blob)
+    # Read whole multiples of the LOB's chunk size, so each round trip lines up with
+    # its storage chunks and only one buffer is held in memory whatever the PDF size.
+    amount = blob.getchunksize() * LOB_CHUNKS_PER_READ
+    size = blob.size()
+    offset = 1
+    while offset <= size:
+        data = blob.read(offset, amount)
+        if not data:
+            break
+        f.write(data)
+        if digest is not None:
+            digest.update(data)
+        offset += len(data)
+    return offset - 1
+
+
+class DigestTee:
+    """Feeds the same data to several hashlib objects (``None`` entries are ignored)."""
+
+    def __init__(self, *digests):
+        self.digests = [digest for digest in digests if digest is not None]
+
+    def update(self, data):
+        for digest in self.digests:
+            digest.update(data)
+
+
+def safe_pdf_name(file_name: str) -> str:
+    safe_file_name = file_name.replace("/", "_").replace("\\", "_").strip()
+    if not safe_file_name.lower().endswith(".pdf"):
+        safe_file_name += ".pdf"
+    return safe_file_name
+
+
+def qr_pdf_path(file_name: str, plant_code: str, base_dir: str, layout: str = "plant") -> str:
+    """``base_dir/plant_code/file_name.pdf``, or ``base_dir/plant_code_file_name.pdf`` for the flat layout."""
+    if layout == "flat":
+        return os.path.join(base_dir, f"{plant_code}_{safe_pdf_name(file_name)}")
+    return os.path.join(base_dir, plant_code, safe_pdf_name(file_name))
+
+
+def save_blob_to(file_path: str, blob, digest=None) -> int:
+    """
+    Stream ``blob`` to ``file_path`` through a temp file that is renamed into place, so
+    a partial PDF is never left under its final name. Returns the bytes written;
+    a failed read or write is logged and raised.
+    """
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    temp_path = f"{file_path}.{threading.get_ident()}.part"
+    try:
+        print(f"[INFO] Saving: {file_path}")
+        with open(temp_path, "wb") as f:
+            written = write_blob(blob, f, digest)
+        os.replace(temp_path, file_path)
+        print(f"[SUCCESS] Saved: {file_path}")
+        return written
+    except Exception as e:
+        print(f"[ERROR] Failed to save {file_path}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def save_qr_pdf(file_name: str, plant_code: str, blob, base_dir: str, digest=None) -> int:
+    """Save one QR PDF as ``base_dir/plant_code/file_name.pdf``; returns the bytes written (0 for no blob)."""
+    if not blob:
+        print(f"[WARN] No QR code blob for {file_name} in plant {plant_code}")
+        return 0
+    return save_blob_to(qr_pdf_path(file_name, plant_code, base_dir), blob, digest)
+
+
+def is_unchanged(checkpoint: ExportCheckpoint, file_path: str, blob) -> bool:
+    """
+    True when ``file_path`` is on disk with the size recorded in the checkpoint and
+    ``blob`` has that size too (and the recorded hash, when the bytes are at hand).
+    Checking a LOB's size costs one round trip but avoids transferring its content.
+    """
+    if not blob:
+        return False
+    entry = checkpoint.file_entry(file_path)
+    if entry is None or not os.path.exists(file_path):
+        return False
+    size, sha256 = entry
+    if os.path.getsize(file_path) != size:
+        return False
+    if isinstance(blob, (bytes, bytearray)):
+        return len(blob) == size and hashlib.sha256(blob).hexdigest() == sha256
+    return blob.size() == size
+
+
+class LooseFileSink:
+    """Output backend that writes every PDF as its own file under ``base_dir``."""
+
+    def __init__(self, base_dir: str, layout: str = "plant"):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown output layout '{layout}', expected one of {LAYOUTS}")
+        self.base_dir = base_dir
+        self.layout = layout
+
+    def path_for(self, file_name: str, plant_code: str) -> str:
+        return qr_pdf_path(file_name, plant_code, self.base_dir, self.layout)
+
+    def write(self, file_name: str, plant_code: str, blob, digest=None) -> int:
+        if not blob:
+            print(f"[WARN] No QR code blob for {file_name} in plant {plant_code}")
+            return 0
+        return save_blob_to(self.path_for(file_name, plant_code), blob, digest)
+
+    def is_unchanged(self, checkpoint: ExportCheckpoint, file_name: str, plant_code: str, blob) -> bool:
+        return is_unchanged(checkpoint, self.path_for(file_name, plant_code), blob)
+
+    def close(self):
+        pass
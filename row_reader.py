@@ -0,0 +1,83 @@
+import os
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+def iter_row_chunks(file_path: str, chunk_size: int = 1000, sheet_name: str = None, dtype=None):
+    """
+    Stream a spreadsheet as DataFrames of at most ``chunk_size`` rows, so callers can
+    start work after the first chunk and peak memory is bounded by the chunk size
+    instead of the workbook size.
+
+    .xlsx/.xlsm files are read with openpyxl in read-only mode (first sheet unless
+    ``sheet_name`` is given); .csv and .parquet files are supported as fallbacks, and
+    pickled DataFrames (.pkl) are sliced.
+    The first row of an Excel sheet is the header, as with ``pd.read_excel``.
+
+    Column types are never inferred per chunk, so a value comes out the same
+    wherever the chunks split: Excel cells keep the Python type openpyxl reads them
+    as (int, float, str, datetime) in object columns, with blank cells as NaN; CSV
+    fields stay text; Parquet and pickled frames keep the file's types. ``dtype`` (a
+    type or a column -> type dict, as for ``DataFrame.astype``) is applied to every
+    chunk.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    for chunk in _iter_chunks(file_path, chunk_size, sheet_name):
+        yield chunk if dtype is None else chunk.astype(dtype)
+
+
+def _iter_chunks(file_path: str, chunk_size: int, sheet_name: str = None):
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in EXCEL_EXTENSIONS:
+        yield from _iter_excel_chunks(file_path, chunk_size, sheet_name)
+    elif extension == ".csv":
+        yield from pd.read_csv(file_path, chunksize=chunk_size, dtype=object)
+    elif extension == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif extension == ".pkl":
+        frame = pd.read_pickle(file_path)
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start:start + chunk_size].reset_index(drop=True)
+    else:
+        raise ValueError(f"Unsupported file type for streaming: {file_path}")
+
+
+def _frame(rows: list, columns: list) -> pd.DataFrame:
+    # Object columns hold each cell as read; letting pandas infer a dtype per chunk
+    # would turn 10001 into 10001.0 in a chunk that also has a blank cell.
+    frame = pd.DataFrame(rows, columns=columns, dtype=object)
+    return frame.where(frame.notna(), np.nan)
+
+
+def _iter_excel_chunks(file_path: str, chunk_size: int, sheet_name: str = None):
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+        width = len(columns)
+
+        chunk = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield _frame(chunk, columns)
+                chunk = []
+        if chunk:
+            yield _frame(chunk, columns)
+    finally:
+        workbook.close()
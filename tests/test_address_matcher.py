@@ -0,0 +1,90 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from address_matcher import AddressMatcher
+from gazetteer import load_gazetteer
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return AddressMatcher(load_gazetteer())
+
+
+@pytest.mark.parametrize("address, corrected", [
+    ("Ikejaa, Lagoss", "ikeja lagos"),
+    ("12 Awolowo Rd Ikejaa Lagoss", "12 awolowo rd ikeja lagos"),
+    ("warri south wese", "warri south west"),
+    ("Abeokuta Sout, Ogun", "abeokuta south ogun"),
+    # Followed by "state" only state names are considered: Kebbi, not the LGA Kebbe.
+    ("Kebb State", "kebbi state"),
+    # Street words and short words are left alone.
+    ("14 adeola street, ado", "14 adeola street ado"),
+])
+def test_correct_address(matcher, address, corrected):
+    assert matcher.correct_address(address) == corrected
+
+
+@pytest.mark.parametrize("address, expected", [
+    ("Ikejaa, Lagoss", ("LA", "Ikeja", "100104", True)),
+    ("Abeokuta Sout, Ogun", ("OG", "Abeokuta South", "110102", True)),
+    ("Ikeja", ("LA", "Ikeja", "100104", True)),
+    # The corrected LGA is not in the stated state.
+    ("Ikejaa, Kano State", ("KN", None, None, False)),
+    # No match at all.
+    ("xyz qwerty", (None, None, None, False)),
+    (None, (None, None, None, False)),
+    (np.nan, (None, None, None, False)),
+])
+def test_resolve_address(matcher, address, expected):
+    state, lga, postal_code, valid = matcher.resolve_address(address)
+    assert (state.code if state else None, lga.name if lga else None, postal_code, valid) == expected
+
+
+def test_match_name(matcher):
+    name, score = matcher.match_name("ikejaa")
+    assert name == "ikeja" and score >= matcher.min_score
+    assert matcher.match_name("lagos") == ("lagos", 1.0)
+    assert matcher.match_name("qqqqq") is None
+    # Too short to correct, and digits are never corrected.
+    assert matcher.match_name("ikj") is None
+    assert matcher.match_name("ikeja1") is None
+
+
+def test_candidates_include_the_best_match(matcher):
+    # The trigram prefilter must not discard the name difflib scores best.
+    for phrase in ["ikejaa", "lagoss", "abeokuta sout", "port harcort", "kadunna"]:
+        candidates = {matcher.names[i] for i in matcher.candidates(phrase)}
+        match = matcher.match_name(phrase)
+        assert match is not None and match[0] in candidates
+
+
+def test_enrich_addresses(matcher):
+    df = pd.DataFrame({"ADDRESS": ["Ikejaa, Lagoss", "xyz qwerty", None]})
+    enriched = matcher.enrich_addresses(df)
+    assert enriched.loc[0, "ADDRESS_LGA"] == "Ikeja" and pd.isna(enriched.loc[1, "ADDRESS_LGA"])
+    assert enriched["ADDRESS_VALID"].tolist() == [True, False, False]
+
+
+def test_bulk_normalize_benchmark():
+    # 50k staff rows, about half of them with a misspelled LGA or state.
+    gazetteer = load_gazetteer()
+    rng = np.random.default_rng(0)
+    addresses = []
+    for i in range(50_000):
+        lga = gazetteer.lgas[rng.integers(len(gazetteer.lgas))]
+        lga_name, state_name = lga.name, lga.state.name
+        if rng.random() < 0.5 and len(lga_name) > 5:
+            position = int(rng.integers(1, len(lga_name) - 1))
+            lga_name = lga_name[:position] + lga_name[position + 1:]
+        addresses.append(f"{int(rng.integers(1, 300))} Adeola Street, {lga_name}, {state_name} State")
+    df = pd.DataFrame({"ADDRESS": addresses})
+
+    start = time.perf_counter()
+    enriched = AddressMatcher(gazetteer).enrich_addresses(df)
+    elapsed = time.perf_counter() - start
+    print(f"address matcher: {len(df)} rows in {elapsed:.2f}s, {enriched['ADDRESS_VALID'].mean():.1%} valid")
+    assert enriched["ADDRESS_VALID"].mean() > 0.9
+    assert elapsed < 60
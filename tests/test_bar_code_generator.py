@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+barcode = pytest.importorskip("barcode")
+from barcode.writer import ImageWriter
+from PIL import Image
+
+import bar_code_generator
+from bar_code_generator import (MANIFEST_NAME, _ordered_map, draw_equipment_label, print_render_summary,
+                                render_barcode_image, render_labels)
+
+
+def stub_barcode(equipment_id):
+    # Stands in for the Code128 writer: finishes out of order and fails for BAD ids.
+    time.sleep(random.Random(equipment_id).random() * 0.02)
+    if equipment_id.startswith("BAD"):
+        raise ValueError(f"cannot encode {equipment_id}")
+    return Image.new('RGB', (400, 120), 'black')
+
+
+@pytest.fixture(autouse=True)
+def stubbed_writer(monkeypatch):
+    monkeypatch.setattr(bar_code_generator, "render_barcode_image", stub_barcode)
+    # Threads instead of processes, so the workers see the stub too.
+    monkeypatch.setattr(bar_code_generator, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+
+def label_rows(ids):
+    return [(equipment_id, f"PUMP {equipment_id}", f"LOC-{equipment_id}") for equipment_id in ids]
+
+
+def digest(image):
+    return hashlib.sha256(image.tobytes()).hexdigest()
+
+
+def sheet_file(folder, fmt):
+    (name,) = [name for name in os.listdir(folder) if name.endswith(fmt)]
+    return os.path.join(folder, name)
+
+
+def page_count(path):
+    if path.endswith(".pdf"):
+        with open(path, "rb") as f:
+            content = f.read()
+        # Pages are appended as incremental updates; the last page tree is the current one.
+        return int(re.findall(rb"/Count (\d+)", content)[-1])
+    with Image.open(path) as sheet:
+        return sheet.n_frames
+
+
+def test_ordered_map_keeps_submission_order_and_bounds_the_window():
+    in_flight, peak = 0, 0
+    lock = threading.Lock()
+
+    def work(item):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(random.Random(item).random() * 0.01)
+        with lock:
+            in_flight -= 1
+        return item * 2
+
+    consumed = []
+
+    def items():
+        for item in range(60):
+            consumed.append(item)
+            yield item
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = _ordered_map(executor, work, items(), window=5)
+        assert next(results) == 0
+        assert len(consumed) == 5
+        assert list(results) == [item * 2 for item in range(1, 60)]
+    assert peak <= 5
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_sheet_labels_are_placed_in_row_order(tmp_path, monkeypatch, workers):
+    rows = label_rows([f"E{i:03d}" for i in range(9)])
+    placed = []
+
+    class RecordingSheetWriter(bar_code_generator.LabelSheetWriter):
+        def add(self, label_img):
+            placed.append(digest(label_img))
+            super().add(label_img)
+
+    monkeypatch.setattr(bar_code_generator, "LabelSheetWriter", RecordingSheetWriter)
+    summary = render_labels(rows, str(tmp_path), workers=workers, output_format="tiff")
+
+    expected = [digest(draw_equipment_label(*row).convert('L')) for row in rows]
+    assert placed == expected
+    assert summary["created"] == 9 and summary["files"] == 1
+    assert page_count(sheet_file(tmp_path, "tiff")) == 3
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_failures_are_summarised_in_row_order(tmp_path, capsys, workers):
+    rows = label_rows(["E001", "BAD1", "E002", "BAD2", "E003"])
+    summary = render_labels(rows, str(tmp_path), workers=workers)
+
+    assert (summary["created"], summary["failed"], summary["files"]) == (3, 2, 3)
+    assert summary["failures"] == [("BAD1", "cannot encode BAD1"), ("BAD2", "cannot encode BAD2")]
+    assert sorted(os.listdir(tmp_path)) == ["E001.png", "E002.png", "E003.png"]
+    assert summary["bytes"] == sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+
+    print_render_summary(summary, str(tmp_path))
+    output = capsys.readouterr().out
+    assert "2 labels failed:" in output
+    assert output.index("BAD1: cannot encode BAD1") < output.index("BAD2: cannot encode BAD2")
+
+
+def test_incremental_run_skips_unchanged_labels_and_removes_stale_ones(tmp_path):
+    folder = str(tmp_path)
+    ids = [f"E{i:03d}" for i in range(6)]
+    first = render_labels(label_rows(ids) + label_rows(["BAD1"]), folder, workers=2, incremental=True)
+    assert (first["created"], first["skipped"], first["removed"], first["failed"]) == (6, 0, 0, 1)
+    with open(os.path.join(folder, MANIFEST_NAME), encoding="utf-8") as f:
+        assert sorted(json.load(f)) == ids
+
+    mtimes = {equipment_id: os.stat(os.path.join(folder, f"{equipment_id}.png")).st_mtime_ns for equipment_id in ids}
+    # E001 changes, E002's PNG went missing, E005 left the sheet and E006 is new.
+    rows = label_rows(ids[:5])
+    rows[1] = ("E001", "PUMP E001 (refurbished)", "LOC-E001")
+    os.remove(os.path.join(folder, "E002.png"))
+    second = render_labels(rows + label_rows(["E006", "BAD1"]), folder, workers=2, incremental=True)
+
+    assert (second["created"], second["skipped"], second["removed"], second["failed"]) == (3, 3, 1, 1)
+    assert not os.path.exists(os.path.join(folder, "E005.png"))
+    assert sorted(name for name in os.listdir(folder) if name.endswith(".png")) == [
+        f"{equipment_id}.png" for equipment_id in ["E000", "E001", "E002", "E003", "E004", "E006"]]
+    for equipment_id in ["E000", "E003", "E004"]:
+        assert os.stat(os.path.join(folder, f"{equipment_id}.png")).st_mtime_ns == mtimes[equipment_id]
+    with open(os.path.join(folder, MANIFEST_NAME), encoding="utf-8") as f:
+        assert sorted(json.load(f)) == ["E000", "E001", "E002", "E003", "E004", "E006"]
+
+    third = render_labels(rows + label_rows(["E006"]), folder, workers=2, incremental=True)
+    assert (third["created"], third["skipped"], third["removed"]) == (0, 6, 0)
+
+
+def test_incremental_run_rerenders_everything_when_the_title_changes(tmp_path):
+    rows = label_rows(["E001", "E002"])
+    render_labels(rows, str(tmp_path), workers=1, incremental=True)
+    summary = render_labels(rows, str(tmp_path), title="SPARES", workers=1, incremental=True)
+    assert (summary["created"], summary["skipped"]) == (2, 0)
+
+
+def test_incremental_sheet_output_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        render_labels([], str(tmp_path), output_format="pdf", incremental=True)
+    with pytest.raises(ValueError):
+        render_labels([], str(tmp_path), output_format="svg")
+
+
+def temp_file_barcode(equipment_id, folder):
+    # The old round-trip: save a PNG, reopen it and delete it again.
+    code128 = barcode.get_barcode_class('code128')
+    temp_filename = code128(equipment_id, writer=ImageWriter()).save(
+        os.path.join(folder, "temp_barcode"), options={'write_text': False})
+    barcode_img = Image.open(temp_filename)
+    barcode_img.load()
+    os.remove(temp_filename)
+    return barcode_img
+
+
+def test_in_memory_barcode_benchmark(tmp_path, monkeypatch):
+    ids = [f"1000{i:04d}" for i in range(200)]
+    start = time.perf_counter()
+    temp_images = [temp_file_barcode(equipment_id, str(tmp_path)) for equipment_id in ids]
+    temp_seconds = time.perf_counter() - start
+
+    monkeypatch.chdir(tmp_path)
+    start = time.perf_counter()
+    images = [render_barcode_image(equipment_id) for equipment_id in ids]
+    memory_seconds = time.perf_counter() - start
+    print(f"barcode: temp file {temp_seconds / len(ids) * 1000:.2f} ms/label, "
+          f"in memory {memory_seconds / len(ids) * 1000:.2f} ms/label")
+    assert [image.tobytes() for image in images] == [image.tobytes() for image in temp_images]
+    assert os.listdir(tmp_path) == []
+    assert memory_seconds < temp_seconds
+
+
+@pytest.mark.parametrize("output_format", ["pdf", "tiff"])
+def test_sheet_output_benchmark(tmp_path, monkeypatch, output_format):
+    monkeypatch.setattr(bar_code_generator, "render_barcode_image", render_barcode_image)
+    rows = label_rows([f"1000{i:04d}" for i in range(40)])
+    png = render_labels(rows, str(tmp_path / "png"), workers=1)
+    sheet = render_labels(rows, str(tmp_path / output_format), workers=1, output_format=output_format)
+    for name, summary in (("png", png), (output_format, sheet)):
+        print(f"{name}: {summary['created']} labels, {summary['files']} files, "
+              f"{summary['bytes'] / 1024 / 1024:.1f} MB, {summary['elapsed']:.2f}s")
+    assert png["created"] == sheet["created"] == 40
+    assert (png["files"], sheet["files"]) == (40, 1)
+    assert len(os.listdir(tmp_path / output_format)) == 1
+    assert page_count(sheet_file(tmp_path / output_format, output_format)) == 10
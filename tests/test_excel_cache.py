@@ -0,0 +1,128 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import excel_cache
+from excel_cache import TEMP_SUFFIX, ExcelCache
+from profit_center import SHEETS_TO_PROCESS, update_profit_center
+
+
+@pytest.fixture
+def cache_root(tmp_path, monkeypatch):
+    # Worker processes pick the root up from the environment, this process from the module.
+    root = str(tmp_path / "cache")
+    monkeypatch.setenv("EXCEL_CACHE_DIR", root)
+    monkeypatch.setattr(excel_cache, "DEFAULT_CACHE_DIR", root)
+    monkeypatch.setattr(excel_cache, "_caches", {})
+    return root
+
+
+def write_workbook(path, sheets: dict):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=name, index=False)
+
+
+def stock_sheet(rng, rows):
+    return pd.DataFrame({
+        "RM_MatCode": rng.integers(10_000_000, 10_000_500, size=rows),
+        "FG_MatCode": rng.integers(20_000_000, 20_000_050, size=rows),
+        **{column: np.round(rng.normal(100, 50, size=rows), 2) for column in
+           ["RM-Op_Stock", "Val.Diff_OpStock", "FG-Op_Stock", "FG_Val.Diff_OpStock",
+            "ClsStock_Qty", "Val.Diff_ClsStock", "FG_ClsStock_Qty", "Val.Diff_FG_ClsStock"]},
+    })
+
+
+def test_default_cache_is_one_root_for_every_workbook(cache_root, tmp_path):
+    for folder in ("a", "b"):
+        os.makedirs(tmp_path / folder)
+        write_workbook(tmp_path / folder / "book.xlsx", {"S": pd.DataFrame({"x": [1, 2]})})
+        excel_cache.read_excel_cached(str(tmp_path / folder / "book.xlsx"))
+    assert len(glob.glob(os.path.join(cache_root, "*.json"))) == 2
+    assert not os.path.exists(tmp_path / "a" / ".excel_cache")
+
+
+def test_eviction_covers_workbooks_in_different_folders(tmp_path):
+    cache = ExcelCache(str(tmp_path / "cache"), max_bytes=1)
+    paths = []
+    for folder in ("a", "b"):
+        os.makedirs(tmp_path / folder)
+        paths.append(str(tmp_path / folder / "book.xlsx"))
+        write_workbook(paths[-1], {"S": pd.DataFrame({"x": range(100)})})
+        cache.read(paths[-1])
+    # Only the workbook just read survives the cap.
+    keys = {os.path.basename(path).split("_", 1)[0].split(".", 1)[0]
+            for path in glob.glob(os.path.join(cache.cache_dir, "*"))}
+    assert keys == {excel_cache._digest(os.path.abspath(paths[1]))}
+
+
+def test_changed_workbook_keeps_other_processes_temp_files(tmp_path):
+    cache = ExcelCache(str(tmp_path / "cache"))
+    path = str(tmp_path / "book.xlsx")
+    write_workbook(path, {"S": pd.DataFrame({"x": [1]})})
+    cache.read(path)
+    stale = glob.glob(os.path.join(cache.cache_dir, "*.parquet"))
+    in_flight = stale[0] + f".12345{TEMP_SUFFIX}"
+    open(in_flight, "wb").close()
+
+    write_workbook(path, {"S": pd.DataFrame({"x": [2]})})
+    assert cache.read(path)["x"].tolist() == [2]
+    assert os.path.exists(in_flight)
+    assert not os.path.exists(stale[0])
+
+
+def test_vanished_temp_file_is_a_cache_miss(tmp_path, monkeypatch):
+    cache = ExcelCache(str(tmp_path / "cache"))
+    path = str(tmp_path / "book.xlsx")
+    write_workbook(path, {"S": pd.DataFrame({"x": [1, 2]})})
+    cache.sheet_names(path)
+
+    def replace(source, target):
+        os.remove(source)
+        raise FileNotFoundError(source)
+
+    monkeypatch.setattr(excel_cache.os, "replace", replace)
+    assert cache.read(path)["x"].tolist() == [1, 2]
+    monkeypatch.undo()
+    assert cache.read(path)["x"].tolist() == [1, 2]
+
+
+@pytest.mark.parametrize("content", [b"", b'{"size": 12', b"\x00\x01 not json"])
+def test_corrupt_entry_is_a_cache_miss(tmp_path, content):
+    cache = ExcelCache(str(tmp_path / "cache"))
+    path = str(tmp_path / "book.xlsx")
+    write_workbook(path, {"S": pd.DataFrame({"x": [1, 2]})})
+    sha256 = cache.sha256(path)
+    (entry_path,) = glob.glob(os.path.join(cache.cache_dir, "*.json"))
+    with open(entry_path, "wb") as f:
+        f.write(content)
+
+    assert cache.read(path)["x"].tolist() == [1, 2]
+    assert cache.sha256(path) == sha256 == excel_cache.file_sha256(path)
+
+
+def test_eviction_skips_folders_under_the_root(tmp_path):
+    cache = ExcelCache(str(tmp_path / "cache"), max_bytes=1)
+    os.makedirs(os.path.join(cache.cache_dir, "profit_center", "2024-01"))
+    path = str(tmp_path / "book.xlsx")
+    write_workbook(path, {"S": pd.DataFrame({"x": range(100)})})
+    cache.read(path)
+    cache.evict()
+    assert os.path.isdir(os.path.join(cache.cache_dir, "profit_center", "2024-01"))
+
+
+def test_update_profit_center_on_a_cold_cache_with_two_workers(cache_root, tmp_path):
+    # Both workers find the workbooks uncached (and, after the first run, the current
+    # workbook changed) and fill the shared cache at the same time.
+    rng = np.random.default_rng(0)
+    sheets = SHEETS_TO_PROCESS + ["A113"]
+    previous_path, current_path = str(tmp_path / "prev.xlsx"), str(tmp_path / "curr.xlsx")
+    write_workbook(previous_path, {name: stock_sheet(rng, 2_000) for name in sheets})
+    for _ in range(5):
+        write_workbook(current_path, {name: stock_sheet(rng, 2_000) for name in sheets})
+        updated = update_profit_center(previous_path, current_path, sheets, workers=2)
+        assert sorted(updated) == sorted(sheets)
+    assert not glob.glob(os.path.join(cache_root, "*" + TEMP_SUFFIX))
@@ -0,0 +1,119 @@
+import copy
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gazetteer import (DEFAULT_GAZETTEER_PATH, ENRICHED_COLUMNS, Gazetteer, load_gazetteer, normalize_name,
+                       validate_records)
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return load_gazetteer()
+
+
+def test_normalize_name():
+    assert normalize_name("  Ife-Central ") == "ife central"
+    assert normalize_name("AKWA_IBOM") == "akwa ibom"
+
+
+def test_lookups(gazetteer):
+    assert len(gazetteer.states) == 37
+    assert gazetteer.state("la").name == "Lagos"
+    assert gazetteer.state("Akwa-Ibom") is gazetteer.state("AK")
+    assert gazetteer.state("FCT").code == "FC"
+    assert gazetteer.state("Atlantis") is None
+    assert gazetteer.lga("ikeja").postal_code == "100104"
+    # Surulere is an LGA of both Lagos and Oyo.
+    assert gazetteer.lga("Surulere") is None
+    assert gazetteer.lga("Surulere", "Oyo").state.code == "OY"
+    assert [lga.name for lga in gazetteer.lgas_by_postal("450211")] == ["Aba North"]
+    assert len(gazetteer.latitudes) == len(gazetteer.lgas)
+
+
+@pytest.mark.parametrize("address, expected", [
+    ("12 Awolowo Rd, Ikeja, Lagos State", ("LA", "Ikeja", "100104", True)),
+    ("Surulere, Oyo", ("OY", "Surulere", "211104", True)),
+    ("Nasarawa, Kano", ("KN", "Nasarawa", "700112", True)),
+    ("plot 4 nasarawa state", ("NA", None, None, True)),
+    ("Aba North, Abia 450211", ("AB", "Aba North", "450211", True)),
+    ("FCT Abuja", ("FC", None, None, True)),
+    # An LGA of another state, or a postal code of another state, makes the address invalid.
+    ("Ikeja, Kano State", ("KN", None, None, False)),
+    ("Ikeja Lagos 450211", ("LA", "Ikeja", "450211", False)),
+    # Ambiguous or missing place names.
+    ("Surulere", (None, None, None, False)),
+    ("no place here", (None, None, None, False)),
+    (None, (None, None, None, False)),
+    (np.nan, (None, None, None, False)),
+])
+def test_resolve_address(gazetteer, address, expected):
+    state, lga, postal_code, valid = gazetteer.resolve_address(address)
+    assert (state.code if state else None, lga.name if lga else None, postal_code, valid) == expected
+
+
+def test_enrich_addresses(gazetteer):
+    df = pd.DataFrame({"ID": [1, 2, 3, 4], "ADDRESS": ["Ikeja, Lagos", None, "nowhere", "Ikeja, Lagos"]},
+                      index=[10, 11, 12, 13])
+    enriched = gazetteer.enrich_addresses(df)
+    assert list(enriched.columns) == ["ID", "ADDRESS"] + ENRICHED_COLUMNS
+    assert list(enriched.index) == [10, 11, 12, 13]
+    assert enriched.loc[10, ["ADDRESS_STATE", "ADDRESS_STATE_CODE", "ADDRESS_LGA", "ADDRESS_POSTAL_CODE"]].tolist() == [
+        "Lagos", "LA", "Ikeja", "100104"]
+    assert enriched["ADDRESS_VALID"].tolist() == [True, False, False, True]
+    assert pd.isna(enriched.loc[11, "ADDRESS_STATE"])
+
+
+def test_enrich_addresses_resolves_each_distinct_address_once(gazetteer):
+    calls = []
+
+    def resolve(address):
+        calls.append(address)
+        return gazetteer.resolve_address(address)
+
+    df = pd.DataFrame({"ADDRESS": ["Ikeja, Lagos", "Surulere, Oyo"] * 50})
+    gazetteer.enrich_addresses(df, resolve=resolve)
+    assert sorted(calls) == ["Ikeja, Lagos", "Surulere, Oyo"]
+
+
+def test_validate_records_reports_problems():
+    with open(DEFAULT_GAZETTEER_PATH, encoding="utf-8") as f:
+        records = json.load(f)
+    assert validate_records(records) == []
+    broken = copy.deepcopy(records)
+    broken[0]["lgas"][0]["postal_code"] = "12"
+    broken[1]["lgas"][0]["latitude"] = 51.5
+    broken[2]["code"] = broken[3]["code"]
+    problems = validate_records(broken)
+    assert len(problems) == 3
+    assert any("not six digits" in problem for problem in problems)
+    assert any("outside Nigeria" in problem for problem in problems)
+    assert any("duplicate state code" in problem for problem in problems)
+    assert validate_records({}) == ["top level is not a list of states"]
+
+
+def test_load_and_enrich_benchmark():
+    start = time.perf_counter()
+    gazetteer = Gazetteer.from_json()
+    load_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    lgas = [gazetteer.lgas[i] for i in rng.integers(0, len(gazetteer.lgas), size=5_000)]
+    addresses = [f"{i} Main Street, {lga.name}, {lga.state.name} State" for i, lga in enumerate(lgas)] * 10
+    df = pd.DataFrame({"ADDRESS": addresses})
+    start = time.perf_counter()
+    enriched = gazetteer.enrich_addresses(df)
+    enrich_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for lga in lgas:
+        gazetteer.lga(lga.name, lga.state)
+        gazetteer.state(lga.state.code)
+    lookup_seconds = time.perf_counter() - start
+    print(f"gazetteer load {load_seconds * 1000:.1f} ms, {len(lgas)} lookups {lookup_seconds * 1000:.1f} ms, "
+          f"enrich {len(df)} rows {enrich_seconds:.2f}s")
+    assert enriched["ADDRESS_VALID"].all()
+    assert load_seconds < 5 and enrich_seconds < 30
@@ -0,0 +1,85 @@
+import random
+import time
+
+import pytest
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image, ImageDraw, ImageFont
+
+from label_layout import layout_batch, text_width, wrap_text
+
+
+def reference_wrap_text(text, font, max_width):
+    # The nested wrap_text bar_code_generator used before label_layout. It loops
+    # forever on a word wider than max_width, so callers only pass texts that fit.
+    draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+    lines = []
+    words = text.split()
+    while words:
+        line = ''
+        while words and draw.textlength(line + words[0], font=font) <= max_width:
+            line += (words.pop(0) + ' ')
+        lines.append(line.strip())
+    return lines
+
+
+WORDS = ["STEEL", "BOLT", "M12", "x", "40mm", "GALVANISED", "Hex", "nut/washer", "AVAVAV", "To", "W.",
+         "fly", "Ltd.", "PACK-OF-100", "ÉCROU", "12.5KG", "(spare)", "AAAA", "iiii", "WWWW"]
+
+
+def _fonts():
+    return [ImageFont.load_default(size=size) for size in (18, 30, 45)]
+
+
+def _fits(text, font, max_width):
+    draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+    return all(draw.textlength(word, font=font) <= max_width for word in text.split())
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_wrap_text_matches_reference(seed):
+    rng = random.Random(seed)
+    for font in _fonts():
+        for _ in range(25):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 30)))
+            if rng.random() < 0.2:
+                text = "  " + text.replace(" ", rng.choice(["  ", " \t", " "])) + " "
+            max_width = rng.randint(60, 700)
+            if not _fits(text, font, max_width):
+                continue
+            assert wrap_text(text, font, max_width) == reference_wrap_text(text, font, max_width), (text, max_width)
+
+
+def test_layout_batch_matches_wrap_text():
+    font = _fonts()[1]
+    texts = ["GALVANISED STEEL BOLT M12 x 40mm", "", "Hex nut/washer PACK-OF-100 (spare)"]
+    assert layout_batch(texts, font, 300) == [wrap_text(text, font, 300) for text in texts]
+
+
+def test_word_wider_than_line_gets_own_line():
+    font = _fonts()[2]
+    assert wrap_text("A GALVANISED-STEEL-BOLT B", font, 60) == ["A", "GALVANISED-STEEL-BOLT", "B"]
+
+
+def test_wrap_long_descriptions_benchmark():
+    # Long functional-location strings at the label's description width and font size.
+    rng = random.Random(0)
+    font = ImageFont.load_default(size=50)
+    max_width = 944 - 2 * 20 - 20
+    texts = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))) for _ in range(100)]
+    texts = [text for text in texts if _fits(text, font, max_width)]
+
+    start = time.perf_counter()
+    expected = [reference_wrap_text(text, font, max_width) for text in texts]
+    reference_seconds = time.perf_counter() - start
+    text_width.cache_clear()
+    start = time.perf_counter()
+    cold = [wrap_text(text, font, max_width) for text in texts]
+    cold_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = layout_batch(texts, font, max_width)
+    warm_seconds = time.perf_counter() - start
+    print(f"wrap_text on {len(texts)} long descriptions: reference {reference_seconds * 1000:.0f} ms, "
+          f"cold cache {cold_seconds * 1000:.0f} ms, warm cache {warm_seconds * 1000:.0f} ms")
+    assert cold == expected and batch == expected
+    assert cold_seconds < reference_seconds and warm_seconds < reference_seconds
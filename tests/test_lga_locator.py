@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from lga_locator import LGALocator, haversine_km
+
+
+@pytest.fixture(scope="module")
+def locator():
+    return LGALocator()
+
+
+def random_points(seed, n=2_000):
+    # Mostly inside Nigeria's bounding box, some far outside it.
+    rng = np.random.default_rng(seed)
+    latitudes = rng.uniform(3.5, 14.5, size=n)
+    longitudes = rng.uniform(2.5, 15.0, size=n)
+    far = rng.random(n) < 0.1
+    latitudes[far] = rng.uniform(-89, 89, size=far.sum())
+    longitudes[far] = rng.uniform(-179, 179, size=far.sum())
+    return latitudes, longitudes
+
+
+def assert_same_neighbours(locator, latitudes, longitudes, indices, distances, expected_distances):
+    # Some LGAs share coordinates, so compare distances; indices must point at LGAs at those distances.
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-9, atol=1e-9)
+    lat, lon = (latitudes, longitudes) if indices.ndim == 1 else (latitudes[:, None], longitudes[:, None])
+    np.testing.assert_allclose(haversine_km(lat, lon, locator.latitudes[indices], locator.longitudes[indices]),
+                               expected_distances, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_nearest_matches_brute_force(locator, seed):
+    if locator.tree is None:
+        pytest.skip("scipy not installed")
+    latitudes, longitudes = random_points(seed)
+    indices, distances = locator.nearest_batch(latitudes, longitudes)
+    _, expected = locator.brute_force_nearest(latitudes, longitudes)
+    assert indices.shape == (len(latitudes),)
+    assert_same_neighbours(locator, latitudes, longitudes, indices, distances, expected)
+
+
+@pytest.mark.parametrize("k", [2, 5, 12])
+def test_k_nearest_matches_brute_force(locator, k):
+    if locator.tree is None:
+        pytest.skip("scipy not installed")
+    latitudes, longitudes = random_points(k)
+    indices, distances = locator.nearest_batch(latitudes, longitudes, k=k)
+    _, expected = locator.brute_force_nearest(latitudes, longitudes, k=k)
+    assert indices.shape == (len(latitudes), k)
+    assert (np.diff(distances, axis=1) >= 0).all()
+    assert_same_neighbours(locator, latitudes, longitudes, indices, distances, expected)
+
+
+@pytest.mark.parametrize("radius_km", [0.0, 5.0, 40.0, 250.0])
+def test_within_radius_matches_brute_force(locator, radius_km):
+    latitudes, longitudes = random_points(7, n=300)
+    results = locator.within_radius_batch(latitudes, longitudes, radius_km)
+    expected = locator.brute_force_within_radius(latitudes, longitudes, radius_km)
+    for (indices, distances), (expected_indices, expected_distances) in zip(results, expected):
+        np.testing.assert_array_equal(indices, expected_indices)
+        np.testing.assert_allclose(distances, expected_distances)
+        assert (distances <= radius_km).all()
+        assert (np.diff(distances) >= 0).all()
+
+
+def test_within_radius_includes_an_lga_exactly_on_the_radius(locator):
+    lat, lon = locator.latitudes[0] + 0.5, locator.longitudes[0]
+    radius_km = float(haversine_km(lat, lon, locator.latitudes[0], locator.longitudes[0]))
+    indices, _ = locator.within_radius_batch([lat], [lon], radius_km)[0]
+    assert 0 in indices
+
+
+@pytest.mark.parametrize("point", [(np.nan, 7.0), (9.0, np.nan), (np.inf, 7.0), (91.0, 7.0), (-95.0, 7.0),
+                                   (9.0, 181.0), (9.0, -200.0)])
+def test_nan_and_out_of_range_points_get_no_lga(locator, point):
+    latitudes = np.array([9.05, point[0], 6.45])
+    longitudes = np.array([7.49, point[1], 3.39])
+    for search in (locator.nearest_batch, locator.brute_force_nearest):
+        indices, distances = search(latitudes, longitudes)
+        assert indices[1] == -1 and np.isnan(distances[1])
+        assert (indices[[0, 2]] >= 0).all()
+        indices, distances = search(latitudes, longitudes, k=3)
+        assert (indices[1] == -1).all() and np.isnan(distances[1]).all()
+    for search in (locator.within_radius_batch, locator.brute_force_within_radius):
+        assert len(search(latitudes, longitudes, 500.0)[1][0]) == 0
+    assert locator.nearest(*point)[0] is None
+    assert locator.within_radius(*point, 500.0) == []
+
+
+def test_nearest_of_an_lga_is_itself(locator):
+    lga, distance = locator.nearest(float(locator.latitudes[10]), float(locator.longitudes[10]))
+    assert distance == pytest.approx(0.0, abs=1e-6)
+    assert (lga.latitude, lga.longitude) == (locator.lgas[10].latitude, locator.lgas[10].longitude)
+
+
+def test_without_scipy_queries_use_brute_force(locator, monkeypatch):
+    latitudes, longitudes = random_points(11, n=200)
+    monkeypatch.setattr(locator, "tree", None)
+    indices, distances = locator.nearest_batch(latitudes, longitudes)
+    expected_indices, expected_distances = locator.brute_force_nearest(latitudes, longitudes)
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_array_equal(distances, expected_distances)
@@ -0,0 +1,320 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from profit_center import SHEETS_TO_PROCESS, clean_code, process_sheet
+
+
+def reference_process_sheet(prev_sheet: pd.DataFrame, curr_sheet: pd.DataFrame) -> pd.DataFrame:
+    # process_sheet as it was before the merge rewrite: per-row loops, a filter of the
+    # whole previous sheet per current row and one concat per missing row.
+    curr_sheet = curr_sheet.copy()
+
+    def safe_float(val):
+        try:
+            return float(val) if pd.notna(val) else 0.0
+        except Exception:
+            return 0.0
+
+    def is_valid_code(rm_code, fg_code):
+        rm = str(rm_code).strip()
+        fg = str(fg_code).strip()
+        return not (rm == "" and fg in ["0", "0.0"])
+
+    for col in ["RM_MatCode", "FG_MatCode"]:
+        if col in prev_sheet.columns:
+            prev_sheet[col] = prev_sheet[col].apply(clean_code)
+        if col in curr_sheet.columns:
+            curr_sheet[col] = curr_sheet[col].apply(clean_code)
+
+    numeric_cols = [
+        "RM-Op_Stock", "Val.Diff_OpStock",
+        "FG-Op_Stock", "Val.Diff_FG_ClsStock",
+        "FG_Val.Diff_OpStock", "ClsStock_Qty", "Val.Diff_ClsStock"
+    ]
+    for col in numeric_cols:
+        if col in curr_sheet.columns:
+            curr_sheet[col] = curr_sheet[col].apply(safe_float)
+
+    curr_sheet["Prod_process_reference"] = curr_sheet["RM_MatCode"].fillna("").astype(str) + curr_sheet["FG_MatCode"].fillna("").astype(str)
+    prev_sheet["Prod_process_reference"] = prev_sheet["RM_MatCode"].fillna("").astype(str) + prev_sheet["FG_MatCode"].fillna("").astype(str)
+
+    curr_refs = set(curr_sheet["Prod_process_reference"])
+
+    for index, row in curr_sheet.iterrows():
+        rm_code = row.get("RM_MatCode", "")
+        fg_code = row.get("FG_MatCode", "")
+        if not is_valid_code(rm_code, fg_code):
+            continue
+
+        ref = row["Prod_process_reference"]
+        if not ref.strip():
+            continue
+
+        match = prev_sheet[prev_sheet["Prod_process_reference"] == ref]
+        if not match.empty:
+            prev_row = match.iloc[0]
+            curr_sheet.at[index, "RM-Op_Stock"] = safe_float(prev_row.get("ClsStock_Qty"))
+            curr_sheet.at[index, "Val.Diff_OpStock"] = safe_float(prev_row.get("Val.Diff_ClsStock"))
+            curr_sheet.at[index, "FG-Op_Stock"] = safe_float(prev_row.get("FG_ClsStock_Qty"))
+            curr_sheet.at[index, "FG_Val.Diff_OpStock"] = safe_float(prev_row.get("Val.Diff_FG_ClsStock"))
+
+    for _, row in prev_sheet.iterrows():
+        rm_code = row.get("RM_MatCode", "")
+        fg_code = row.get("FG_MatCode", "")
+        if not is_valid_code(rm_code, fg_code):
+            continue
+
+        ref = row.get("Prod_process_reference", "").strip()
+        if not ref or ref in curr_refs:
+            continue
+
+        new_row = {
+            "RM_MatCode": rm_code,
+            "FG_MatCode": fg_code,
+            "RM-Op_Stock": safe_float(row.get("ClsStock_Qty")),
+            "Val.Diff_OpStock": safe_float(row.get("Val.Diff_ClsStock")),
+            "FG-Op_Stock": safe_float(row.get("FG_ClsStock_Qty")),
+            "FG_Val.Diff_OpStock": safe_float(row.get("Val.Diff_FG_ClsStock")),
+            "Prod_process_reference": ref
+        }
+        curr_sheet = pd.concat([curr_sheet, pd.DataFrame([new_row])], ignore_index=True)
+
+    curr_sheet["Prod_Process_No"] = curr_sheet["Prod_process_reference"]
+
+    if "Prod_process_reference" in prev_sheet.columns:
+        prev_sheet.drop(columns=["Prod_process_reference"], inplace=True)
+    if "Prod_process_reference" in curr_sheet.columns:
+        curr_sheet.drop(columns=["Prod_process_reference"], inplace=True)
+
+    return curr_sheet
+
+
+STOCK_COLUMNS = ["RM-Op_Stock", "Val.Diff_OpStock", "FG-Op_Stock", "FG_Val.Diff_OpStock",
+                 "ClsStock_Qty", "Val.Diff_ClsStock", "FG_ClsStock_Qty", "Val.Diff_FG_ClsStock"]
+
+
+def _code(rng, pool):
+    # Codes as the SAP export delivers them: ints, floats, padded text, blanks, NaN.
+    code = pool[rng.integers(len(pool))]
+    kind = rng.integers(7)
+    if kind == 0:
+        return float(code)
+    if kind == 1:
+        return f" {code} "
+    if kind == 2:
+        return str(code)
+    if kind == 3:
+        return rng.choice([np.nan, "", "0", 0, "N/A"])
+    return code
+
+
+def _stock(rng):
+    kind = rng.integers(8)
+    if kind == 0:
+        return np.nan
+    if kind == 1:
+        return str(round(rng.normal(100, 50), 3))
+    if kind == 2:
+        return rng.choice(["", "-", "n/a", " 12.5 "])
+    return round(float(rng.normal(100, 50)), 2)
+
+
+def make_sheet(rng, rows, rm_pool, fg_pool, drop_columns=()):
+    sheet = pd.DataFrame({
+        "RM_MatCode": pd.Series([_code(rng, rm_pool) for _ in range(rows)], dtype=object),
+        "FG_MatCode": pd.Series([_code(rng, fg_pool) for _ in range(rows)], dtype=object),
+        **{column: pd.Series([_stock(rng) for _ in range(rows)], dtype=object) for column in STOCK_COLUMNS},
+        "Plant": ["1810"] * rows,
+    })
+    # Placeholder rows: empty RM code and an FG code of 0.
+    placeholders = rng.random(rows) < 0.05
+    sheet.loc[placeholders, "RM_MatCode"] = ""
+    sheet.loc[placeholders, "FG_MatCode"] = 0
+    return sheet.drop(columns=list(drop_columns))
+
+
+@pytest.mark.parametrize("sheet_name", SHEETS_TO_PROCESS + ["A113"])
+@pytest.mark.parametrize("seed", range(10))
+def test_process_sheet_matches_reference(sheet_name, seed):
+    rng = np.random.default_rng([seed, int(sheet_name[1:])])
+    rm_pool = list(rng.integers(10_000_000, 10_000_000 + 60, size=40))
+    fg_pool = list(rng.integers(20_000_000, 20_000_000 + 60, size=40))
+    prev_drop = ["FG_ClsStock_Qty"] if seed % 4 == 1 else []
+    curr_drop = ["FG-Op_Stock"] if seed % 4 == 2 else []
+    prev_sheet = make_sheet(rng, int(rng.integers(0, 150)), rm_pool, fg_pool, prev_drop)
+    curr_sheet = make_sheet(rng, int(rng.integers(0, 150)), rm_pool, fg_pool, curr_drop)
+
+    expected = reference_process_sheet(prev_sheet.copy(), curr_sheet.copy())
+    result = process_sheet(prev_sheet.copy(), curr_sheet.copy())
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_process_sheet_matches_reference_on_numeric_columns(seed):
+    # Clean exports arrive from read_excel as int64/float64 columns, not object.
+    rng = np.random.default_rng(seed)
+
+    def sheet(rows):
+        codes = rng.integers(0, 30, size=rows)
+        frame = pd.DataFrame({
+            "RM_MatCode": np.where(codes < 2, np.nan, 10_000_000 + codes),
+            "FG_MatCode": 20_000_000 + rng.integers(0, 30, size=rows),
+            **{column: np.round(rng.normal(100, 50, size=rows), 2) for column in STOCK_COLUMNS},
+        })
+        frame.loc[rng.random(rows) < 0.05, "FG_MatCode"] = 0
+        return frame
+
+    prev_sheet, curr_sheet = sheet(int(rng.integers(0, 200))), sheet(int(rng.integers(0, 200)))
+    expected = reference_process_sheet(prev_sheet.copy(), curr_sheet.copy())
+    pd.testing.assert_frame_equal(process_sheet(prev_sheet.copy(), curr_sheet.copy()), expected, check_dtype=False)
+
+
+def test_process_sheet_leaves_inputs_untouched():
+    rng = np.random.default_rng(0)
+    prev_sheet = make_sheet(rng, 50, [1, 2, 3], [4, 5, 6])
+    curr_sheet = make_sheet(rng, 50, [1, 2, 3], [4, 5, 6])
+    prev_copy, curr_copy = prev_sheet.copy(), curr_sheet.copy()
+    process_sheet(prev_sheet, curr_sheet)
+    pd.testing.assert_frame_equal(prev_sheet, prev_copy)
+    pd.testing.assert_frame_equal(curr_sheet, curr_copy)
+
+
+def test_process_sheet_100k_rows_benchmark():
+    # The reference takes minutes at this size; the merge must stay in seconds.
+    rng = np.random.default_rng(1)
+    rows = 100_000
+    prev_sheet = pd.DataFrame({
+        "RM_MatCode": rng.integers(10_000_000, 10_050_000, size=rows).astype(float),
+        "FG_MatCode": rng.integers(20_000_000, 20_000_050, size=rows),
+        **{column: rng.normal(100, 50, size=rows) for column in STOCK_COLUMNS},
+    })
+    curr_sheet = prev_sheet.sample(frac=0.9, random_state=2).reset_index(drop=True)
+    start = time.perf_counter()
+    result = process_sheet(prev_sheet, curr_sheet)
+    elapsed = time.perf_counter() - start
+    print(f"process_sheet on {rows} rows: {elapsed:.2f}s")
+    assert len(result) >= len(curr_sheet)
+    assert elapsed < 30
+
+
+hypothesis = pytest.importorskip("hypothesis")
+from hypothesis import given, settings, strategies as st
+
+from profit_center import clean_codes, safe_float, safe_floats
+
+NUMERIC_TEXT = st.sampled_from(["1.5", " 42 ", "-0", "1e400", "-1e400", "nan", "inf", "-inf", "0x10", "1_000",
+                                "12.5.1", "", " ", "N/A", "١٢", "9223372036854775808", "1e18"])
+CELL_VALUES = st.one_of(
+    st.none(),
+    st.booleans(),
+    st.integers(min_value=-(2 ** 70), max_value=2 ** 70),
+    st.floats(allow_nan=True, allow_infinity=True),
+    st.floats(min_value=-1e20, max_value=1e20).map(round),
+    NUMERIC_TEXT,
+    st.text(max_size=12),
+    st.floats(allow_nan=False, allow_infinity=False).map(str),
+    st.datetimes().map(pd.Timestamp),
+)
+
+
+def _series(values, infer):
+    # Object columns come from mixed sheets; inferred ones cover the numeric fast paths.
+    return pd.Series(values) if infer else pd.Series(values, dtype=object)
+
+
+@settings(max_examples=400, deadline=None, database=None)
+@given(st.lists(CELL_VALUES, max_size=30), st.booleans())
+def test_clean_codes_matches_clean_code(values, infer):
+    series = _series(values, infer)
+    expected = series.apply(clean_code)
+    pd.testing.assert_series_equal(clean_codes(series), expected, check_dtype=False)
+
+
+@settings(max_examples=400, deadline=None, database=None)
+@given(st.lists(CELL_VALUES, max_size=30), st.booleans())
+def test_safe_floats_matches_safe_float(values, infer):
+    series = _series(values, infer)
+    expected = series.apply(safe_float).astype(np.float64)
+    result = safe_floats(series)
+    pd.testing.assert_series_equal(result, expected, check_dtype=False)
+    # Bit-for-bit outside NaN, so text parses and the signs of zeros agree exactly.
+    result, expected = result.to_numpy(np.float64), expected.to_numpy()
+    assert np.array_equal(np.isnan(result), np.isnan(expected))
+    finite = ~np.isnan(expected)
+    assert np.array_equal(result[finite].view(np.int64), expected[finite].view(np.int64))
+
+
+@settings(max_examples=200, deadline=None, database=None)
+@given(st.lists(st.one_of(st.integers(-(2 ** 62), 2 ** 62), st.floats()), max_size=30))
+def test_numeric_columns_take_the_same_path_as_apply(values):
+    series = pd.Series(values, dtype=np.float64)
+    pd.testing.assert_series_equal(clean_codes(series), series.apply(clean_code), check_dtype=False)
+    pd.testing.assert_series_equal(safe_floats(series), series.apply(safe_float), check_dtype=False)
+
+
+def test_rebuild_skips_unchanged_months_without_parsing(tmp_path, monkeypatch):
+    import excel_cache
+    from profit_center import rebuild_opening_stocks
+
+    monkeypatch.setenv("EXCEL_CACHE_DIR", str(tmp_path / "sheets"))
+    monkeypatch.setattr(excel_cache, "DEFAULT_CACHE_DIR", str(tmp_path / "sheets"))
+    monkeypatch.setattr(excel_cache, "_caches", {})
+    rng = np.random.default_rng(3)
+    template = str(tmp_path / "{year}-{month:02d}.xlsx")
+    for month in (1, 2, 3):
+        with pd.ExcelWriter(template.format(year=2024, month=month), engine="openpyxl") as writer:
+            for name in ["A110", "A111"]:
+                pd.DataFrame({
+                    "RM_MatCode": 10_000_000 + rng.integers(0, 40, size=60),
+                    "FG_MatCode": 20_000_000 + rng.integers(0, 40, size=60),
+                    **{column: np.round(rng.normal(100, 50, size=60), 2) for column in STOCK_COLUMNS},
+                }).to_excel(writer, sheet_name=name, index=False)
+
+    month_cache = str(tmp_path / "months")
+    run = dict(path_template=template, sheets_to_process=["A110", "A111"], cache_dir=month_cache, workers=1)
+    assert rebuild_opening_stocks("2024-02", "2024-03", **run) == [(2024, 2), (2024, 3)]
+    # Only the restated sheets are kept by the month cache; raw sheets live in the sheet cache.
+    assert not os.listdir(os.path.join(month_cache, "2024-01"))
+    assert sorted(os.listdir(os.path.join(month_cache, "2024-03"))) == ["A110.parquet", "A111.parquet"]
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("workbook parsed again")
+
+    monkeypatch.setattr(excel_cache.pd, "ExcelFile", no_parse)
+    assert rebuild_opening_stocks("2024-02", "2024-03", **run) == []
+
+
+def test_month_cache_lives_under_the_sheet_cache_and_reuses_its_digest(tmp_path, monkeypatch):
+    import excel_cache
+    from profit_center import MONTH_CACHE_NAME, rebuild_opening_stocks
+
+    root = str(tmp_path / "sheets")
+    monkeypatch.setenv("EXCEL_CACHE_DIR", root)
+    monkeypatch.setattr(excel_cache, "DEFAULT_CACHE_DIR", root)
+    monkeypatch.setattr(excel_cache, "_caches", {})
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(4)
+    template = str(tmp_path / "{year}-{month:02d}.xlsx")
+    for month in (1, 2):
+        make_sheet(rng, 30, [1, 2, 3], [4, 5, 6]).to_excel(template.format(year=2024, month=month),
+                                                           sheet_name="A110", index=False)
+
+    hashed = []
+    file_sha256 = excel_cache.file_sha256
+
+    def counting_sha256(file_path):
+        hashed.append(file_sha256(file_path))
+        return hashed[-1]
+
+    monkeypatch.setattr(excel_cache, "file_sha256", counting_sha256)
+    assert rebuild_opening_stocks("2024-02", "2024-02", template, ["A110"], workers=1) == [(2024, 2)]
+    assert rebuild_opening_stocks("2024-02", "2024-02", template, ["A110"], workers=1) == []
+
+    assert os.path.exists(os.path.join(root, MONTH_CACHE_NAME, "months.json"))
+    assert sorted(os.listdir(tmp_path)) == ["2024-01.xlsx", "2024-02.xlsx", "sheets"]
+    # January, February as exported and February once restated: each content hashed once.
+    assert len(hashed) == len(set(hashed)) == 3
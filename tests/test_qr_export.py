@@ -0,0 +1,306 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from qr_export import ExportCheckpoint, LooseFileSink, SQLiteBackend, export_qr_codes
+
+
+def make_table(path, rows=20, plants=("P1", "P2"), distinct=None):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE ZSAP_FIX_ASSET (QR_FILE_NAME TEXT, PLANT_CODE TEXT, QR_CODE_BLOB BLOB)")
+    distinct = distinct or rows
+    conn.executemany("INSERT INTO ZSAP_FIX_ASSET VALUES (?, ?, ?)",
+                     [(f"asset{i:03d}", plants[i % len(plants)], b"%PDF-" + bytes([i % distinct]) * 64)
+                      for i in range(rows)])
+    conn.commit()
+    conn.close()
+    return SQLiteBackend(path)
+
+
+def run_with_timeout(target, timeout=20):
+    # A hung export would block the test run forever; run it in a thread instead.
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = target()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "export hung"
+    return outcome
+
+
+class FailingSink(LooseFileSink):
+    """LooseFileSink that raises for the listed file names (in is_unchanged or write)."""
+
+    def __init__(self, base_dir, fail_write=(), fail_check=False):
+        super().__init__(base_dir)
+        self.fail_write = set(fail_write)
+        self.fail_check = fail_check
+
+    def is_unchanged(self, checkpoint, file_name, plant_code, blob):
+        if self.fail_check:
+            raise OSError("size round trip failed")
+        return super().is_unchanged(checkpoint, file_name, plant_code, blob)
+
+    def write(self, file_name, plant_code, blob, digest=None):
+        if file_name in self.fail_write:
+            raise OSError(f"LOB read failed for {file_name}")
+        return super().write(file_name, plant_code, blob, digest)
+
+
+def test_failing_is_unchanged_fails_the_export_instead_of_hanging(tmp_path):
+    source = make_table(str(tmp_path / "qr.db"), rows=200)
+    out = str(tmp_path / "out")
+    outcome = run_with_timeout(lambda: export_qr_codes(
+        source, out, batch_size=10, writers=2, queue_depth=2, retries=1, incremental=True,
+        progress_every=None, sink=FailingSink(out, fail_check=True)))
+    assert isinstance(outcome.get("error"), OSError)
+
+
+def test_failed_write_does_not_advance_resume_key(tmp_path):
+    source = make_table(str(tmp_path / "qr.db"), rows=30)
+    out = str(tmp_path / "out")
+    outcome = run_with_timeout(lambda: export_qr_codes(
+        source, out, batch_size=5, writers=1, queue_depth=2, retries=0, progress_every=None,
+        sink=FailingSink(out, fail_write={"asset012"})))
+    assert isinstance(outcome.get("error"), OSError)
+
+    store = ExportCheckpoint(out)
+    resume_key = store.resume_key("0/1")
+    store.close()
+    # rowids start at 1, so asset012 is rowid 13; the resume key must stay before it.
+    assert resume_key is None or int(resume_key) < 13
+
+    # The rerun resumes before the failed row and exports it.
+    outcome = run_with_timeout(lambda: export_qr_codes(source, out, batch_size=5, writers=1,
+                                                       progress_every=None))
+    assert "error" not in outcome
+    assert os.path.exists(os.path.join(out, "P1", "asset012.pdf"))
+    assert sum(len(files) for _, _, files in os.walk(out) if files and not files[0].endswith("sqlite")) >= 30
+
+
+def test_partition_retry_recovers_from_transient_write_failure(tmp_path):
+    source = make_table(str(tmp_path / "qr.db"), rows=40)
+    out = str(tmp_path / "out")
+
+    class FlakySink(LooseFileSink):
+        failures = 0
+
+        def write(self, file_name, plant_code, blob, digest=None):
+            if file_name == "asset020" and not FlakySink.failures:
+                FlakySink.failures += 1
+                raise OSError("transient")
+            return super().write(file_name, plant_code, blob, digest)
+
+    outcome = run_with_timeout(lambda: export_qr_codes(source, out, batch_size=5, writers=2, partitions=2,
+                                                       retries=1, progress_every=None, sink=FlakySink(out)))
+    assert "error" not in outcome
+    pdfs = [name for _, _, files in os.walk(out) for name in files if name.endswith(".pdf")]
+    assert sorted(pdfs) == sorted(f"asset{i:03d}.pdf" for i in range(40))
+
+
+def test_dedup_counts_each_distinct_blob_once_across_partitions(tmp_path):
+    from qr_export import DedupSink
+
+    source = make_table(str(tmp_path / "qr.db"), rows=1000, distinct=40)
+    out = str(tmp_path / "out")
+    sink = DedupSink(out)
+    outcome = run_with_timeout(lambda: export_qr_codes(source, out, batch_size=10, writers=4, partitions=2,
+                                                       progress_every=None, sink=sink))
+    assert "error" not in outcome
+    objects = [name for _, _, files in os.walk(os.path.join(out, "_objects")) for name in files]
+    assert len(objects) == 40
+    assert (sink.stored, sink.deduplicated) == (40, 960)
+
+
+@pytest.mark.parametrize("fmt", ["zip", "tar"])
+@pytest.mark.parametrize("incremental", [False, True])
+def test_archive_reruns_do_not_duplicate_members(tmp_path, fmt, incremental):
+    import tarfile
+    import warnings
+    import zipfile
+
+    source = make_table(str(tmp_path / "qr.db"), rows=34, plants=("P1",))
+    out = str(tmp_path / "out")
+    archive_path = os.path.join(out, f"P1.{fmt}")
+
+    def members():
+        if fmt == "zip":
+            with zipfile.ZipFile(archive_path) as archive:
+                return archive.namelist()
+        with tarfile.open(archive_path) as archive:
+            return archive.getnames()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        for _ in range(2):
+            outcome = run_with_timeout(lambda: export_qr_codes(source, out, batch_size=10, archive=fmt,
+                                                               incremental=incremental, progress_every=None))
+            assert "error" not in outcome
+            names = members()
+            assert len(names) == 34 and len(set(names)) == 34
+    with open(archive_path + ".index.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) == 34
+    assert not os.path.exists(archive_path + ".part")
+
+
+def test_failed_full_archive_run_keeps_the_previous_archive(tmp_path):
+    import zipfile
+
+    source = make_table(str(tmp_path / "qr.db"), rows=20, plants=("P1",))
+    out = str(tmp_path / "out")
+    assert "error" not in run_with_timeout(lambda: export_qr_codes(source, out, archive="zip", progress_every=None))
+
+    from qr_export import ArchiveSink
+
+    class FailingArchive(ArchiveSink):
+        def write(self, file_name, plant_code, blob, digest=None):
+            if file_name == "asset015":
+                raise OSError("LOB read failed")
+            return super().write(file_name, plant_code, blob, digest)
+
+    sink = FailingArchive(out, rebuild=True)
+    outcome = run_with_timeout(lambda: export_qr_codes(source, out, batch_size=5, writers=1, retries=0,
+                                                       progress_every=None, sink=sink))
+    assert isinstance(outcome.get("error"), OSError)
+    with zipfile.ZipFile(os.path.join(out, "P1.zip")) as archive:
+        assert len(archive.namelist()) == 20
+
+    # The resumed run finishes the rebuild and replaces the archive.
+    sink = ArchiveSink(out, rebuild=True, resume=True)
+    assert "error" not in run_with_timeout(lambda: export_qr_codes(source, out, batch_size=5, progress_every=None,
+                                                                   sink=sink))
+    with zipfile.ZipFile(os.path.join(out, "P1.zip")) as archive:
+        assert sorted(archive.namelist()) == [f"asset{i:03d}.pdf" for i in range(20)]
+
+
+KILLED_EXPORT = r"""
+import os
+import sys
+import threading
+
+from qr_export import SQLiteBackend, export_qr_codes
+from qr_export import archive
+
+db_path, out, fmt, incremental, kill_at = sys.argv[1:]
+appends = []
+lock = threading.Lock()
+append = archive._Archive.append
+
+
+class KilledSpool:
+    # The process dies with the member's header written but none of its bytes.
+    def read(self, size=-1):
+        os._exit(1)
+
+
+def killing_append(self, name, spool, size, sha256):
+    with lock:
+        appends.append(name)
+        if len(appends) == int(kill_at):
+            spool = KilledSpool()
+    return append(self, name, spool, size, sha256)
+
+
+archive._Archive.append = killing_append
+export_qr_codes(SQLiteBackend(db_path), out, batch_size=50, writers=2, archive=fmt,
+                incremental=incremental == "1", progress_every=None)
+"""
+
+
+def run_killed_export(db_path, out, fmt, incremental, kill_at):
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", KILLED_EXPORT, db_path, out, fmt, "1" if incremental else "0",
+                             str(kill_at)], env=dict(os.environ, PYTHONPATH=root), capture_output=True, timeout=120)
+    assert result.returncode == 1, result.stderr.decode()
+
+
+def archive_contents(path, fmt):
+    """Member name -> bytes, the last member of a name winning as it does for readers."""
+    import tarfile
+    import zipfile
+
+    if fmt == "zip":
+        with zipfile.ZipFile(path) as archive:
+            return {name: archive.read(name) for name in archive.namelist()}, len(archive.namelist())
+    with tarfile.open(path) as archive:
+        names = archive.getnames()
+        return {name: archive.extractfile(name).read() for name in names}, len(names)
+
+
+def table_contents(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT QR_FILE_NAME, QR_CODE_BLOB FROM ZSAP_FIX_ASSET").fetchall()
+    conn.close()
+    return {f"{name}.pdf": blob for name, blob in rows}
+
+
+@pytest.mark.parametrize("fmt", ["zip", "tar"])
+def test_killed_full_archive_run_keeps_the_archive_and_resumes_completely(tmp_path, fmt):
+    db_path = str(tmp_path / "qr.db")
+    source = make_table(db_path, rows=1200, plants=("P1",), distinct=200)
+    out = str(tmp_path / "out")
+    archive_path = os.path.join(out, f"P1.{fmt}")
+    assert "error" not in run_with_timeout(lambda: export_qr_codes(source, out, archive=fmt, progress_every=None))
+    expected = table_contents(db_path)
+
+    run_killed_export(db_path, out, fmt, incremental=False, kill_at=1000)
+    assert archive_contents(archive_path, fmt) == (expected, 1200)
+
+    # The resumed run only fetches rows after the checkpoint, yet publishes every member.
+    assert "error" not in run_with_timeout(lambda: export_qr_codes(SQLiteBackend(db_path), out, archive=fmt,
+                                                                   progress_every=None))
+    assert archive_contents(archive_path, fmt) == (expected, 1200)
+    assert not os.path.exists(archive_path + ".part")
+
+
+@pytest.mark.filterwarnings("ignore:Duplicate name")
+@pytest.mark.parametrize("fmt", ["zip", "tar"])
+def test_killed_incremental_archive_run_keeps_the_archive(tmp_path, fmt):
+    db_path = str(tmp_path / "qr.db")
+    source = make_table(db_path, rows=100, plants=("P1",))
+    out = str(tmp_path / "out")
+    archive_path = os.path.join(out, f"P1.{fmt}")
+    assert "error" not in run_with_timeout(lambda: export_qr_codes(source, out, archive=fmt, incremental=True,
+                                                                   progress_every=None))
+    before = table_contents(db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE ZSAP_FIX_ASSET SET QR_CODE_BLOB = CAST(QR_CODE_BLOB || X'0A' AS BLOB) WHERE rowid % 2 = 0")
+    conn.commit()
+    conn.close()
+    run_killed_export(db_path, out, fmt, incremental=True, kill_at=25)
+    assert archive_contents(archive_path, fmt) == (before, 100)
+
+    assert "error" not in run_with_timeout(lambda: export_qr_codes(SQLiteBackend(db_path), out, archive=fmt,
+                                                                   incremental=True, progress_every=None))
+    contents, members = archive_contents(archive_path, fmt)
+    assert contents == table_contents(db_path)
+    # Each changed blob is appended once, however far the killed run got.
+    assert members == 150
+
+
+@pytest.mark.parametrize("fmt", ["zip", "tar"])
+def test_incremental_archive_run_rebuilds_a_missing_index(tmp_path, fmt):
+    db_path = str(tmp_path / "qr.db")
+    make_table(db_path, rows=30, plants=("P1",))
+    out = str(tmp_path / "out")
+    archive_path = os.path.join(out, f"P1.{fmt}")
+    run = lambda: export_qr_codes(SQLiteBackend(db_path), out, archive=fmt, incremental=True, progress_every=None)
+    assert "error" not in run_with_timeout(run)
+    os.remove(archive_path + ".index.jsonl")
+
+    assert "error" not in run_with_timeout(run)
+    assert archive_contents(archive_path, fmt) == (table_contents(db_path), 30)
+    with open(archive_path + ".index.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) == 30
@@ -0,0 +1,53 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from row_reader import iter_row_chunks
+
+
+def write_assets(path):
+    # A blank Equipment cell in the first rows only: per-chunk inference would make
+    # that chunk float ("10001.0") and the others int ("10004").
+    frame = pd.DataFrame({
+        "Equipment": [10001, None, 10003] + list(range(10004, 10011)),
+        "Description": ["Pump", "Valve", None] + [f"Motor {i}" for i in range(7)],
+        "Installed": [datetime.datetime(2020, 1, i + 1) for i in range(10)],
+    })
+    frame.to_excel(path, index=False)
+    return frame
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 7, 100])
+def test_excel_values_do_not_depend_on_chunk_boundaries(tmp_path, chunk_size):
+    path = str(tmp_path / "assets.xlsx")
+    write_assets(path)
+    chunks = list(iter_row_chunks(path, chunk_size))
+    assert [len(chunk) for chunk in chunks][:-1] == [chunk_size] * (len(chunks) - 1)
+    rows = pd.concat(chunks, ignore_index=True)
+
+    assert [str(value) for value in rows["Equipment"]] == (
+        ["10001", "nan", "10003"] + [str(i) for i in range(10004, 10011)])
+    assert [str(value) for value in rows["Description"]][:3] == ["Pump", "Valve", "nan"]
+    assert rows["Installed"].tolist() == [datetime.datetime(2020, 1, i + 1) for i in range(10)]
+    assert all(chunk.dtypes.tolist() == chunks[0].dtypes.tolist() for chunk in chunks)
+
+
+def test_explicit_dtype_is_applied_to_every_chunk(tmp_path):
+    path = str(tmp_path / "assets.xlsx")
+    write_assets(path)
+    chunks = list(iter_row_chunks(path, 4, dtype={"Equipment": "float64"}))
+    assert all(chunk["Equipment"].dtype == np.float64 for chunk in chunks)
+    assert pd.concat(chunks)["Equipment"].isna().sum() == 1
+
+
+def test_csv_fields_stay_text_in_every_chunk(tmp_path):
+    path = tmp_path / "assets.csv"
+    path.write_text("Equipment,Description\n10001,Pump\n,Valve\n10003,\n" +
+                    "".join(f"{i},Motor\n" for i in range(10004, 10011)))
+    chunks = list(iter_row_chunks(str(path), 3))
+    assert len(chunks) == 4
+    rows = pd.concat(chunks, ignore_index=True)
+    assert rows["Equipment"].tolist()[:4] == ["10001", np.nan, "10003", "10004"]
+    assert rows["Description"].tolist()[:3] == ["Pump", "Valve", np.nan]
@@ -0,0 +1,134 @@
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.comments import Comment
+from openpyxl.worksheet.table import Table
+
+from xlsx_sheets import can_replace_sheets, column_letter, replace_sheets, sheet_parts, supports_frame
+
+CALC_CHAIN = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+              '<calcChain xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+              '<c r="B1" i="1"/><c r="A4" i="2"/></calcChain>')
+
+
+def make_workbook(path, table_on=None, comment_on=None):
+    workbook = Workbook()
+    data = workbook.active
+    data.title = "A110"
+    data.append(["RM_MatCode", "Qty"])
+    data.append([100, 1.5])
+    data["C2"] = "=B2*2"
+    other = workbook.create_sheet("Other")
+    for value in (1, 2, 3):
+        other.append([value])
+    other["A4"] = "=SUM(A1:A3)"
+    other["B1"] = "=A110!B2"
+    if table_on:
+        workbook[table_on].add_table(Table(displayName="Stock", ref="A1:B2" if table_on == "A110" else "A1:A3"))
+    if comment_on:
+        workbook[comment_on]["A1"].comment = Comment("checked", "auditor")
+    workbook.save(path)
+    add_calc_chain(path)
+
+
+def add_calc_chain(path):
+    # openpyxl never writes xl/calcChain.xml; Excel does whenever a workbook has formulas.
+    with zipfile.ZipFile(path) as source:
+        items = {item.filename: source.read(item) for item in source.infolist()}
+    items["xl/calcChain.xml"] = CALC_CHAIN.encode()
+    items["xl/_rels/workbook.xml.rels"] = items["xl/_rels/workbook.xml.rels"].replace(
+        b"</Relationships>",
+        b'<Relationship Id="rIdCalc" Target="calcChain.xml" '
+        b'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/calcChain"/></Relationships>')
+    items["[Content_Types].xml"] = items["[Content_Types].xml"].replace(
+        b"</Types>",
+        b'<Override PartName="/xl/calcChain.xml" '
+        b'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.calcChain+xml"/></Types>')
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as target:
+        for name, content in items.items():
+            target.writestr(name, content)
+
+
+def processed_frame():
+    return pd.DataFrame({
+        "RM_MatCode": ["100", "200", "a & <b>"],
+        "Qty": [3.25, np.nan, -1e300],
+        "Count": [1, 2, 3],
+        "Flag": [True, False, True],
+    })
+
+
+def test_replaced_sheet_reads_back_and_other_parts_survive(tmp_path):
+    path = str(tmp_path / "book.xlsx")
+    make_workbook(path, table_on="Other", comment_on="Other")
+    with zipfile.ZipFile(path) as archive:
+        parts = sheet_parts(archive)
+        before = {name: archive.read(name) for name in archive.namelist()}
+
+    df = processed_frame()
+    assert can_replace_sheets(path, ["A110"])
+    replace_sheets(path, {"A110": df})
+
+    pd.testing.assert_frame_equal(pd.read_excel(path, sheet_name="A110"), df)
+    workbook = load_workbook(path)
+    rows = list(workbook["A110"].iter_rows(values_only=True))
+    assert rows[0] == ("RM_MatCode", "Qty", "Count", "Flag")
+    assert rows[3] == ("a & <b>", -1e300, 3, True)
+    other = workbook["Other"]
+    assert (other["A4"].value, other["B1"].value) == ("=SUM(A1:A3)", "=A110!B2")
+    assert "Stock" in other.tables
+    assert other["A1"].comment.text == "checked"
+
+    with zipfile.ZipFile(path) as archive:
+        after = {name: archive.read(name) for name in archive.namelist()}
+    # The calculation chain goes, with its relationship and content type.
+    assert "xl/calcChain.xml" not in after
+    assert b"calcChain" not in after["xl/_rels/workbook.xml.rels"]
+    assert b"calcChain" not in after["[Content_Types].xml"]
+    # Every other part is copied byte for byte.
+    changed = {parts["A110"], "xl/calcChain.xml", "xl/_rels/workbook.xml.rels", "[Content_Types].xml"}
+    assert {name: content for name, content in after.items() if name not in changed} == {
+        name: content for name, content in before.items() if name not in changed}
+
+
+@pytest.mark.parametrize("attached", ["table", "comment"])
+def test_sheet_with_attached_parts_is_refused(tmp_path, attached):
+    path = str(tmp_path / "book.xlsx")
+    make_workbook(path, **{f"{attached}_on": "A110"})
+    with open(path, "rb") as f:
+        original = f.read()
+
+    assert not can_replace_sheets(path, ["A110"])
+    assert can_replace_sheets(path, ["Other"])
+    with pytest.raises(ValueError, match="A110"):
+        replace_sheets(path, {"A110": processed_frame()})
+    with open(path, "rb") as f:
+        assert f.read() == original
+
+
+def test_save_processed_sheets_falls_back_for_sheets_with_tables(tmp_path):
+    from profit_center import save_processed_sheets
+
+    path = str(tmp_path / "book.xlsx")
+    make_workbook(path, table_on="A110")
+    df = processed_frame()
+    save_processed_sheets(path, {"A110": df})
+    pd.testing.assert_frame_equal(pd.read_excel(path, sheet_name="A110"), df)
+    assert load_workbook(path)["Other"]["A4"].value == "=SUM(A1:A3)"
+
+
+def test_missing_sheet_is_a_key_error(tmp_path):
+    path = str(tmp_path / "book.xlsx")
+    make_workbook(path)
+    assert not can_replace_sheets(path, ["A999"])
+    with pytest.raises(KeyError):
+        replace_sheets(path, {"A999": processed_frame()})
+
+
+def test_supports_frame_and_column_letters():
+    assert supports_frame(processed_frame())
+    assert not supports_frame(pd.DataFrame({"d": pd.to_datetime(["2024-01-01"])}))
+    assert [column_letter(i) for i in (0, 25, 26, 701, 702)] == ["A", "Z", "AA", "ZZ", "AAA"]
@@ -0,0 +1,173 @@
+import datetime
+import math
+import os
+import posixpath
+import re
+import zipfile
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+# Control characters XML 1.0 does not allow; Excel rejects a sheet containing them.
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_CALC_CHAIN_RELATIONSHIP = re.compile(r"<Relationship\b[^>]*Target=\"[^\"]*calcChain\.xml\"[^>]*/>")
+_CALC_CHAIN_OVERRIDE = re.compile(r"<Override\b[^>]*PartName=\"/xl/calcChain\.xml\"[^>]*/>")
+
+
+def column_letter(index: int) -> str:
+    """Excel column letter for a 0-based column index (0 -> A, 26 -> AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def supports_frame(df: pd.DataFrame) -> bool:
+    """
+    True when every column holds only numbers, booleans and text, which is all
+    ``write_sheet_xml`` writes; dates need the workbook's number formats, so frames
+    with date columns are left to the regular pandas writer.
+    """
+    for column in df.columns:
+        values = df[column]
+        if values.dtype.kind in "biuf":
+            continue
+        if values.dtype.kind in "mM":
+            return False
+        if any(isinstance(value, (datetime.date, datetime.time, datetime.timedelta))
+               for value in values.dropna()):
+            return False
+    return True
+
+
+def _cell_xml(ref: str, value) -> str:
+    if value is None or value is pd.NA or value is pd.NaT:
+        return ""
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, np.integer)):
+        return f'<c r="{ref}"><v>{int(value)}</v></c>'
+    if isinstance(value, (float, np.floating)):
+        if math.isnan(value):
+            return ""
+        if math.isinf(value):
+            # Same as pandas' default inf_rep.
+            return _cell_xml(ref, "inf" if value > 0 else "-inf")
+        return f'<c r="{ref}"><v>{repr(float(value))}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub("", str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def write_sheet_xml(df: pd.DataFrame, f):
+    """
+    Write ``df`` (header row plus data, no index, as ``to_excel(index=False)``) to the
+    open binary file ``f`` as a worksheet part. Strings are written inline, so the
+    part does not depend on the workbook's shared string table.
+    """
+    letters = [column_letter(i) for i in range(len(df.columns))]
+    f.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<worksheet xmlns="{MAIN_NS}"><sheetData>'.encode("utf-8"))
+    header = "".join(_cell_xml(f"{letter}1", str(name)) for letter, name in zip(letters, df.columns))
+    f.write(f'<row r="1">{header}</row>'.encode("utf-8"))
+    for row_number, row in enumerate(df.itertuples(index=False, name=None), start=2):
+        cells = "".join(_cell_xml(f"{letter}{row_number}", value) for letter, value in zip(letters, row))
+        f.write(f'<row r="{row_number}">{cells}</row>'.encode("utf-8"))
+    f.write(b"</sheetData></worksheet>")
+
+
+def sheet_parts(archive: zipfile.ZipFile) -> dict:
+    """Map each sheet name to its worksheet part (e.g. ``xl/worksheets/sheet2.xml``)."""
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    relationships = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {}
+    for relationship in relationships.iter(f"{{{PACKAGE_REL_NS}}}Relationship"):
+        target = relationship.get("Target")
+        if target.startswith("/"):
+            targets[relationship.get("Id")] = target.lstrip("/")
+        else:
+            targets[relationship.get("Id")] = posixpath.normpath(posixpath.join("xl", target))
+    return {sheet.get("name"): targets[sheet.get(f"{{{REL_NS}}}id")]
+            for sheet in workbook.iter(f"{{{MAIN_NS}}}sheet")}
+
+
+def sheet_relationships_part(sheet_part: str) -> str:
+    """The relationships part of a worksheet part (its tables, comments, drawings, ...)."""
+    directory, name = posixpath.split(sheet_part)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+def _sheets_with_relationships(archive: zipfile.ZipFile, parts: dict, names) -> list:
+    existing = set(archive.namelist())
+    return [name for name in names if sheet_relationships_part(parts[name]) in existing]
+
+
+def can_replace_sheets(file_path: str, names) -> bool:
+    """
+    True when ``replace_sheets`` can replace the sheets ``names`` of ``file_path``:
+    they all exist and none has parts of its own attached (tables, comments,
+    drawings), which the replacement sheet would no longer reference.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        parts = sheet_parts(archive)
+        names = list(names)
+        return all(name in parts for name in names) and not _sheets_with_relationships(archive, parts, names)
+
+
+def replace_sheets(file_path: str, data: dict):
+    """
+    Replace the sheets named in ``data`` (sheet name -> DataFrame) inside the existing
+    workbook ``file_path``.
+
+    Every other part of the file is copied across byte for byte, so untouched sheets
+    are never parsed or re-serialized and only the replaced sheets are written. The
+    formula calculation chain is dropped (Excel rebuilds it) because it may point at
+    cells of the replaced sheets. The new workbook is written to a temp file and
+    renamed over the original.
+
+    Sheets with tables, comments or drawings attached are refused with ValueError
+    rather than left pointing at parts their new content does not use; see
+    ``can_replace_sheets``.
+    """
+    temp_path = f"{file_path}.part"
+    with zipfile.ZipFile(file_path) as source:
+        parts = sheet_parts(source)
+        missing = [name for name in data if name not in parts]
+        if missing:
+            raise KeyError(f"Sheets not found in {file_path}: {missing}")
+        attached = _sheets_with_relationships(source, parts, data)
+        if attached:
+            raise ValueError(f"Sheets with tables, comments or drawings cannot be replaced in place: {attached}")
+        replaced = {parts[name]: df for name, df in data.items()}
+
+        try:
+            with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED) as target:
+                for item in source.infolist():
+                    if item.filename == "xl/calcChain.xml":
+                        continue
+                    if item.filename in replaced:
+                        info = zipfile.ZipInfo(item.filename, date_time=item.date_time)
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                        with target.open(info, "w") as f:
+                            write_sheet_xml(replaced[item.filename], f)
+                    elif item.filename == "xl/_rels/workbook.xml.rels":
+                        text = source.read(item).decode("utf-8")
+                        target.writestr(item, _CALC_CHAIN_RELATIONSHIP.sub("", text))
+                    elif item.filename == "[Content_Types].xml":
+                        text = source.read(item).decode("utf-8")
+                        target.writestr(item, _CALC_CHAIN_OVERRIDE.sub("", text))
+                    else:
+                        target.writestr(item, source.read(item))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    os.replace(temp_path, file_path)
+